@@ -73,6 +73,11 @@ class AppConfig:
     rag_top_k: int
     memory_max_messages: int
     memory_ttl_minutes: int
+    memory_max_chars: int
+    semantic_cache_enabled: bool
+    semantic_cache_threshold: float
+    semantic_cache_max_entries: int
+    semantic_cache_ttl_hours: int
     healthcheck_enabled: bool
     healthcheck_host: str
     healthcheck_port: int
@@ -93,6 +98,11 @@ CONFIG = AppConfig(
     rag_top_k=_as_int("RAG_TOP_K", 5),
     memory_max_messages=_as_int("MEMORY_MAX_MESSAGES", 15),
     memory_ttl_minutes=_as_int("MEMORY_TTL_MINUTES", 60),
+    memory_max_chars=_as_int("MEMORY_MAX_CHARS", 8000),
+    semantic_cache_enabled=_as_bool("SEMANTIC_CACHE_ENABLED", True),
+    semantic_cache_threshold=_as_float("SEMANTIC_CACHE_THRESHOLD", 0.92),
+    semantic_cache_max_entries=_as_int("SEMANTIC_CACHE_MAX_ENTRIES", 512),
+    semantic_cache_ttl_hours=_as_int("SEMANTIC_CACHE_TTL_HOURS", 24),
     healthcheck_enabled=_as_bool("HEALTHCHECK_ENABLED", True),
     healthcheck_host=os.getenv("HEALTHCHECK_HOST", "0.0.0.0"),
     healthcheck_port=_as_int("HEALTHCHECK_PORT", 9090),
@@ -8,21 +8,38 @@ import time
 from telegram import BotCommand, Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 
-from bot.middleware.auth import admin_only
+from bot.middleware.auth import admin_required
 from bot.services import user_service
 from bot.services.agent_service import warmup_llm_connections
 from bot.state import STATE
 
 logger = logging.getLogger(__name__)
 
+_WELCOME_TEXT = (
+    "Merhaba! 👋\n\n"
+    "Ben akademik asistanınım — komut ezberleme, benimle konuş!\n\n"
+    '📚 "Bu dersi çalışmak istiyorum" → Konu haritası + adım adım öğretim\n'
+    '📖 "Privacy konusunu anlat" → Materyali OKUYUP öğretir\n'
+    '📂 "Hangi materyaller var?" → Kaynak listesi + çalışma sırası\n'
+    '❓ "Polimorfizm nedir?" → Materyallerden cevap\n'
+    '📅 "Bugün derslerim ne?" → Ders programı\n'
+    '📝 "Yaklaşan ödevlerim?" → Deadline\'lar\n'
+    '📊 "Notlarım nasıl?" → Akademik durum\n'
+    '📋 "Devamsızlıklarım?" → Devamsızlık + limit uyarısı\n'
+    '📧 "Son maillerimi göster" → DAIS & AIRS mailleri\n'
+    '🔍 "Erkan hoca mail attı mı?" → Hoca bazlı mail arama\n\n'
+    'Başlamak için "kurslarımı göster" yaz!'
+)
+
+_BOT_COMMANDS = (
+    BotCommand("start", "Botu başlat"),
+    BotCommand("upload", "Admin materyal yükleme"),
+)
+
 
 async def post_init(app: Application) -> None:
     """Register visible command list in Telegram client UI + warm up LLM connections."""
-    commands = [
-        BotCommand("start", "Botu başlat"),
-        BotCommand("upload", "Admin materyal yükleme"),
-    ]
-    await app.bot.set_my_commands(commands)
+    await app.bot.set_my_commands(_BOT_COMMANDS)
 
     # Pre-warm LLM connections to eliminate cold start latency
     await warmup_llm_connections()
@@ -31,31 +48,13 @@ async def post_init(app: Application) -> None:
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send welcome message for agentic workflow."""
     STATE.last_update_received = time.monotonic()
-    await update.effective_message.reply_text(
-        "Merhaba! 👋\n\n"
-        "Ben akademik asistanınım — komut ezberleme, benimle konuş!\n\n"
-        '📚 "Bu dersi çalışmak istiyorum" → Konu haritası + adım adım öğretim\n'
-        '📖 "Privacy konusunu anlat" → Materyali OKUYUP öğretir\n'
-        '📂 "Hangi materyaller var?" → Kaynak listesi + çalışma sırası\n'
-        '❓ "Polimorfizm nedir?" → Materyallerden cevap\n'
-        '📅 "Bugün derslerim ne?" → Ders programı\n'
-        '📝 "Yaklaşan ödevlerim?" → Deadline\'lar\n'
-        '📊 "Notlarım nasıl?" → Akademik durum\n'
-        '📋 "Devamsızlıklarım?" → Devamsızlık + limit uyarısı\n'
-        '📧 "Son maillerimi göster" → DAIS & AIRS mailleri\n'
-        '🔍 "Erkan hoca mail attı mı?" → Hoca bazlı mail arama\n\n'
-        'Başlamak için "kurslarımı göster" yaz!'
-    )
+    await update.effective_message.reply_text(_WELCOME_TEXT)
 
 
+@admin_required
 async def cmd_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Enable one-shot admin upload session for the next document message."""
-    if not await admin_only(update):
-        return
-
     user = update.effective_user
-    if user is None:
-        return
     user_service.begin_upload_session(user.id)
     await update.effective_message.reply_text(
         "📤 Yükleme modu açıldı. Şimdi dokümanı gönderin.\n"
@@ -11,10 +11,11 @@ from telegram import Message, Update
 from telegram.error import TelegramError
 from telegram.ext import Application, ContextTypes, MessageHandler, filters
 
-from bot.middleware.auth import admin_only
+from bot.middleware.auth import admin_required
 from bot.services import document_service, user_service
-from bot.services.agent_service import handle_agent_message
+from bot.services.agent_service import handle_agent_message, start_typing
 from bot.services.topic_cache import TOPIC_CACHE
+from bot.utils.formatters import send_text
 from core import config as core_config
 
 logger = logging.getLogger(__name__)
@@ -22,10 +23,7 @@ logger = logging.getLogger(__name__)
 
 async def _reply_message(message: Message, text: str) -> None:
     """Send response with Markdown fallback to plain text on parse errors."""
-    try:
-        await message.reply_text(text, parse_mode="Markdown")
-    except TelegramError:
-        await message.reply_text(text)
+    await send_text(message, text)
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -54,24 +52,23 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if not query:
         return
 
-    # Show "typing..." immediately so user knows bot is working
-    await message.chat.send_action("typing")
+    # Show "typing..." right away, concurrently with the agent's first steps
+    start_typing(message)
 
     response = await handle_agent_message(user_id=user.id, user_text=query, message=message)
     if response:  # streaming may have already sent the response
         await _reply_message(message, response)
 
 
+@admin_required
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle admin-triggered document uploads after `/upload` command."""
     message = update.effective_message
     user = update.effective_user
-    if message is None or user is None or message.document is None:
+    if message is None or message.document is None:
         return
 
     user_service.record_user_activity(user.id)
-    if not await admin_only(update):
-        return
 
     if not user_service.is_upload_session_active(user.id):
         await message.reply_text("Dokuman yuklemek icin once /upload komutunu kullanin.")
@@ -98,7 +95,10 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     try:
         telegram_file = await message.document.get_file()
-        await telegram_file.download_to_drive(custom_path=str(local_path))
+        # download_to_drive writes the whole payload from the event loop;
+        # fetch into memory (≤ 50 MB, checked above) and write it in a thread
+        payload = await telegram_file.download_as_bytearray()
+        await asyncio.to_thread(local_path.write_bytes, payload)
 
         active_course = user_service.get_active_course(user.id)
         detected_course = document_service.detect_course(filename)
@@ -107,7 +107,7 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await message.reply_text("Kurs tespit edilemedi. Once /courses ile aktif kurs secin.")
             return
 
-        added = await asyncio.to_thread(document_service.index_uploaded_file, Path(local_path), course_name, filename)
+        added = await document_service.index_uploaded_file(Path(local_path), course_name, filename)
         await TOPIC_CACHE.refresh(course_name)
         await message.reply_text(f"Yukleme tamamlandi. {added} yeni parcacik indexlendi. (Kurs: {course_name})")
     except (RuntimeError, ValueError, OSError, TelegramError):
@@ -27,6 +27,7 @@ from core import config as core_config
 from core.document_processor import DocumentProcessor
 from core.llm_engine import LLMEngine
 from core.moodle_client import MoodleClient
+from core.semantic_cache import SemanticCache
 from core.stars_client import StarsClient
 from core.sync_engine import SyncEngine
 from core.vector_store import VectorStore
@@ -128,13 +129,15 @@ def _populate_stars_cache(stars: StarsClient, owner_id: int) -> None:
     try:
         cache = stars.fetch_all_data(owner_id)
         if cache:
-            cache_db.set_json("schedule", owner_id, cache.schedule)
-            cache_db.set_json("grades", owner_id, cache.grades)
-            cache_db.set_json("attendance", owner_id, cache.attendance)
-            cache_db.set_json("exams", owner_id, cache.exams)
-            cache_db.set_json("letter_grades", owner_id, cache.letter_grades)
-            cache_db.set_json("user_info", owner_id, cache.user_info)
-            cache_db.set_json("transcript", owner_id, cache.transcript)
+            cache_db.set_json_many(owner_id, {
+                "schedule": cache.schedule,
+                "grades": cache.grades,
+                "attendance": cache.attendance,
+                "exams": cache.exams,
+                "letter_grades": cache.letter_grades,
+                "user_info": cache.user_info,
+                "transcript": cache.transcript,
+            })
             logger.info(
                 "STARS cache populated: %d schedule, %d grades, %d attendance, "
                 "%d exams, %d letter_grades, %d transcript",
@@ -188,19 +191,16 @@ def refresh_external_sessions() -> None:
     logger.info("STARS login attempt for owner %s...", owner_id)
     result = stars.start_login(owner_id, stars_user, stars_pass)
     if result.get("status") == "sms_sent":
-        for _attempt in range(4):
-            # NOTE: sync sleep is OK here — runs either at startup (before event loop)
-            # or via asyncio.to_thread() in notification_service (separate thread).
-            time.sleep(5)
-            code = webmail.fetch_stars_verification_code(max_age_seconds=60)
-            if code:
-                verify = stars.verify_sms(owner_id, code)
-                if verify.get("status") == "ok":
-                    logger.info("STARS login OK for owner %s", owner_id)
-                    _populate_stars_cache(stars, owner_id)
-                else:
-                    logger.warning("STARS verify failed: %s", verify.get("message", ""))
-                break
+        # NOTE: blocking wait is OK here — runs either at startup (before event loop)
+        # or via asyncio.to_thread() in notification_service (separate thread).
+        code = webmail.wait_for_stars_verification_code(timeout=20, max_age_seconds=60)
+        if code:
+            verify = stars.verify_sms(owner_id, code)
+            if verify.get("status") == "ok":
+                logger.info("STARS login OK for owner %s", owner_id)
+                _populate_stars_cache(stars, owner_id)
+            else:
+                logger.warning("STARS verify failed: %s", verify.get("message", ""))
         else:
             logger.warning("STARS verification code not received within 20s")
     elif result.get("status") == "ok":
@@ -237,6 +237,15 @@ def _initialize_components() -> None:
     STATE.llm_router = LLMRouter()
     logger.info("Tool registry and LLM router initialized")
 
+    if CONFIG.semantic_cache_enabled:
+        STATE.semantic_cache = SemanticCache(
+            core_config.data_dir / "semantic_cache.npz",
+            threshold=CONFIG.semantic_cache_threshold,
+            max_entries=CONFIG.semantic_cache_max_entries,
+            ttl_seconds=CONFIG.semantic_cache_ttl_hours * 3600,
+        )
+        STATE.semantic_cache.load()
+
     # Initial login for webmail + STARS (also runs hourly via notification job)
     refresh_external_sessions()
 
@@ -248,9 +257,22 @@ def _initialize_components() -> None:
         logger.warning("Moodle connection failed, running with cached materials only.")
 
 
+async def _post_shutdown(app: Application) -> None:
+    """Persist in-memory caches before the process exits."""
+    await asyncio.to_thread(cache_db.flush_queued_queries)
+    if STATE.semantic_cache is not None:
+        await asyncio.to_thread(STATE.semantic_cache.save)
+
+
 def create_application() -> Application:
     """Build and configure Telegram application with modular handlers."""
-    app = Application.builder().token(CONFIG.telegram_bot_token).post_init(post_init).build()
+    app = (
+        Application.builder()
+        .token(CONFIG.telegram_bot_token)
+        .post_init(post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
     register_command_handlers(app)
     register_message_handlers(app)
     register_notification_jobs(app)
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any
+
 from telegram import Update
 from telegram.error import TelegramError
+from telegram.ext import ContextTypes
 
 from bot.config import CONFIG
 
@@ -26,12 +31,40 @@ async def admin_only(update: Update) -> bool:
     if is_admin_user(user.id):
         return True
 
+    await _deny(update)
+    return False
+
+
+async def _deny(update: Update) -> None:
+    """Tell a non-admin user the command is restricted."""
     message = update.effective_message
     if message is None:
-        return False
-
+        return
     try:
         await message.reply_text("Bu komut sadece admin kullanıcılar için kullanılabilir.")
     except TelegramError:
-        return False
-    return False
+        pass
+
+
+Handler = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[Any]]
+
+
+def admin_required(handler: Handler) -> Handler:
+    """
+    Decorator form of admin_only for handlers.
+
+    The admin check is synchronous, so allowed calls go straight into the
+    handler; only a denial awaits the reply.
+    """
+
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Any:
+        user = update.effective_user
+        if user is None:
+            return None
+        if not is_admin_user(user.id):
+            await _deny(update)
+            return None
+        return await handler(update, context)
+
+    return wrapper
@@ -22,6 +22,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import re
 import time
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
@@ -30,11 +31,15 @@ from telegram import Message
 from telegram.error import TelegramError
 
 from bot.services import user_service
+from bot.services.rag_service import run_rag
 from bot.state import STATE
+from bot.utils.formatters import MESSAGE_EDITOR, TELEGRAM_MESSAGE_LIMIT, send_text
 from core import cache_db
 
 if TYPE_CHECKING:
-    pass
+    import numpy as np
+
+    from bot.services.user_service import CourseSelection
 
 logger = logging.getLogger(__name__)
 
@@ -78,57 +83,119 @@ def _check_instant_response(text: str) -> str | None:
     return None
 
 
-# ─── Smart Model Selection ───────────────────────────────────────────────────
-
-_COMPLEXITY_KEYWORDS = {
-    "detaylı", "ayrıntılı", "derinlemesine", "kapsamlı", "analiz",
-    "karşılaştır", "compare", "explain in detail", "thoroughly",
-    "akademik durumum", "genel durum", "özet", "summary",
-    "tüm dersler", "all courses", "everything",
-    "anlat", "öğret", "açıkla", "explain", "teach",
-    "nasıl hazırlanayım", "strateji", "plan", "tavsiye",
+# Words that carry no request on their own; a message made only of these is
+# small talk ("tamam teşekkürler!", "ok hocam") and needs no tools or retrieval
+_SMALL_TALK_WORDS = frozenset(word for phrase in _INSTANT_RESPONSES for word in phrase.split()) | {
+    "okay", "çok", "hocam", "süper", "harika", "eyvallah",
 }
+_WORD_RE = re.compile(r"\w+")
+
+
+def _retrieval_worthwhile(text: str) -> bool:
+    """False for small talk and emoji-only messages: no tool, embedding or search can help."""
+    words = _WORD_RE.findall(text.lower())
+    return bool(words) and not set(words) <= _SMALL_TALK_WORDS
+
+
+def _awaits_answer(history: list[dict[str, str]]) -> bool:
+    """True if the last assistant turn ended with a question.
+
+    "tamam harika" after "Notlarını göstereyim mi?" confirms an action, so the
+    agent still needs its tools to carry it out.
+    """
+    last = next((turn["content"] for turn in reversed(history) if turn["role"] == "assistant"), "")
+    return last.rstrip().endswith("?")
+
 
+# ─── Semantic Response Cache ─────────────────────────────────────────────────
 
-def _is_complex_query(user_text: str, tool_count: int = 0) -> bool:
-    """Detect if query needs higher-quality model."""
-    text_lower = user_text.lower()
-    if tool_count >= 2:
-        return True
-    if len(user_text) > 150:
-        return True
-    if any(kw in text_lower for kw in _COMPLEXITY_KEYWORDS):
-        return True
-    return False
+# Only answers grounded purely in course material are safe to reuse; anything that
+# touched grades, mail, assignments etc. reflects live personal data.
+_CACHEABLE_TOOLS = frozenset({"get_source_map", "read_source", "study_topic", "rag_search"})
+_SEMANTIC_CACHE_MIN_LEN = 20  # short follow-ups ("devam", "daha detaylı") depend on history
+
+
+def _semantic_cache_scope(user_id: int) -> str:
+    """Cache partition: answers are reused per user and active course."""
+    active = user_service.get_active_course(user_id)
+    return f"{user_id}:{active.course_id if active else ''}"
+
+
+def _exact_cached_answer(user_id: int, user_text: str) -> str | None:
+    """Cached answer for a verbatim repeat of a question, found without embedding it."""
+    cache = STATE.semantic_cache
+    if cache is None or len(user_text.strip()) < _SEMANTIC_CACHE_MIN_LEN:
+        return None
+    return cache.get_exact(_semantic_cache_scope(user_id), user_text)
+
+
+async def _semantic_cache_key(user_id: int, user_text: str) -> tuple[str, np.ndarray] | None:
+    """Embed the query once; returns (scope, embedding) or None if caching doesn't apply."""
+    cache = STATE.semantic_cache
+    store = STATE.vector_store
+    if cache is None or store is None or len(user_text.strip()) < _SEMANTIC_CACHE_MIN_LEN:
+        return None
+    scope = _semantic_cache_scope(user_id)
+    try:
+        embedding = await run_rag(store.embed, [user_text.strip().lower()])
+    except (AttributeError, RuntimeError, ValueError) as exc:
+        logger.warning("Semantic cache embedding failed: %s", exc)
+        return None
+    return scope, embedding[0]
+
+
+def _semantic_cache_store(
+    cache_key: tuple[str, np.ndarray] | None, user_text: str, final_text: str, tools_used: list[str]
+) -> None:
+    """Remember a final answer if it only depended on course material.
+
+    Answers given without any tool call are not stored either: they come
+    from the system prompt, which carries live data (date, schedule, STARS).
+    """
+    if cache_key is None or not final_text or STATE.semantic_cache is None:
+        return
+    if not tools_used or not set(tools_used) <= _CACHEABLE_TOOLS:
+        return
+    scope, embedding = cache_key
+    STATE.semantic_cache.put(scope, user_text, embedding, final_text)
 
 
 # ─── Smart Error Messages ────────────────────────────────────────────────────
 
+_TOPIC_PATTERNS: tuple[tuple[str, str], ...] = (
+    ("not", "notlar"),
+    ("devamsızlık", "devamsızlık"),
+    ("ders program", "program"),
+    ("ödev", "ödevler"),
+    ("sınav", "sınavlar"),
+    ("mail", "mailler"),
+    ("çalış", "ders çalışma"),
+    ("anlat", "konu açıklama"),
+    ("öğret", "öğretim"),
+    ("privacy", "privacy"),
+    ("ethics", "ethics"),
+    ("güvenlik", "güvenlik"),
+)
+
+# Zero-width lookahead finds every (possibly overlapping) pattern position in one
+# pass; alternation order keeps the original list priority at each position.
+_TOPIC_RE = re.compile("(?=(" + "|".join(re.escape(p) for p, _ in _TOPIC_PATTERNS) + "))")
+_TOPIC_BY_PATTERN: dict[str, tuple[int, str]] = {p: (i, t) for i, (p, t) in enumerate(_TOPIC_PATTERNS)}
+
+
 def _extract_topic(text: str) -> str | None:
     """Extract main topic from user query for profile tracking."""
-    text_lower = text.lower()
     if len(text) < 10:
         return None
+    hits = [_TOPIC_BY_PATTERN[m.group(1)] for m in _TOPIC_RE.finditer(text.lower())]
+    return min(hits)[1] if hits else None
 
-    topic_patterns = [
-        ("not", "notlar"),
-        ("devamsızlık", "devamsızlık"),
-        ("ders program", "program"),
-        ("ödev", "ödevler"),
-        ("sınav", "sınavlar"),
-        ("mail", "mailler"),
-        ("çalış", "ders çalışma"),
-        ("anlat", "konu açıklama"),
-        ("öğret", "öğretim"),
-        ("privacy", "privacy"),
-        ("ethics", "ethics"),
-        ("güvenlik", "güvenlik"),
-    ]
-
-    for pattern, topic in topic_patterns:
-        if pattern in text_lower:
-            return topic
-    return None
+
+def _record_turn(user_id: int, user_text: str, final_text: str, active: CourseSelection | None) -> None:
+    """End-of-turn bookkeeping: conversation history plus the profile query log."""
+    user_service.add_conversation_turn(user_id, "user", user_text)
+    user_service.add_conversation_turn(user_id, "assistant", final_text)
+    cache_db.queue_query(user_id, course=active.course_id if active else None, topic=_extract_topic(user_text))
 
 
 def _smart_error(error_type: str, context: str = "", user_id: int | None = None) -> str:
@@ -284,7 +351,7 @@ Kullanıcının SON mesajı Türkçe ise yanıtın %100 Türkçe olmalı."""
 
 # ─── Language Detection ───────────────────────────────────────────────────────
 
-_TR_CHARS = set("çğıöşüÇĞİÖŞÜ")
+_TR_CHARS_RE = re.compile("[çğıöşüÇĞİÖŞÜ]")
 _EN_WORDS = {
     "show", "me", "my", "what", "how", "the", "is", "are", "do", "does",
     "can", "get", "list", "which", "from", "about", "please", "tell",
@@ -295,7 +362,7 @@ _EN_WORDS = {
 
 def _detect_language(text: str) -> str:
     """Detect if user message is English or Turkish. Returns 'en' or 'tr'."""
-    if any(c in _TR_CHARS for c in text):
+    if _TR_CHARS_RE.search(text):
         return "tr"
     words = set(text.lower().split())
     en_matches = len(words & _EN_WORDS)
@@ -304,6 +371,45 @@ def _detect_language(text: str) -> str:
     return "tr"
 
 
+# ─── Typing Indicator ────────────────────────────────────────────────────────
+
+# Telegram keeps "typing…" visible for ~5s per action; concurrent requests for
+# the same chat share that window instead of each sending their own action
+_TYPING_REFRESH_SECONDS = 5.0
+_TYPING_LAST_SENT: dict[int, float] = {}
+
+
+def _claim_typing_window(chat_id: int) -> bool:
+    """Reserve the chat's typing window; False if an action is still visible."""
+    now = time.monotonic()
+    if now - _TYPING_LAST_SENT.get(chat_id, 0.0) < _TYPING_REFRESH_SECONDS:
+        return False
+    _TYPING_LAST_SENT[chat_id] = now
+    return True
+
+
+async def _send_typing_action(message: Message) -> None:
+    try:
+        await message.chat.send_action("typing")
+    except TelegramError:
+        _TYPING_LAST_SENT.pop(message.chat_id, None)
+
+
+_TYPING_TASKS: set[asyncio.Task] = set()  # strong refs until each send finishes
+
+
+def start_typing(message: Message) -> None:
+    """Show the typing indicator for the message's chat, at most once per refresh window.
+
+    The action is sent from a background task, so the caller's work starts at once.
+    """
+    if not _claim_typing_window(message.chat_id):
+        return
+    task = asyncio.create_task(_send_typing_action(message))
+    _TYPING_TASKS.add(task)
+    task.add_done_callback(_TYPING_TASKS.discard)
+
+
 # ─── Progressive Send ────────────────────────────────────────────────────────
 
 async def _send_progressive(message: Message, text: str) -> None:
@@ -315,6 +421,11 @@ async def _send_progressive(message: Message, text: str) -> None:
         await message.reply_text(text, parse_mode="Markdown")
         return
 
+    # Too long for one message: progressive edits would fail, send in parts
+    if len(text) > TELEGRAM_MESSAGE_LIMIT:
+        await send_text(message, text)
+        return
+
     chunk_size = max(50, len(text) // 5)
     sent_msg = None
 
@@ -323,16 +434,15 @@ async def _send_progressive(message: Message, text: str) -> None:
             partial = text[: i + chunk_size]
             if sent_msg is None:
                 sent_msg = await message.reply_text(partial, parse_mode=None)
+                MESSAGE_EDITOR.touch(sent_msg)
             else:
-                try:
-                    await sent_msg.edit_text(partial, parse_mode=None)
-                except TelegramError:
-                    pass
+                # Debounced per chat: rapid partials collapse into one edit
+                await MESSAGE_EDITOR.edit(sent_msg, partial, parse_mode=None)
             await asyncio.sleep(0.15)
 
         if sent_msg:
             try:
-                await sent_msg.edit_text(text, parse_mode="Markdown")
+                await MESSAGE_EDITOR.flush(sent_msg, text, parse_mode="Markdown")
             except TelegramError:
                 try:
                     await sent_msg.edit_text(text, parse_mode=None)
@@ -402,6 +512,32 @@ async def handle_agent_message(
     if router is None or registry is None:
         return "Sistem bileşenleri henüz hazır değil."
 
+    # get_conversation_history already returns a fresh list of {role, content}
+    # dicts that nothing mutates, so they are reused as-is
+    history = user_service.get_conversation_history(user_id)
+
+    # Small talk gets a plain LLM reply: no tools, so no embedding or vector
+    # search, unless it answers an offer the assistant just made
+    needs_retrieval = _retrieval_worthwhile(user_text) or _awaits_answer(history)
+
+    # Cached answers are keyed by the question alone, so only a conversation's
+    # opening question may reuse or seed one: a follow-up worded like an
+    # earlier question means something else once there are prior turns
+    cacheable = needs_retrieval and not history
+
+    # Semantic cache: verbatim repeat (no embedding) or near-duplicate question
+    # already answered → skip the LLM
+    cached = _exact_cached_answer(user_id, user_text) if cacheable else None
+    cache_key = None
+    if cached is None and cacheable:
+        cache_key = await _semantic_cache_key(user_id, user_text)
+        if cache_key is not None:
+            cached = STATE.semantic_cache.get(*cache_key)
+    if cached:
+        user_service.add_conversation_turn(user_id, "user", user_text)
+        user_service.add_conversation_turn(user_id, "assistant", cached)
+        return cached
+
     t_start = time.time()
     system_prompt = _build_system_prompt(user_id)
 
@@ -410,24 +546,27 @@ async def handle_agent_message(
     if lang == "en":
         system_prompt += "\n\n[LANGUAGE OVERRIDE] The user's current message is in ENGLISH. You MUST respond entirely in English."
 
-    available_tools = registry.get_definitions()
+    available_tools = registry.get_definitions() if needs_retrieval else []
 
-    history = user_service.get_conversation_history(user_id)
-    messages: list[dict[str, Any]] = []
-    for turn in history:
-        messages.append({"role": turn["role"], "content": turn["content"]})
-    messages.append({"role": "user", "content": user_text})
+    messages: list[dict[str, Any]] = [*history, {"role": "user", "content": user_text}]
 
-    is_complex = _is_complex_query(user_text)
     tools_used: list[str] = []
 
+    if message and not available_tools:
+        # Nothing to call, so the reply is the first completion: stream it
+        # instead of waiting for the whole text and replaying it
+        start_typing(message)
+        final_text = await router.stream(messages, system_prompt, message)
+        if final_text:
+            _record_turn(user_id, user_text, final_text, user_service.get_active_course(user_id))
+            logger.info("Total response time: %.2fs (streamed, no tools)", time.time() - t_start)
+            return ""
+        # Stream failed before any text arrived; fall back to the regular loop
+
     for iteration in range(MAX_TOOL_ITERATIONS):
         # Refresh typing indicator
         if message:
-            try:
-                await message.chat.send_action("typing")
-            except TelegramError:
-                pass
+            start_typing(message)
 
         try:
             t_llm = time.time()
@@ -449,18 +588,15 @@ async def handle_agent_message(
             final_text = router.sanitize_output(response_msg.content or "")
 
             if message and final_text:
+                # Reply first; the cache insert and history bookkeeping can wait
                 await _send_progressive(message, final_text)
-                user_service.add_conversation_turn(user_id, "user", user_text)
-                user_service.add_conversation_turn(user_id, "assistant", final_text)
-                active = user_service.get_active_course(user_id)
-                cache_db.track_query(user_id, course=active.course_id if active else None, topic=_extract_topic(user_text))
+                _semantic_cache_store(cache_key, user_text, final_text, tools_used)
+                _record_turn(user_id, user_text, final_text, user_service.get_active_course(user_id))
                 logger.info("Total response time: %.2fs (progressive)", time.time() - t_start)
                 return ""
 
-            user_service.add_conversation_turn(user_id, "user", user_text)
-            user_service.add_conversation_turn(user_id, "assistant", final_text)
-            active = user_service.get_active_course(user_id)
-            cache_db.track_query(user_id, course=active.course_id if active else None, topic=_extract_topic(user_text))
+            _semantic_cache_store(cache_key, user_text, final_text, tools_used)
+            _record_turn(user_id, user_text, final_text, user_service.get_active_course(user_id))
             logger.info("Total response time: %.2fs (no tools)", time.time() - t_start)
             return final_text
 
@@ -481,10 +617,7 @@ async def handle_agent_message(
 
         # Refresh typing before tool execution
         if message:
-            try:
-                await message.chat.send_action("typing")
-            except TelegramError:
-                pass
+            start_typing(message)
 
         t_tools = time.time()
         tool_results = await asyncio.gather(
@@ -503,10 +636,7 @@ async def handle_agent_message(
 
     # Max iterations exceeded — stream final response
     if message:
-        try:
-            await message.chat.send_action("typing")
-        except TelegramError:
-            pass
+        start_typing(message)
 
     try:
         if message:
@@ -515,8 +645,7 @@ async def handle_agent_message(
             if final_text:
                 logger.info("Streaming response: %.2fs", time.time() - t_stream)
                 logger.info("Total response time: %.2fs (streamed)", time.time() - t_start)
-                user_service.add_conversation_turn(user_id, "user", user_text)
-                user_service.add_conversation_turn(user_id, "assistant", final_text)
+                _record_turn(user_id, user_text, final_text, user_service.get_active_course(user_id))
                 return ""
 
         # Non-streaming fallback
@@ -525,16 +654,7 @@ async def handle_agent_message(
     except Exception:
         final_text = "İşlem zaman aşımına uğradı. Lütfen tekrar deneyin."
 
-    user_service.add_conversation_turn(user_id, "user", user_text)
-    user_service.add_conversation_turn(user_id, "assistant", final_text)
-
-    active = user_service.get_active_course(user_id)
-    cache_db.track_query(
-        user_id,
-        course=active.course_id if active else None,
-        topic=_extract_topic(user_text),
-    )
-
+    _record_turn(user_id, user_text, final_text, user_service.get_active_course(user_id))
     logger.info("Total response time: %.2fs (with tools)", time.time() - t_start)
     return final_text
 
@@ -13,13 +13,16 @@ class _MemoryBucket:
 
     messages: list[dict[str, str]]
     updated_at: datetime
+    total_chars: int = 0
 
 
 class ConversationMemory:
     """
-    Keep the last N messages per user.
+    Keep the last N messages per user, within a per-user character budget.
 
-    Buckets expire after `ttl_minutes` of inactivity.
+    Buckets expire after `ttl_minutes` of inactivity. Single messages are
+    truncated to `max_message_chars`; oldest messages are dropped while the
+    bucket exceeds `max_total_chars`, so a long paste can't bloat LLM context.
     """
 
     def __init__(
@@ -27,9 +30,13 @@ class ConversationMemory:
         max_messages: int = 5,
         ttl_minutes: int = 30,
         now_provider: Callable[[], datetime] | None = None,
+        max_total_chars: int = 8000,
+        max_message_chars: int = 2000,
     ) -> None:
         """Initialize memory with bounded size and TTL."""
         self.max_messages = max_messages
+        self.max_total_chars = max_total_chars
+        self.max_message_chars = max_message_chars
         self.ttl = timedelta(minutes=ttl_minutes)
         self._now = now_provider or (lambda: datetime.now(timezone.utc))
         self._storage: dict[int, _MemoryBucket] = {}
@@ -46,9 +53,17 @@ class ConversationMemory:
             bucket = _MemoryBucket(messages=[], updated_at=now)
             self._storage[user_id] = bucket
 
+        if len(content) > self.max_message_chars:
+            content = content[: self.max_message_chars]
         bucket.messages.append({"role": role, "content": content})
-        if len(bucket.messages) > self.max_messages:
-            bucket.messages = bucket.messages[-self.max_messages :]
+        bucket.total_chars += len(content)
+
+        # Drop oldest messages past the count or character budget (keep the newest)
+        excess = len(bucket.messages) - self.max_messages
+        while len(bucket.messages) > 1 and (excess > 0 or bucket.total_chars > self.max_total_chars):
+            bucket.total_chars -= len(bucket.messages[0]["content"])
+            del bucket.messages[0]
+            excess -= 1
         bucket.updated_at = now
 
     def get_history(self, user_id: int) -> list[dict[str, str]]:
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import re
 from pathlib import Path
 
 from bot.services import user_service
@@ -12,37 +12,44 @@ from bot.state import STATE
 logger = logging.getLogger(__name__)
 
 
-def _normalize(text: str) -> str:
-    """Normalize text for fuzzy filename/course matching."""
-    return re.sub(r"[\W_]+", "", text.casefold())
-
-
 def detect_course(filename: str) -> str | None:
     """Infer course name from filename using known Moodle course labels."""
-    normalized_name = _normalize(filename)
-    for course in user_service.list_courses():
-        short = _normalize(course.short_name)
-        display = _normalize(course.display_name)
-        if short and short in normalized_name:
-            return course.course_id
-        if display and display in normalized_name:
-            return course.course_id
-    return None
-
-
-def index_uploaded_file(file_path: Path, course_name: str, filename: str) -> int:
-    """Process uploaded file, add chunks to vector store, then generate summary."""
+    course = user_service.find_course_in(filename)
+    return course.course_id if course is not None else None
+
+
+async def index_uploaded_file(file_path: Path, course_name: str, filename: str) -> int:
+    """
+    Process uploaded file, add chunks to vector store, then generate summary.
+
+    Embedding (local CPU) and the teaching summary (LLM round trip) only share
+    the chunk list, so they run side by side in worker threads instead of one
+    after the other.
+    """
     processor = STATE.processor
     vector_store = STATE.vector_store
     if processor is None or vector_store is None:
         raise RuntimeError("Document pipeline is not initialized.")
 
-    chunks = processor.process_file(file_path=file_path, course_name=course_name, module_name=filename)
+    chunks = await asyncio.to_thread(
+        processor.process_file, file_path=file_path, course_name=course_name, module_name=filename
+    )
     if not chunks:
         return 0
-    vector_store.add_chunks(chunks)
 
-    # KATMAN 2: Generate teaching summary for newly uploaded file
+    await asyncio.gather(
+        asyncio.to_thread(vector_store.add_chunks, chunks),
+        asyncio.to_thread(_summarize_upload, filename, course_name, chunks),
+    )
+
+    # Cached answers may predate this material
+    if STATE.semantic_cache is not None:
+        STATE.semantic_cache.clear()
+    return len(chunks)
+
+
+def _summarize_upload(filename: str, course_name: str, chunks: list) -> None:
+    """KATMAN 2: Generate teaching summary for newly uploaded file."""
     try:
         from bot.services.summary_service import generate_source_summary, summary_exists
 
@@ -53,5 +60,3 @@ def index_uploaded_file(file_path: Path, course_name: str, filename: str) -> int
                 logger.info("Summary generated for uploaded file: %s", filename)
     except Exception as exc:
         logger.warning("Summary generation skipped for %s: %s", filename, exc)
-
-    return len(chunks)
@@ -22,6 +22,8 @@ from litellm import Router
 from telegram import Message
 from telegram.error import TelegramError
 
+from bot.utils.formatters import MESSAGE_EDITOR, TELEGRAM_MESSAGE_LIMIT, iter_message_chunks, send_text
+
 if TYPE_CHECKING:
     pass
 
@@ -29,9 +31,9 @@ logger = logging.getLogger(__name__)
 
 __all__ = ["LLMRouter"]
 
-# DeepSeek V3 sometimes leaks internal control tokens
-_DEEPSEEK_LEAK_RE = re.compile(r"<｜[A-Z]+｜[^>]*>")
-_CONTROL_TAG_RE = re.compile(r"<\|[a-z_]+\|>")
+# DeepSeek V3 sometimes leaks internal control tokens (<｜...｜...> or <|tag|>);
+# one alternation so every reply is scanned once
+_CONTROL_TOKEN_RE = re.compile(r"<｜[A-Z]+｜[^>]*>|<\|[a-z_]+\|>")
 
 # Stream edit interval for Telegram
 _STREAM_EDIT_INTERVAL = 1.0
@@ -107,9 +109,7 @@ class LLMRouter:
         """Strip internal model control tokens from LLM output."""
         if not text:
             return text
-        text = _DEEPSEEK_LEAK_RE.sub("", text)
-        text = _CONTROL_TAG_RE.sub("", text)
-        return text.strip()
+        return _CONTROL_TOKEN_RE.sub("", text).strip()
 
     async def complete(
         self,
@@ -173,7 +173,7 @@ class LLMRouter:
             message: Telegram message to reply to
 
         Returns:
-            Accumulated response text
+            Accumulated response text, passed through sanitize_output
         """
         router = self._ensure_router()
 
@@ -191,6 +191,7 @@ class LLMRouter:
             logger.error("LiteLLM streaming failed: %s", exc)
             return ""
 
+        parts: list[str] = []  # joined only when an edit is due, not per delta
         accumulated = ""
         sent_msg = None
         last_edit = 0.0
@@ -199,32 +200,45 @@ class LLMRouter:
             async for chunk in stream:
                 delta = chunk.choices[0].delta if chunk.choices else None
                 if delta and delta.content:
-                    accumulated += delta.content
+                    parts.append(delta.content)
 
                 now = time.monotonic()
-                if accumulated and (now - last_edit) >= _STREAM_EDIT_INTERVAL:
+                if parts and (now - last_edit) >= _STREAM_EDIT_INTERVAL:
+                    accumulated = "".join(parts)
+                    # Past the limit the live preview just stops growing;
+                    # the overflow is sent as follow-up messages at the end
+                    preview = accumulated[:TELEGRAM_MESSAGE_LIMIT]
                     try:
                         if sent_msg is None:
-                            sent_msg = await message.reply_text(accumulated, parse_mode=None)
+                            sent_msg = await message.reply_text(preview, parse_mode=None)
+                            MESSAGE_EDITOR.touch(sent_msg)
                         else:
-                            await sent_msg.edit_text(accumulated, parse_mode=None)
+                            await MESSAGE_EDITOR.edit(sent_msg, preview, parse_mode=None)
                         last_edit = now
                     except TelegramError:
                         pass
 
+            # Control tokens may show in the live preview; the final edit and
+            # the returned text (stored in history) are cleaned
+            accumulated = self.sanitize_output("".join(parts))
             # Final edit with Markdown formatting
             if accumulated and sent_msg is not None:
+                head = next(iter_message_chunks(accumulated))
                 try:
-                    await sent_msg.edit_text(accumulated, parse_mode="Markdown")
+                    await MESSAGE_EDITOR.flush(sent_msg, head, parse_mode="Markdown")
                 except TelegramError:
                     try:
-                        await sent_msg.edit_text(accumulated, parse_mode=None)
+                        await sent_msg.edit_text(head, parse_mode=None)
                     except TelegramError:
                         pass
+                rest = accumulated[len(head):]
+                if rest.strip():
+                    await send_text(message, rest)
             elif accumulated and sent_msg is None:
-                await message.reply_text(accumulated, parse_mode="Markdown")
+                await send_text(message, accumulated)
         except Exception as exc:
             logger.warning("Streaming failed, falling back: %s", exc)
+            accumulated = self.sanitize_output("".join(parts))
             if not accumulated:
                 return ""
 
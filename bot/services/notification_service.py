@@ -17,6 +17,7 @@ Job schedule:
   session_refresh    — 24 h    (re-login webmail + STARS once per day)
   summary_generation — 60 min  (KATMAN 2 source summaries)
   material_sync      — 30 min  (Moodle → vector store, auto-index new materials)
+  profile_flush      — 10 sec  (buffered per-message profile tracking → SQLite)
 
 Architecture: Cache-first reads. User queries read from SQLite (instant).
 Background sync updates cache every 30 sec for emails, 1 min for STARS.
@@ -27,16 +28,24 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import random
 import re
 import time
+from collections import deque
+from collections.abc import Iterator
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
 from telegram.ext import Application, ContextTypes
 
 from bot.config import CONFIG
 from bot.state import STATE
+from bot.utils.formatters import MESSAGE_SENDER, TELEGRAM_MESSAGE_LIMIT, escape_html, format_due
 from core import cache_db
 
+if TYPE_CHECKING:
+    from core.stars_client import StarsCache
+
 logger = logging.getLogger(__name__)
 
 OWNER_ID = CONFIG.owner_id
@@ -98,19 +107,33 @@ _ABSENCE_PATTERNS = [
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
-def _load_known_assignment_ids() -> set[str]:
-    """Load persisted assignment IDs from cache (survives restart)."""
+_KNOWN_ASSIGNMENT_IDS_MAX = 500  # oldest notified IDs drop off; far more than a 14-day window holds
+
+
+def _load_known_assignment_ids() -> deque[str]:
+    """Load persisted assignment IDs from cache (survives restart), oldest first."""
     data = cache_db.get_json("known_assignment_ids", OWNER_ID)
-    if data and isinstance(data, list):
-        return set(data)
-    return set()
+    return deque(data if isinstance(data, list) else (), maxlen=_KNOWN_ASSIGNMENT_IDS_MAX)
 
 
-def _save_known_assignment_ids(ids: set[str]) -> None:
-    """Persist assignment IDs to cache."""
+def _save_known_assignment_ids(ids: deque[str]) -> None:
+    """Persist assignment IDs to cache in notification order."""
     cache_db.set_json("known_assignment_ids", OWNER_ID, list(ids))
 
 
+def _stars_cache_items(cache: StarsCache) -> dict[str, list | dict]:
+    """cache_db keys for one StarsCache snapshot."""
+    return {
+        "schedule": cache.schedule,
+        "grades": cache.grades,
+        "attendance": cache.attendance,
+        "exams": cache.exams,
+        "letter_grades": cache.letter_grades,
+        "transcript": cache.transcript,
+        "user_info": cache.user_info,
+    }
+
+
 def _serialize_assignments(assignments: list) -> list[dict]:
     """Convert assignment objects → JSON-serializable dicts."""
     result = []
@@ -125,15 +148,16 @@ def _serialize_assignments(assignments: list) -> list[dict]:
     return result
 
 
-def _grade_keys(grades: list[dict]) -> set[tuple]:
-    """Build set of (course, assessment_name) tuples that have a non-empty grade."""
-    keys = set()
+def _graded_assessments(grades: list[dict]) -> dict[tuple[str, str], str]:
+    """Map (course, assessment_name) → grade for every assessment with a non-empty grade."""
+    graded = {}
     for course in grades or []:
         cname = course.get("course", "")
         for a in course.get("assessments", []):
-            if a.get("grade"):
-                keys.add((cname, a.get("name", "")))
-    return keys
+            grade = a.get("grade")
+            if grade:
+                graded[(cname, a.get("name", ""))] = grade
+    return graded
 
 
 def _attendance_ratios(attendance: list[dict]) -> dict[str, float]:
@@ -150,6 +174,7 @@ def _attendance_ratios(attendance: list[dict]) -> dict[str, float]:
 
 
 _COURSE_CODE_RE = re.compile(r"^([A-Z]{2,}\s*\d{3}[A-Z]?)\b")
+_SYLLABUS_FILE_RE = re.compile(r"syllabus|course[_ ]details", re.IGNORECASE)
 
 
 def _short_course_code(course_name: str) -> str:
@@ -214,7 +239,7 @@ def _extract_syllabus_attendance_limit(course_name: str) -> int | None:
         files = store.get_files_for_course(short_code)
         syllabus_files = [
             f for f in files
-            if any(kw in f.get("filename", "").lower() for kw in ["syllabus", "course_details", "course details"])
+            if _SYLLABUS_FILE_RE.search(f.get("filename", ""))
         ]
         for sf in syllabus_files:
             chunks = store.get_file_chunks(sf["filename"], max_chunks=20)
@@ -272,14 +297,44 @@ def _count_absences(records: list[dict]) -> int:
 
 
 async def _send(context: ContextTypes.DEFAULT_TYPE, text: str) -> None:
+    """Send an HTML notification; every interpolated field must go through escape_html.
+
+    Goes through the per-chat send queue so jobs finishing together don't
+    trip Telegram's flood limit.
+    """
     try:
-        await context.bot.send_message(
-            chat_id=OWNER_ID, text=text, parse_mode="Markdown"
-        )
+        await MESSAGE_SENDER.send(context.bot, OWNER_ID, text, parse_mode="HTML")
     except Exception as exc:
         logger.error("Notification send failed: %s", exc)
 
 
+def _pack_notification(header: str, items: list[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> Iterator[str]:
+    """Greedily pack notification items under `header` into as few messages as fit the limit.
+
+    Yields each message as soon as it is full, so the first one can be sent
+    before the rest are packed.
+    """
+    parts = [header]
+    size = len(header)
+    max_item = limit - len(header) - 1  # a single oversized item still fits alone
+    for item in items:
+        item = item[:max_item]
+        if size + 1 + len(item) > limit and len(parts) > 1:
+            yield "\n".join(parts)
+            parts = [header]
+            size = len(header)
+        parts.append(item)
+        size += 1 + len(item)
+    if len(parts) > 1:
+        yield "\n".join(parts)
+
+
+async def _send_batched(context: ContextTypes.DEFAULT_TYPE, header: str, items: list[str]) -> None:
+    """Send a multi-item notification as the fewest Telegram messages possible."""
+    for batch in _pack_notification(header, items):
+        await _send(context, batch)
+
+
 # ─── Jobs ─────────────────────────────────────────────────────────────────────
 
 async def _check_new_assignments(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -306,6 +361,7 @@ async def _check_new_assignments(context: ContextTypes.DEFAULT_TYPE) -> None:
     now = time.time()
     # Load persisted IDs (survives bot restart)
     known_ids = _load_known_assignment_ids()
+    known_set = set(known_ids)
 
     # Detect truly new upcoming assignments (not yet seen, not expired, due within 14d)
     notify_window = now + 14 * 86400
@@ -316,32 +372,34 @@ async def _check_new_assignments(context: ContextTypes.DEFAULT_TYPE) -> None:
         if a.due_date < now or a.due_date > notify_window:
             continue
         aid = f"{a.course_name}_{a.name}"
-        if aid not in known_ids:
-            known_ids.add(aid)
+        if aid not in known_set:
+            known_set.add(aid)
+            known_ids.append(aid)  # bounded: evicts the oldest ID once full
             new_assignments.append(a)
 
-    # Persist updated set (even if no new — handles expired cleanup)
-    _save_known_assignment_ids(known_ids)
-
     if not new_assignments:
         return
+    _save_known_assignment_ids(known_ids)
 
-    lines = ["📋 *Yeni Ödev Bildirimi*\n"]
+    items = []
     for a in new_assignments:
         # Format due date as human-readable
         due_str = "?"
         if hasattr(a, "due_date") and a.due_date > 0:
-            due_dt = datetime.fromtimestamp(a.due_date)
-            due_str = due_dt.strftime("%d/%m/%Y %H:%M")
+            due_str = format_due(a.due_date)
         remaining = a.time_remaining if hasattr(a, "time_remaining") else ""
-        lines.append(f"• *{a.course_name}* — {a.name}\n  Teslim: {due_str}")
+        item = f"• <b>{escape_html(a.course_name)}</b> — {escape_html(a.name)}\n  Teslim: {due_str}"
         if remaining:
-            lines.append(f"  Kalan: {remaining}")
+            item += f"\n  Kalan: {escape_html(remaining)}"
+        items.append(item)
 
-    await _send(context, "\n".join(lines))
+    await _send_batched(context, "📋 <b>Yeni Ödev Bildirimi</b>\n", items)
     logger.info("Assignment notification sent: %d new", len(new_assignments))
 
 
+_MAIL_NOTIFICATION_HEADER = "📧 <b>Yeni Mail Bildirimi</b>\n"
+
+
 async def _check_new_emails(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Check for new AIRS/DAIS emails → notify + cache."""
     webmail = STATE.webmail_client
@@ -349,7 +407,7 @@ async def _check_new_emails(context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     try:
-        new_mails = webmail.check_new_airs_dais()
+        new_mails = await asyncio.to_thread(webmail.check_new_airs_dais)
     except (ConnectionError, RuntimeError, OSError, ValueError, TypeError) as exc:
         logger.error("Notification: email check failed: %s", exc)
         return
@@ -360,14 +418,12 @@ async def _check_new_emails(context: ContextTypes.DEFAULT_TYPE) -> None:
     if not new_mails:
         return
 
-    lines = ["📧 *Yeni Mail Bildirimi*\n"]
-    for m in new_mails[:5]:
-        subject = m.get("subject", "Konusuz")
-        source = m.get("source", "")
-        date = m.get("date", "")
-        lines.append(f"• [{source}] *{subject}*\n  {date}")
-
-    await _send(context, "\n".join(lines))
+    items = [
+        f"• [{escape_html(m.get('source', ''))}] <b>{escape_html(m.get('subject', 'Konusuz'))}</b>\n"
+        f"  {escape_html(m.get('date', ''))}"
+        for m in new_mails
+    ]
+    await _send_batched(context, _MAIL_NOTIFICATION_HEADER, items)
     logger.info("Email notification sent: %d new mails", len(new_mails))
 
 
@@ -383,9 +439,8 @@ async def _sync_email_cache(context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     try:
-        # Get existing UIDs from cache
-        cached = cache_db.get_emails(1000) or []
-        existing_uids = {m["uid"] for m in cached if m.get("uid")}
+        # Get existing UIDs from cache (off the event loop: this job runs every 30s)
+        existing_uids = await asyncio.to_thread(cache_db.get_email_uids)
 
         # Sync with IMAP — only fetches body for NEW emails
         new_mails, all_current_uids = await asyncio.to_thread(
@@ -394,20 +449,17 @@ async def _sync_email_cache(context: ContextTypes.DEFAULT_TYPE) -> None:
 
         # Store new emails (mark as unread)
         if new_mails:
-            stored = cache_db.store_emails(new_mails, mark_read=False)
+            stored = await asyncio.to_thread(cache_db.store_emails, new_mails, False)
             logger.info("Email sync: %d new mails cached", stored)
 
         # Send notification for new emails (skip first sync when cache was empty)
         if new_mails and existing_uids:
-            lines = ["📧 *Yeni Mail Bildirimi*\n"]
-            for m in new_mails[:5]:
-                subject = m.get("subject", "Konusuz")
-                source = m.get("source", "")
-                from_addr = m.get("from", "")
-                lines.append(f"• [{source}] *{subject}*\n  Kimden: {from_addr}")
-            if len(new_mails) > 5:
-                lines.append(f"\n... ve {len(new_mails) - 5} mail daha")
-            await _send(context, "\n".join(lines))
+            items = [
+                f"• [{escape_html(m.get('source', ''))}] <b>{escape_html(m.get('subject', 'Konusuz'))}</b>\n"
+                f"  Kimden: {escape_html(m.get('from', ''))}"
+                for m in new_mails
+            ]
+            await _send_batched(context, _MAIL_NOTIFICATION_HEADER, items)
             logger.info("Email notification sent: %d new mails", len(new_mails))
 
     except (ConnectionError, RuntimeError, OSError, ValueError, TypeError) as exc:
@@ -422,10 +474,6 @@ async def _sync_grades(context: ContextTypes.DEFAULT_TYPE) -> None:
     if stars is None or not stars.is_authenticated(OWNER_ID):
         return
 
-    # Snapshot previous grades for change detection
-    prev = cache_db.get_json("grades", OWNER_ID)
-    prev_keys = _grade_keys(prev)
-
     try:
         grades = await asyncio.to_thread(stars.get_grades, OWNER_ID)
     except (ConnectionError, RuntimeError, OSError, ValueError) as exc:
@@ -435,24 +483,28 @@ async def _sync_grades(context: ContextTypes.DEFAULT_TYPE) -> None:
     if not grades:
         return
 
+    # Snapshot previous grades for change detection (only once there is
+    # something to compare: failed or empty fetches skip the cache read)
+    prev_graded = _graded_assessments(cache_db.get_json("grades", OWNER_ID))
+
     # Cache refresh
     cache_db.set_json("grades", OWNER_ID, grades)
     logger.debug("Grades cached: %d courses", len(grades))
 
-    # Notify for new grade entries
-    new_keys = _grade_keys(grades)
-    truly_new = new_keys - prev_keys
+    # Notify for new grade entries (one pass; dict order follows the STARS list)
+    truly_new = [
+        (cname, name, grade)
+        for (cname, name), grade in _graded_assessments(grades).items()
+        if (cname, name) not in prev_graded
+    ]
     if not truly_new:
         return
 
-    lines = ["📊 *Yeni Not Girişi*\n"]
-    for course in grades:
-        cname = course.get("course", "")
-        for a in course.get("assessments", []):
-            if (cname, a.get("name", "")) in truly_new:
-                lines.append(
-                    f"• *{cname}* — {a.get('name', '')}: *{a.get('grade', '')}*"
-                )
+    lines = ["📊 <b>Yeni Not Girişi</b>\n"]
+    lines.extend(
+        f"• <b>{escape_html(cname)}</b> — {escape_html(name)}: <b>{escape_html(grade)}</b>"
+        for cname, name, grade in truly_new
+    )
 
     await _send(context, "\n".join(lines))
     logger.info("Grade notification sent: %d new entries", len(truly_new))
@@ -471,7 +523,16 @@ async def _sync_attendance(context: ContextTypes.DEFAULT_TYPE) -> None:
     if stars is None or not stars.is_authenticated(OWNER_ID):
         return
 
-    # Snapshot previous state for change detection
+    try:
+        attendance = await asyncio.to_thread(stars.get_attendance, OWNER_ID)
+    except (ConnectionError, RuntimeError, OSError, ValueError) as exc:
+        logger.error("Attendance sync failed: %s", exc)
+        return
+
+    if not attendance:
+        return
+
+    # Snapshot previous state for change detection (skipped when the fetch fails)
     prev = cache_db.get_json("attendance", OWNER_ID)
     prev_ratios = _attendance_ratios(prev)
     prev_abs_counts: dict[str, int] = {
@@ -482,15 +543,6 @@ async def _sync_attendance(context: ContextTypes.DEFAULT_TYPE) -> None:
     # Load cached syllabus limits {course_name: max_hours}
     syllabus_limits: dict[str, int] = cache_db.get_json("syllabus_limits", OWNER_ID) or {}
 
-    try:
-        attendance = await asyncio.to_thread(stars.get_attendance, OWNER_ID)
-    except (ConnectionError, RuntimeError, OSError, ValueError) as exc:
-        logger.error("Attendance sync failed: %s", exc)
-        return
-
-    if not attendance:
-        return
-
     # Cache refresh
     cache_db.set_json("attendance", OWNER_ID, attendance)
     logger.debug("Attendance cached: %d courses", len(attendance))
@@ -516,13 +568,13 @@ async def _sync_attendance(context: ContextTypes.DEFAULT_TYPE) -> None:
 
             if crossed_crit:
                 warnings.append(
-                    f"🚨 *{course}*: {absent_now}/{limit} saat devamsızlık — "
-                    f"yalnızca *{remaining} saat* kaldı! KRİTİK!"
+                    f"🚨 <b>{escape_html(course)}</b>: {absent_now}/{limit} saat devamsızlık — "
+                    f"yalnızca <b>{remaining} saat</b> kaldı! KRİTİK!"
                 )
             elif crossed_warn:
                 warnings.append(
-                    f"⚠️ *{course}*: {absent_now}/{limit} saat devamsızlık — "
-                    f"*{remaining} saat* kaldı."
+                    f"⚠️ <b>{escape_html(course)}</b>: {absent_now}/{limit} saat devamsızlık — "
+                    f"<b>{remaining} saat</b> kaldı."
                 )
         else:
             # ── Fallback: ratio-based (existing logic) ───────────────
@@ -534,13 +586,13 @@ async def _sync_attendance(context: ContextTypes.DEFAULT_TYPE) -> None:
             now_low = ratio < _ATTENDANCE_WARN_THRESHOLD
             if was_ok and now_low:
                 warnings.append(
-                    f"⚠️ *{course}*: %{ratio:.1f} devam oranı — limit yaklaşıyor!"
+                    f"⚠️ <b>{escape_html(course)}</b>: %{ratio:.1f} devam oranı — limit yaklaşıyor!"
                 )
 
     if not warnings:
         return
 
-    lines = ["⚠️ *Devamsızlık Uyarısı*\n"] + warnings
+    lines = ["⚠️ <b>Devamsızlık Uyarısı</b>\n"] + warnings
     await _send(context, "\n".join(lines))
     logger.info("Attendance warning sent: %d courses", len(warnings))
 
@@ -589,14 +641,8 @@ async def _stars_full_sync(context: ContextTypes.DEFAULT_TYPE) -> None:
         _STARS_CONSECUTIVE_FAILS = 0
         _track_job_success("stars_full_sync")
 
-        # 3. Write everything to SQLite cache
-        cache_db.set_json("schedule", OWNER_ID, cache.schedule)
-        cache_db.set_json("grades", OWNER_ID, cache.grades)
-        cache_db.set_json("attendance", OWNER_ID, cache.attendance)
-        cache_db.set_json("exams", OWNER_ID, cache.exams)
-        cache_db.set_json("letter_grades", OWNER_ID, cache.letter_grades)
-        cache_db.set_json("transcript", OWNER_ID, cache.transcript)
-        cache_db.set_json("user_info", OWNER_ID, cache.user_info)
+        # 3. Write everything to SQLite cache in one transaction, off the event loop
+        await asyncio.to_thread(cache_db.set_json_many, OWNER_ID, _stars_cache_items(cache))
 
         logger.debug(
             "STARS full sync OK: %d grades, %d attendance, %d exams, %d schedule",
@@ -632,23 +678,37 @@ _ROOM_PATTERNS = [
 ]
 
 
-def _find_exam_room_in_mails(course_code: str) -> str | None:
-    """Search cached emails for exam room info matching a course code."""
-    emails = cache_db.get_emails(limit=30)
-    if not emails:
-        return None
+_EXAM_KEYWORD_RE = re.compile(r"exam|sınav|midterm|final|quiz|qme", re.IGNORECASE)
+_EXAM_COURSE_CODE_RE = re.compile(r"([A-Z]{2,}\s*\d{3})")
 
-    # Exam keywords to identify relevant mails
-    exam_kw = re.compile(r"exam|sınav|midterm|final|quiz|qme", re.IGNORECASE)
-    code_pattern = re.compile(re.escape(course_code), re.IGNORECASE)
 
-    for mail in emails:
+def _exam_mail_texts() -> list[str]:
+    """Subject + body of recent cached mails that mention an exam, newest first."""
+    texts = []
+    for mail in cache_db.get_emails(limit=30) or []:
         subject = mail.get("subject", "")
         body = mail.get("body_preview", "") or mail.get("body_full", "")
         text = f"{subject} {body}"
+        if _EXAM_KEYWORD_RE.search(text):
+            texts.append(text)
+    return texts
+
+
+def _find_exam_room_in_mails(course_code: str, mail_texts: list[str] | None = None) -> str | None:
+    """Search cached exam mails for room info matching a course code.
 
-        # Must mention the course code AND an exam keyword
-        if not code_pattern.search(text) or not exam_kw.search(text):
+    Pass `mail_texts` from _exam_mail_texts() when checking several courses so
+    the mail cache is read and keyword-filtered once.
+    """
+    if mail_texts is None:
+        mail_texts = _exam_mail_texts()
+    if not mail_texts:
+        return None
+
+    code_pattern = re.compile(re.escape(course_code), re.IGNORECASE)
+    for text in mail_texts:
+        # Must mention the course code (exam keyword already checked)
+        if not code_pattern.search(text):
             continue
 
         # Try to extract room
@@ -662,6 +722,9 @@ def _find_exam_room_in_mails(course_code: str) -> str | None:
 
 def _parse_exam_date(exam: dict) -> datetime | None:
     """Parse exam date string into datetime. Handles common STARS formats."""
+    ts = exam.get("_date_ts")
+    if ts is not None:  # pre-parsed by StarsClient.get_exams
+        return datetime.fromtimestamp(ts)
     date_str = exam.get("date", "")
     if not date_str:
         return None
@@ -686,8 +749,10 @@ async def _check_exam_reminders(context: ContextTypes.DEFAULT_TYPE) -> None:
 
     # Track sent reminders to avoid duplicates
     sent: list[str] = cache_db.get_json("exam_reminders_sent", OWNER_ID) or []
+    sent_keys = set(sent)
 
     notifications = []
+    mail_texts: list[str] | None = None  # loaded on the first exam that needs a room
     for exam in exams:
         exam_dt = _parse_exam_date(exam)
         if exam_dt is None or exam_dt.date() != tomorrow:
@@ -695,32 +760,35 @@ async def _check_exam_reminders(context: ContextTypes.DEFAULT_TYPE) -> None:
 
         # Build unique key for dedup
         key = f"{exam.get('course', '')}_{exam.get('exam_name', '')}_{exam.get('date', '')}"
-        if key in sent:
+        if key in sent_keys:
             continue
 
         # Extract course code for mail matching (e.g. "CTIS 256" from "CTIS 256 Discrete Structures")
         course = exam.get("course", "")
-        code_match = re.match(r"([A-Z]{2,}\s*\d{3})", course)
+        code_match = _EXAM_COURSE_CODE_RE.match(course)
         course_code = code_match.group(1) if code_match else course
 
         # Search mails for room info
-        room = _find_exam_room_in_mails(course_code)
+        if mail_texts is None:
+            mail_texts = _exam_mail_texts()
+        room = _find_exam_room_in_mails(course_code, mail_texts)
 
-        line = f"*{course}* — {exam.get('exam_name', 'Sınav')}"
+        line = f"<b>{escape_html(course)}</b> — {escape_html(exam.get('exam_name', 'Sınav'))}"
         date_info = exam.get("date", "")
         time_info = exam.get("start_time", "") or exam.get("time_block", "")
         if date_info:
-            line += f"\n📅 {date_info}"
+            line += f"\n📅 {escape_html(date_info)}"
             if time_info:
-                line += f", {time_info}"
+                line += f", {escape_html(time_info)}"
         if room:
-            line += f"\n🏫 Salon: {room}"
+            line += f"\n🏫 Salon: {escape_html(room)}"
 
         notifications.append(line)
         sent.append(key)
+        sent_keys.add(key)
 
     if notifications:
-        header = "📝 *Yarın sınavın var!*\n"
+        header = "📝 <b>Yarın sınavın var!</b>\n"
         msg = header + "\n\n".join(notifications) + "\n\nBaşarılar!"
         await _send(context, msg)
         cache_db.set_json("exam_reminders_sent", OWNER_ID, sent)
@@ -734,7 +802,7 @@ async def _check_deadline_reminders(context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     try:
-        assignments = moodle.get_upcoming_assignments(days=1)
+        assignments = await asyncio.to_thread(moodle.get_upcoming_assignments, days=1)
     except (ConnectionError, RuntimeError, OSError, ValueError) as exc:
         logger.error("Notification: deadline reminder check failed: %s", exc)
         return
@@ -752,24 +820,26 @@ async def _check_deadline_reminders(context: ContextTypes.DEFAULT_TYPE) -> None:
 
     # Dedup: track which deadlines we've already notified
     sent: list[str] = cache_db.get_json("deadline_reminders_sent", OWNER_ID) or []
+    sent_keys = set(sent)
     notifications = []
 
     for a in urgent:
         key = f"{a.course_name}_{a.name}_{a.due_date}"
-        if key in sent:
+        if key in sent_keys:
             continue
 
         remaining = a.time_remaining if hasattr(a, "time_remaining") else ""
-        line = f"• *{a.course_name}* — {a.name}"
+        line = f"• <b>{escape_html(a.course_name)}</b> — {escape_html(a.name)}"
         if remaining:
-            line += f"\n  Kalan: {remaining}"
+            line += f"\n  Kalan: {escape_html(remaining)}"
         notifications.append(line)
         sent.append(key)
+        sent_keys.add(key)
 
     if not notifications:
         return
 
-    msg = "⏰ *Yaklaşan Deadline'lar (24 saat içinde)*\n\n" + "\n".join(notifications)
+    msg = "⏰ <b>Yaklaşan Deadline'lar (24 saat içinde)</b>\n\n" + "\n".join(notifications)
     await _send(context, msg)
     cache_db.set_json("deadline_reminders_sent", OWNER_ID, sent)
     logger.info("Deadline reminder sent: %d urgent", len(notifications))
@@ -782,6 +852,14 @@ async def _cleanup_old_cache(context: ContextTypes.DEFAULT_TYPE) -> None:
         logger.info("Weekly cache cleanup: removed %d old emails", deleted)
 
 
+async def _flush_profile_updates(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Write buffered per-message profile tracking to SQLite in one batch."""
+    try:
+        await asyncio.to_thread(cache_db.flush_queued_queries)
+    except Exception as exc:
+        logger.warning("Profile flush failed: %s", exc)
+
+
 async def _refresh_sessions(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Hourly re-login for webmail IMAP and STARS to keep sessions fresh."""
     from bot.main import refresh_external_sessions
@@ -808,6 +886,9 @@ async def _generate_missing_summaries(context: ContextTypes.DEFAULT_TYPE) -> Non
         logger.error("Background summary generation failed: %s", exc, exc_info=True)
 
 
+_SYLLABUS_SCAN_CONCURRENCY = 2  # background syllabus scans in flight at once
+
+
 async def _sync_syllabus_limits(context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Daily job: for each course in attendance cache, search RAG for the syllabus
@@ -825,12 +906,18 @@ async def _sync_syllabus_limits(context: ContextTypes.DEFAULT_TYPE) -> None:
     updated = dict(existing)
     found = 0
 
-    for cd in attendance:
-        course = cd.get("course", "")
-        if not course:
-            continue
-        # Re-scan even if already cached (syllabus might be uploaded mid-semester)
-        limit = await asyncio.to_thread(_extract_syllabus_attendance_limit, course)
+    # Re-scan even if already cached (syllabus might be uploaded mid-semester).
+    # Courses are independent, so a few are scanned at a time; the scans use
+    # the default executor, keeping RAG_POOL free for user searches.
+    courses = list(dict.fromkeys(cd.get("course", "") for cd in attendance if cd.get("course")))
+    slots = asyncio.Semaphore(_SYLLABUS_SCAN_CONCURRENCY)
+
+    async def _scan(course: str) -> int | None:
+        async with slots:
+            return await asyncio.to_thread(_extract_syllabus_attendance_limit, course)
+
+    limits = await asyncio.gather(*(_scan(c) for c in courses))
+    for course, limit in zip(courses, limits):
         if limit is not None:
             updated[course] = limit
             found += 1
@@ -919,13 +1006,15 @@ async def _auto_sync_materials(context: ContextTypes.DEFAULT_TYPE) -> None:
                 new_chunks if new_chunks else 0,
             )
 
+            # Cached answers may predate the new material
+            if new_chunks and STATE.semantic_cache is not None:
+                STATE.semantic_cache.clear()
+
             # Refresh the per-course topic cache alongside the vector sync.
             await _sync_moodle_materials_cache(context)
 
             # Update state for status display
-            from datetime import datetime as dt
-
-            STATE.last_sync_time = dt.now().strftime("%Y-%m-%d %H:%M")
+            STATE.last_sync_time = datetime.now().strftime("%Y-%m-%d %H:%M")
             STATE.last_sync_new_files = new_chunks or 0
 
         except (OSError, RuntimeError, ValueError, TypeError) as exc:
@@ -980,6 +1069,16 @@ async def _polling_watchdog(context: ContextTypes.DEFAULT_TYPE) -> None:
 
 # ─── Registration ─────────────────────────────────────────────────────────────
 
+# Several jobs share first-run delays (30 s, 2 min, 5 min) and interval multiples;
+# a random offset keeps their Moodle/STARS/IMAP calls from landing together
+_JOB_JITTER_SECONDS = 30.0
+
+
+def _jittered(first: timedelta) -> timedelta:
+    """First-run delay plus up to _JOB_JITTER_SECONDS; later runs keep the offset."""
+    return first + timedelta(seconds=random.uniform(0, _JOB_JITTER_SECONDS))
+
+
 def register_notification_jobs(app: Application) -> None:
     """Register all periodic background jobs on the PTB job queue."""
     jq = app.job_queue
@@ -990,13 +1089,13 @@ def register_notification_jobs(app: Application) -> None:
     jq.run_repeating(
         _check_new_assignments,
         interval=timedelta(minutes=30),
-        first=timedelta(seconds=30),
+        first=_jittered(timedelta(seconds=30)),
         name="assignment_check",
     )
     jq.run_repeating(
         _check_new_emails,
         interval=timedelta(minutes=5),
-        first=timedelta(seconds=60),
+        first=_jittered(timedelta(seconds=60)),
         name="email_check",
     )
     # ═══ Email Cache Sync: 30-second full IMAP sync → SQLite (instant agent queries) ═══
@@ -1009,65 +1108,71 @@ def register_notification_jobs(app: Application) -> None:
     jq.run_repeating(
         _sync_grades,
         interval=timedelta(minutes=30),
-        first=timedelta(minutes=3),
+        first=_jittered(timedelta(minutes=3)),
         name="grades_sync",
     )
     jq.run_repeating(
         _sync_attendance,
         interval=timedelta(minutes=60),
-        first=timedelta(minutes=4),
+        first=_jittered(timedelta(minutes=4)),
         name="attendance_sync",
     )
     # ═══ STARS Full Sync: 1-minute unified sync (keep-alive + all data + cache) ═══
     jq.run_repeating(
         _stars_full_sync,
         interval=timedelta(minutes=1),
-        first=timedelta(seconds=30),
+        first=_jittered(timedelta(seconds=30)),
         name="stars_full_sync",
     )
     jq.run_repeating(
         _check_exam_reminders,
         interval=timedelta(hours=1),
-        first=timedelta(minutes=10),
+        first=_jittered(timedelta(minutes=10)),
         name="exam_reminder",
     )
     jq.run_repeating(
         _check_deadline_reminders,
         interval=timedelta(hours=24),
-        first=timedelta(minutes=2),
+        first=_jittered(timedelta(minutes=2)),
         name="deadline_reminder",
     )
     jq.run_repeating(
         _refresh_sessions,
         interval=timedelta(hours=24),
-        first=timedelta(hours=23),
+        first=_jittered(timedelta(hours=23)),
         name="session_refresh",
     )
     jq.run_repeating(
         _generate_missing_summaries,
         interval=timedelta(minutes=60),
-        first=timedelta(minutes=5),
+        first=_jittered(timedelta(minutes=5)),
         name="summary_generation",
     )
     jq.run_repeating(
         _cleanup_old_cache,
         interval=timedelta(weeks=4),  # Monthly — 365-day retention means no rush
-        first=timedelta(hours=1),
+        first=_jittered(timedelta(hours=1)),
         name="cache_cleanup",
     )
     jq.run_repeating(
         _sync_syllabus_limits,
         interval=timedelta(hours=24),
-        first=timedelta(minutes=5),  # Run soon after startup so limits are ready
+        first=_jittered(timedelta(minutes=5)),  # Run soon after startup so limits are ready
         name="syllabus_limits_sync",
     )
     # ═══ Auto Material Sync: 30-minute Moodle → vector store sync ═══
     jq.run_repeating(
         _auto_sync_materials,
         interval=timedelta(minutes=30),
-        first=timedelta(minutes=2),  # Quick first sync to catch any new materials
+        first=_jittered(timedelta(minutes=2)),  # Quick first sync to catch any new materials
         name="material_sync",
     )
+    jq.run_repeating(
+        _flush_profile_updates,
+        interval=timedelta(seconds=10),
+        first=timedelta(seconds=10),
+        name="profile_flush",
+    )
     jq.run_repeating(
         _poll_healthcheck,
         interval=timedelta(seconds=_HEALTHCHECK_INTERVAL),
@@ -1085,5 +1190,5 @@ def register_notification_jobs(app: Application) -> None:
         "Notification jobs registered: stars_full_sync=1m, assignments=10m, emails=5m, "
         "email_cache=30s, grades=30m, attendance=60m, exam_reminder=1h, deadlines=30m, "
         "session=24h, summaries=60m, cache_cleanup=weekly, syllabus_limits=24h, "
-        "material_sync=30m, poll_healthcheck=5m, polling_watchdog=5m"
+        "material_sync=30m, profile_flush=10s, poll_healthcheck=5m, polling_watchdog=5m"
     )
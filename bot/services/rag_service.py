@@ -3,16 +3,33 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, TypeVar
+
+import numpy as np
 
 from bot.config import CONFIG
 from bot.state import STATE
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Vector-store work (query embedding, FAISS/BM25 search, reranking) runs on its
+# own threads so user searches never queue behind sync, STARS or mail calls
+# waiting in the default executor
+RAG_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag")
+
+
+async def run_rag(func: Callable[..., _T], /, *args: Any) -> _T:
+    """Run a blocking vector-store call on RAG_POOL (asyncio.to_thread for retrieval)."""
+    return await asyncio.get_running_loop().run_in_executor(RAG_POOL, functools.partial(func, *args))
+
 
 @dataclass(frozen=True, slots=True)
 class Chunk:
@@ -33,16 +50,6 @@ class RetrievalResult:
     has_sufficient_context: bool
 
 
-def _similarity_from_distance(distance: float) -> float:
-    """Convert distance metric to similarity score in [0, 1]."""
-    value = 1.0 - distance
-    if value < 0:
-        return 0.0
-    if value > 1:
-        return 1.0
-    return value
-
-
 async def retrieve_context(
     query: str,
     course_id: str,
@@ -62,33 +69,27 @@ async def retrieve_context(
 
     started = time.perf_counter()
     try:
-        raw_results = await asyncio.to_thread(
-            store.hybrid_search,
-            query,
-            top_k,
-            course_id,
-        )
+        raw_results = await run_rag(store.hybrid_search, query, top_k, course_id)
     except (AttributeError, RuntimeError, ValueError, OSError) as exc:
         logger.error("Retrieval failed", exc_info=True, extra={"course_id": course_id, "error": str(exc)})
         return RetrievalResult(chunks=[], confidence=0.0, has_sufficient_context=False)
 
-    selected: list[Chunk] = []
-    for item in raw_results:
-        if not isinstance(item, dict):
-            continue
-        similarity = _similarity_from_distance(float(item.get("distance", 1.0)))
-        if similarity < threshold:
-            continue
-        selected.append(
-            Chunk(
-                chunk_id=str(item.get("id", "")),
-                text=str(item.get("text", "")),
-                similarity=similarity,
-                metadata=dict(item.get("metadata", {})),
-            )
+    items = [item for item in raw_results if isinstance(item, dict)]
+    # Distance → similarity clamped to [0, 1], thresholded in one vectorized pass
+    distances = np.fromiter((float(item.get("distance", 1.0)) for item in items), dtype=np.float64, count=len(items))
+    similarities = np.clip(1.0 - distances, 0.0, 1.0)
+    keep = np.flatnonzero(similarities >= threshold)
+    selected = [
+        Chunk(
+            chunk_id=str(items[i].get("id", "")),
+            text=str(items[i].get("text", "")),
+            similarity=float(similarities[i]),
+            metadata=dict(items[i].get("metadata", {})),
         )
+        for i in keep.tolist()
+    ]
 
-    confidence = (sum(chunk.similarity for chunk in selected) / len(selected)) if selected else 0.0
+    confidence = float(similarities[keep].mean()) if keep.size else 0.0
     has_sufficient = len(selected) >= CONFIG.rag_min_chunks
 
     elapsed_ms = (time.perf_counter() - started) * 1000.0
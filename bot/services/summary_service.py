@@ -12,9 +12,14 @@ Integration points:
 
 from __future__ import annotations
 
+import itertools
 import json
 import logging
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -24,6 +29,18 @@ logger = logging.getLogger(__name__)
 
 SUMMARY_DIR = core_config.data_dir / "source_summaries"
 
+# Bumped on every summary write so callers can cache text rendered from summaries
+_summary_version = 0
+_summary_versions = itertools.count(1)  # next() is atomic, safe across worker threads
+
+# Parsed summaries by file name, with the mtime they were read at; a stat()
+# replaces the read + JSON parse while the file is unchanged
+_loaded_summaries: dict[str, tuple[int, dict]] = {}
+
+# Bulk generation keeps a few LLM calls in flight instead of one at a time
+SUMMARY_MAX_WORKERS = 3
+SUMMARY_CALLS_PER_MINUTE = 4.0  # stays under free-tier 5 RPM quotas (0 = unpaced)
+
 SUMMARY_GENERATION_PROMPT = """Bu bir üniversite ders materyali. Tamamını oku ve aşağıdaki JSON formatında
 detaylı bir öğretim özeti oluştur.
 
@@ -57,7 +74,6 @@ SADECE JSON döndür, başka bir şey yazma.
 MATERYALİN İÇERİĞİ:
 """
 
-
 def _safe_filename(course: str, filename: str) -> str:
     """Generate filesystem-safe summary filename."""
     safe_course = re.sub(r"[^\w\-]", "_", course)
@@ -65,6 +81,22 @@ def _safe_filename(course: str, filename: str) -> str:
     return f"{safe_course}__{safe_file}.json"
 
 
+def summary_key(filename: str, course: str) -> str:
+    """Key under which a file's summary is stored (see existing_summary_keys)."""
+    return _safe_filename(course, filename)
+
+
+def existing_summary_keys(course: str) -> set[str]:
+    """Return the keys of all summaries saved for a course with one directory scan.
+
+    Use with summary_key() to skip summarized files without a stat() per file.
+    """
+    if not SUMMARY_DIR.exists():
+        return set()
+    prefix = re.sub(r"[^\w\-]", "_", course) + "__"
+    return {path.name for path in SUMMARY_DIR.glob("*.json") if path.name.startswith(prefix)}
+
+
 def summary_exists(filename: str, course: str) -> bool:
     """Check if a summary already exists for this source file."""
     path = SUMMARY_DIR / _safe_filename(course, filename)
@@ -72,31 +104,72 @@ def summary_exists(filename: str, course: str) -> bool:
 
 
 def load_source_summary(filename: str, course: str) -> dict | None:
-    """Load a saved summary. Returns None if not found."""
-    path = SUMMARY_DIR / _safe_filename(course, filename)
-    if not path.exists():
+    """Load a saved summary. Returns None if not found.
+
+    The returned dict is shared between callers; treat it as read-only.
+    """
+    return _read_summary(SUMMARY_DIR / _safe_filename(course, filename))
+
+
+def _read_summary(path: Path, warn: bool = True) -> dict | None:
+    """Parse a summary file, reusing the cached dict while its mtime is unchanged."""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
         return None
+    cached = _loaded_summaries.get(path.name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        summary = json.loads(path.read_text(encoding="utf-8"))
     except (json.JSONDecodeError, OSError) as exc:
-        logger.warning("Failed to load summary %s: %s", path.name, exc)
+        if warn:
+            logger.warning("Failed to load summary %s: %s", path.name, exc)
         return None
+    _loaded_summaries[path.name] = (mtime, summary)
+    return summary
 
 
 def save_source_summary(filename: str, course: str, summary: dict) -> Path:
     """Save a summary to disk."""
+    global _summary_version
     SUMMARY_DIR.mkdir(parents=True, exist_ok=True)
     path = SUMMARY_DIR / _safe_filename(course, filename)
-    path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_text(json.dumps(summary, ensure_ascii=False), encoding="utf-8")
+    _summary_version = next(_summary_versions)
     return path
 
 
+def summary_version() -> int:
+    """Counter that changes whenever any summary is (re)written."""
+    return _summary_version
+
+
 def _parse_llm_json(text: str) -> dict:
-    """Parse JSON from LLM output, handling markdown fences."""
+    """
+    Parse the summary object from LLM output.
+
+    Tolerates a surrounding fence and prose before/after the object, so a
+    chatty model does not throw away an 8K-token generation. Plain JSON is
+    tried first: string values may contain ``` (code samples in summaries).
+    """
     text = text.strip()
-    if text.startswith("```"):
-        text = text.split("\n", 1)[1].rsplit("```", 1)[0].strip()
-    return json.loads(text)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        if text.startswith("```"):
+            # Opening fence line (```json) up to the last fence, not the first
+            # inner one
+            body = text.partition("\n")[2]
+            end = body.rfind("```")
+            text = (body[:end] if end != -1 else body).strip()
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            raise
+        data = json.loads(text[start : end + 1])
+    if not isinstance(data, dict):
+        raise ValueError(f"Summary JSON is {type(data).__name__}, expected object")
+    return data
 
 
 def _make_fallback_summary(filename: str, course: str, chunk_count: int) -> dict:
@@ -135,9 +208,7 @@ def generate_source_summary(filename: str, course: str, chunk_texts: list[str])
         return _make_fallback_summary(filename, course, 0)
 
     # Combine chunk texts
-    combined = ""
-    for i, text in enumerate(chunk_texts):
-        combined += f"\n\n--- Parça {i + 1} ---\n{text}"
+    combined = "".join(f"\n\n--- Parça {i + 1} ---\n{text}" for i, text in enumerate(chunk_texts))
 
     # Truncate if too long (avoid exceeding context window)
     # ~500K chars ≈ ~125K tokens — safe for Gemini Flash 1M context
@@ -181,6 +252,68 @@ def generate_source_summary(filename: str, course: str, chunk_texts: list[str])
     return summary
 
 
+class _CallPacer:
+    """Thread-safe sliding-window limiter for a per-minute call quota.
+
+    Allows up to `window` call starts in any `period` seconds (the whole
+    per-minute budget at once, for quotas of 1+ calls), so a short batch
+    is not spread out needlessly; `window` is 1 for sub-1 RPM quotas.
+    """
+
+    def __init__(self, calls_per_minute: float):
+        self._window = max(1, int(calls_per_minute))
+        self._period = self._window * 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+        self._starts: deque[float] = deque(maxlen=self._window)
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self._period:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = now
+            if len(self._starts) == self._window:
+                start = max(now, self._starts[0] + self._period)
+            # Reserved before sleeping so concurrent workers queue behind it
+            self._starts.append(start)
+        if start > now:
+            time.sleep(start - now)
+
+
+def generate_summaries_parallel(
+    jobs: list[tuple[str, str, list[str]]],
+    max_workers: int = SUMMARY_MAX_WORKERS,
+    calls_per_minute: float = SUMMARY_CALLS_PER_MINUTE,
+) -> tuple[int, int]:
+    """
+    Generate summaries for (filename, course, chunk_texts) jobs with bounded concurrency.
+
+    Each summary is saved as soon as it completes, so an interrupted run keeps
+    finished work. `calls_per_minute` > 0 paces call starts for rate-limited
+    providers. Returns (generated, failed).
+    """
+    if not jobs:
+        return 0, 0
+
+    pacer = _CallPacer(calls_per_minute)
+
+    def _run(job: tuple[str, str, list[str]]) -> bool:
+        filename, course, chunk_texts = job
+        pacer.wait()
+        try:
+            generate_source_summary(filename, course, chunk_texts)
+            return True
+        except Exception as exc:
+            logger.error("Summary generation failed for %s/%s: %s", course, filename, exc, exc_info=True)
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))), thread_name_prefix="summary") as pool:
+        results = list(pool.map(_run, jobs))
+
+    generated = sum(results)
+    return generated, len(results) - generated
+
+
 def generate_missing_summaries() -> int:
     """
     Generate summaries for all indexed files that don't have one yet.
@@ -194,15 +327,16 @@ def generate_missing_summaries() -> int:
     if store is None:
         return 0
 
-    generated = 0
+    jobs: list[tuple[str, str, list[str]]] = []
     stats = store.get_stats()
     courses = stats.get("courses", [])
 
     for course in courses:
         files = store.get_files_for_course(course)
+        existing = existing_summary_keys(course)
         for file_info in files:
             filename = file_info.get("filename", "")
-            if not filename or summary_exists(filename, course):
+            if not filename or summary_key(filename, course) in existing:
                 continue
 
             # Get all chunks for this file
@@ -214,12 +348,9 @@ def generate_missing_summaries() -> int:
             if not chunk_texts:
                 continue
 
-            try:
-                generate_source_summary(filename, course, chunk_texts)
-                generated += 1
-            except Exception as exc:
-                logger.error("Summary generation failed for %s/%s: %s", course, filename, exc, exc_info=True)
+            jobs.append((filename, course, chunk_texts))
 
+    generated, _ = generate_summaries_parallel(jobs)
     logger.info("Missing summaries generation complete: %d new summaries", generated)
     return generated
 
@@ -229,22 +360,23 @@ def list_summaries(course: str | None = None) -> list[dict]:
     if not SUMMARY_DIR.exists():
         return []
 
+    course_key = course.lower() if course else None
     summaries = []
     for path in SUMMARY_DIR.glob("*.json"):
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            if course and course.lower() not in data.get("course", "").lower():
-                continue
-            summaries.append({
-                "filename": data.get("source", path.stem),
-                "course": data.get("course", ""),
-                "overview": data.get("overview", ""),
-                "sections": len(data.get("sections", [])),
-                "chunk_count": data.get("chunk_count", 0),
-                "difficulty": data.get("difficulty", ""),
-                "generated_at": data.get("generated_at", ""),
-            })
-        except (json.JSONDecodeError, OSError):
+        # Unchanged files come from the parsed-summary cache: one stat() each
+        data = _read_summary(path, warn=False)
+        if data is None:
+            continue
+        if course_key and course_key not in data.get("course", "").lower():
             continue
+        summaries.append({
+            "filename": data.get("source", path.stem),
+            "course": data.get("course", ""),
+            "overview": data.get("overview", ""),
+            "sections": len(data.get("sections", [])),
+            "chunk_count": data.get("chunk_count", 0),
+            "difficulty": data.get("difficulty", ""),
+            "generated_at": data.get("generated_at", ""),
+        })
 
     return summaries
@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
@@ -22,6 +23,8 @@ logger = logging.getLogger(__name__)
 
 __all__ = ["get_academic_tools"]
 
+_DAY_ORDER = {name: idx for idx, name in DAY_NAMES_TR.items()}
+
 
 class GetScheduleTool(BaseTool):
     """Get class schedule from STARS cache."""
@@ -67,18 +70,20 @@ class GetScheduleTool(BaseTool):
             if not schedule:
                 return f"{target_day} günü için ders bulunamadı."
 
-        lines = []
-        current_day = ""
+        # STARS rows are time slots and columns are days, so the cache is
+        # time-major; group by day once, then sort each day by time once
+        by_day: defaultdict[str, list[dict]] = defaultdict(list)
         for entry in schedule:
-            day = entry.get("day", "")
-            time_slot = entry.get("time", "")
-            course = entry.get("course", "")
-            room = entry.get("room", "")
-            if day != current_day:
-                current_day = day
-                lines.append(f"\n*{day}*")
-            room_str = f" ({room})" if room else ""
-            lines.append(f"  • {time_slot} — {course}{room_str}")
+            by_day[entry.get("day", "")].append(entry)
+
+        lines = []
+        for day in sorted(by_day, key=lambda d: _DAY_ORDER.get(d, len(_DAY_ORDER))):
+            lines.append(f"\n*{day}*")
+            for entry in sorted(by_day[day], key=lambda e: e.get("time", "")):
+                room = entry.get("room", "")
+                lines.append(
+                    f"  • {entry.get('time', '')} — {entry.get('course', '')}{f' ({room})' if room else ''}"
+                )
 
         return "\n".join(lines).strip() if lines else "Ders programı boş."
 
@@ -183,17 +188,14 @@ class GetAttendanceTool(BaseTool):
         }
 
     async def execute(self, args: dict, user_id: int, services: ServiceContainer) -> str:
-        import logging
-        log = logging.getLogger(__name__)
-
         attendance = cache_db.get_json("attendance", user_id)
 
         if not attendance:
-            log.warning("get_attendance: cache empty for user_id=%s", user_id)
+            logger.warning("get_attendance: cache empty for user_id=%s", user_id)
             return "Devamsızlık bilgisi bulunamadı. STARS session süresi dolmuş olabilir — /start ile tekrar giriş yap."
 
         course_filter = args.get("course_filter", "")
-        log.info(
+        logger.info(
             "get_attendance: user_id=%s filter=%r cached_courses=%s",
             user_id, course_filter, [a.get("course", "")[:40] for a in attendance],
         )
@@ -201,7 +203,7 @@ class GetAttendanceTool(BaseTool):
         if course_filter:
             attendance = [a for a in attendance if course_matches(a.get("course", ""), course_filter)]
             if not attendance:
-                log.warning(
+                logger.warning(
                     "get_attendance: filter %r matched 0 courses (cache had entries)",
                     course_filter,
                 )
@@ -6,13 +6,13 @@ Tools: get_source_map, read_source, study_topic, rag_search
 
 from __future__ import annotations
 
-import asyncio
 import json
 import logging
 from typing import TYPE_CHECKING, Any
 
+from bot.services.rag_service import run_rag
 from bot.services.tools import BaseTool
-from bot.services.tools.helpers import resolve_course
+from bot.services.tools.helpers import drop_near_duplicates, resolve_course, search_with_fallback
 
 if TYPE_CHECKING:
     from bot.state import ServiceContainer
@@ -21,6 +21,12 @@ logger = logging.getLogger(__name__)
 
 __all__ = ["get_content_tools"]
 
+# course → (cache key, rendered source map); key covers files + summary version
+_SOURCE_MAP_CACHE: dict[str, tuple[tuple, str]] = {}
+
+# rag_search hits fetched for the cross-encoder to choose its top 10 from
+_RERANK_CANDIDATES = 30
+
 
 class GetSourceMapTool(BaseTool):
     """KATMAN 1 — Metadata aggregation + KATMAN 2 summaries."""
@@ -60,7 +66,7 @@ class GetSourceMapTool(BaseTool):
             return "Materyal veritabanı hazır değil."
 
         try:
-            files = await asyncio.to_thread(store.get_files_for_course, course_name)
+            files = await run_rag(store.get_files_for_course, course_name)
         except (AttributeError, RuntimeError, ValueError) as exc:
             logger.error("Source map failed: %s", exc, exc_info=True)
             return f"Materyal haritası alınamadı: {exc}"
@@ -68,7 +74,12 @@ class GetSourceMapTool(BaseTool):
         if not files:
             return f"'{course_name}' kursu için yüklü materyal bulunamadı."
 
-        from bot.services.summary_service import load_source_summary
+        from bot.services.summary_service import load_source_summary, summary_version
+
+        cache_key = (summary_version(), tuple((f.get("filename", ""), f.get("chunk_count", 0)) for f in files))
+        cached = _SOURCE_MAP_CACHE.get(course_name)
+        if cached and cached[0] == cache_key:
+            return cached[1]
 
         lines = []
         total_chunks = 0
@@ -109,6 +120,7 @@ class GetSourceMapTool(BaseTool):
         if study_order:
             result += f"\n\n💡 Önerilen çalışma sırası: {study_order}"
 
+        _SOURCE_MAP_CACHE[course_name] = (cache_key, result)
         return result
 
 
@@ -195,7 +207,7 @@ class ReadSourceTool(BaseTool):
             return "\n".join(parts)
 
         if section:
-            chunks = await asyncio.to_thread(store.get_file_chunks, source, 0)
+            chunks = await run_rag(store.get_file_chunks, source, 0)
             if not chunks:
                 return f"'{source}' dosyası bulunamadı."
 
@@ -216,15 +228,17 @@ class ReadSourceTool(BaseTool):
             result += chunk_texts
             return result
 
-        chunks = await asyncio.to_thread(store.get_file_chunks, source, 0)
-        if not chunks:
+        total = await run_rag(store.count_file_chunks, source)
+        if not total:
             return f"'{source}' dosyası bulunamadı. get_source_map ile doğru dosya adını kontrol et."
 
-        if len(chunks) > 80:
-            return f"Dosya çok büyük ({len(chunks)} parça). Lütfen bir bölüm belirt veya get_source_map ile bölümlere bak."
+        if total > 80:
+            return f"Dosya çok büyük ({total} parça). Lütfen bir bölüm belirt veya get_source_map ile bölümlere bak."
 
-        parts = [f"📄 *{source}* — {len(chunks)} parça\n"]
-        for c in chunks[:40]:
+        # Only the first 40 chunks are shown; don't copy the rest of the file
+        chunks = await run_rag(store.get_file_chunks_range, source, 0, 40)
+        parts = [f"📄 *{source}* — {total} parça\n"]
+        for c in chunks:
             text = c.get("text", "")
             idx = c.get("chunk_index", 0)
             if text.strip():
@@ -284,10 +298,7 @@ class StudyTopicTool(BaseTool):
         depth = args.get("depth", "detailed")
         top_k = {"overview": 10, "detailed": 25, "deep": 50}.get(depth, 25)
 
-        results = await asyncio.to_thread(store.hybrid_search, topic, top_k, course_name)
-
-        if not results and course_name:
-            results = await asyncio.to_thread(store.hybrid_search, topic, top_k, None)
+        results = drop_near_duplicates(await search_with_fallback(store, topic, top_k, course_name))
 
         if not results:
             return f"'{topic}' konusuyla ilgili materyal bulunamadı."
@@ -364,10 +375,13 @@ class RagSearchTool(BaseTool):
         if store is None:
             return "Materyal veritabanı henüz hazır değil."
 
-        results = await asyncio.to_thread(store.hybrid_search, query, 10, course_name)
-
-        if not results and course_name:
-            results = await asyncio.to_thread(store.hybrid_search, query, 10, None)
+        if store.reranks:
+            # Cross-encoder picks the best 10 out of a wider candidate pool
+            results = await search_with_fallback(store, query, _RERANK_CANDIDATES, course_name)
+            results = await run_rag(store.rerank, query, results, 10)
+        else:
+            results = await search_with_fallback(store, query, 10, course_name)
+        results = drop_near_duplicates(results)
 
         if not results:
             return "Bu konuyla ilgili materyal bulunamadı."
@@ -12,10 +12,12 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from bot.state import ServiceContainer
+    from core.vector_store import VectorStore
 
 from bot.services import user_service
+from bot.services.rag_service import run_rag
 
-__all__ = ["DAY_NAMES_TR", "resolve_course", "course_matches"]
+__all__ = ["DAY_NAMES_TR", "resolve_course", "course_matches", "search_with_fallback", "drop_near_duplicates"]
 
 
 DAY_NAMES_TR = {
@@ -38,6 +40,19 @@ def resolve_course(args: dict, user_id: int, key: str = "course_filter") -> str
     return name
 
 
+async def search_with_fallback(store: VectorStore, query: str, top_k: int, course_name: str | None) -> list[dict]:
+    """Hybrid search within the course, falling back to all courses when it finds nothing.
+
+    Both searches run in one RAG_POOL thread and share one query embedding.
+    """
+    if not course_name:
+        return await run_rag(store.hybrid_search, query, top_k, None)
+    course_results, all_results = await run_rag(
+        store.hybrid_search_batch, [(query, course_name), (query, None)], top_k, None, True
+    )
+    return course_results or all_results
+
+
 _COURSE_CODE_RE = re.compile(r"([A-Za-z]{2,})\s*(\d+)")
 
 
@@ -82,3 +97,31 @@ def course_matches(course_name: str, filter_term: str) -> bool:
         return True
 
     return norm_filter in _normalize(course_name)
+
+
+_SHINGLE_SIZE = 5  # words per shingle
+_SHINGLE_PREFIX = 512  # chars of each chunk compared; enough to spot a copy
+
+
+def _shingles(text: str) -> frozenset[tuple[str, ...]]:
+    words = text[:_SHINGLE_PREFIX].lower().split()
+    if len(words) <= _SHINGLE_SIZE:
+        return frozenset([tuple(words)])
+    return frozenset(zip(*(words[i:] for i in range(_SHINGLE_SIZE))))
+
+
+def drop_near_duplicates(results: list[dict], threshold: float = 0.8) -> list[dict]:
+    """Drop hits whose text is a near-copy of a better-ranked hit.
+
+    Compares word 5-gram shingle sets (Jaccard > threshold), so the same
+    material indexed twice — re-uploads, renamed copies — costs LLM context once.
+    """
+    kept: list[dict] = []
+    kept_shingles: list[frozenset[tuple[str, ...]]] = []
+    for r in results:
+        shingles = _shingles(r.get("text", ""))
+        if any(len(shingles & other) > threshold * len(shingles | other) for other in kept_shingles):
+            continue
+        kept.append(r)
+        kept_shingles.append(shingles)
+    return kept
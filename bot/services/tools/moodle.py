@@ -9,12 +9,12 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
 from bot.services import user_service
 from bot.services.tools import BaseTool
 from bot.services.tools.helpers import resolve_course
+from bot.utils.formatters import format_due
 from core import cache_db
 
 if TYPE_CHECKING:
@@ -86,10 +86,7 @@ class GetMoodleMaterialsTool(BaseTool):
             target = None
             if course_name:
                 cn_lower = course_name.lower()
-                for c in courses:
-                    if cn_lower in c.fullname.lower() or cn_lower in c.shortname.lower():
-                        target = c
-                        break
+                target = next((c for c in courses if cn_lower in c.search_key), None)
             if not target and courses:
                 target = courses[0]
             if not target:
@@ -173,28 +170,19 @@ class GetAssignmentsTool(BaseTool):
                 for a in (live or [])
             ]
 
-        # Apply filters client-side on the cached list.
+        # Apply filters client-side on the cached list, in one pass.
         notify_window = now_ts + 14 * 86400
-        if filter_mode == "upcoming":
-            assignments = [
-                a for a in assignments
-                if (a.get("due_date") or 0) > now_ts
-                and (a.get("due_date") or 0) <= notify_window
-            ]
-        elif filter_mode == "overdue":
-            assignments = [
-                a for a in assignments
-                if not a.get("submitted")
-                and (a.get("due_date") or 0) > 0
-                and (a.get("due_date") or 0) < now_ts
-            ]
+        kw_lower = keyword.lower()
 
-        if keyword and assignments:
-            kw_lower = keyword.lower()
-            assignments = [
-                a for a in assignments
-                if kw_lower in f"{a.get('course_name', '')} {a.get('name', '')}".lower()
-            ]
+        def _keep(a: dict) -> bool:
+            due_date = a.get("due_date") or 0
+            if filter_mode == "upcoming" and not now_ts < due_date <= notify_window:
+                return False
+            if filter_mode == "overdue" and (a.get("submitted") or not 0 < due_date < now_ts):
+                return False
+            return not kw_lower or kw_lower in f"{a.get('course_name', '')} {a.get('name', '')}".lower()
+
+        assignments = [a for a in assignments if _keep(a)]
 
         if not assignments:
             labels = {"upcoming": "Yaklaşan", "overdue": "Süresi geçmiş", "all": "Hiç"}
@@ -202,23 +190,22 @@ class GetAssignmentsTool(BaseTool):
                 return f"'{keyword}' ile eşleşen ödev bulunamadı."
             return f"{labels.get(filter_mode, 'Yaklaşan')} ödev bulunamadı."
 
-        lines = []
-        for a in assignments:
-            status = "✅ Teslim edildi" if a.get("submitted") else "⏳ Teslim edilmedi"
-            due_date = a.get("due_date") or 0
-            if due_date > 0:
-                due = datetime.fromtimestamp(due_date).strftime("%d/%m/%Y %H:%M")
-            else:
-                due = "Son tarih yok"
-            remaining = a.get("time_remaining", "")
-            line = f"• {a.get('course_name', '')} — {a.get('name', '')}\n  Tarih: {due} | {status}"
-            if remaining and not a.get("submitted"):
-                line += f" | Kalan: {remaining}"
-            if filter_mode == "overdue":
-                line += " | ⚠️ Süresi geçmiş!"
-            lines.append(line)
+        overdue = filter_mode == "overdue"
+        return "\n".join(_format_assignment(a, overdue) for a in assignments)
 
-        return "\n".join(lines)
+
+def _format_assignment(a: dict, overdue: bool) -> str:
+    """Render one cached assignment as a two-line bullet."""
+    submitted = a.get("submitted")
+    due_date = a.get("due_date") or 0
+    due = format_due(due_date) if due_date > 0 else "Son tarih yok"
+    remaining = "" if submitted else a.get("time_remaining", "")
+    return (
+        f"• {a.get('course_name', '')} — {a.get('name', '')}\n"
+        f"  Tarih: {due} | {'✅ Teslim edildi' if submitted else '⏳ Teslim edilmedi'}"
+        f"{f' | Kalan: {remaining}' if remaining else ''}"
+        f"{' | ⚠️ Süresi geçmiş!' if overdue else ''}"
+    )
 
 
 class ListCoursesTool(BaseTool):
@@ -241,17 +228,9 @@ class ListCoursesTool(BaseTool):
         }
 
     async def execute(self, args: dict, user_id: int, services: ServiceContainer) -> str:
-        courses = user_service.list_courses()
-        if not courses:
-            return "Henüz yüklü kurs bulunamadı."
-
         active = user_service.get_active_course(user_id)
-        lines = []
-        for c in courses:
-            prefix = "▸ " if active and active.course_id == c.course_id else "  "
-            lines.append(f"{prefix}{c.short_name} — {c.display_name}")
-
-        return "\n".join(lines)
+        rendered = user_service.format_course_list(active.course_id if active else None)
+        return rendered or "Henüz yüklü kurs bulunamadı."
 
 
 class SetActiveCourseTool(BaseTool):
@@ -288,8 +267,7 @@ class SetActiveCourseTool(BaseTool):
 
         match = user_service.find_course(course_name)
         if match is None:
-            courses = user_service.list_courses()
-            available = ", ".join(c.short_name for c in courses) if courses else "Yok"
+            available = user_service.available_short_names() or "Yok"
             return f"'{course_name}' ile eşleşen kurs bulunamadı. Mevcut kurslar: {available}"
 
         user_service.set_active_course(user_id, match.course_id)
@@ -6,6 +6,7 @@ Tools: get_stats, query_db
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import sqlite3
 import time
@@ -45,15 +46,18 @@ class GetStatsTool(BaseTool):
         if store is None:
             return "Vector store hazır değil."
 
-        stats = store.get_stats()
+        from bot.services.summary_service import list_summaries
+
+        # Chunk metadata walk and summary directory scan are independent
+        # blocking work; run both off the event loop at once
+        stats, summaries = await asyncio.gather(
+            asyncio.to_thread(store.get_stats),
+            asyncio.to_thread(list_summaries),
+        )
         uptime = int(time.monotonic() - services.started_at_monotonic)
         hours, remainder = divmod(uptime, 3600)
         minutes, seconds = divmod(remainder, 60)
 
-        from bot.services.summary_service import list_summaries
-
-        summaries = list_summaries()
-
         return (
             f"Toplam chunk: {stats.get('total_chunks', 0)}\n"
             f"Kurs sayısı: {stats.get('unique_courses', 0)}\n"
@@ -106,14 +110,8 @@ class QueryDbTool(BaseTool):
             if keyword in sql_upper:
                 return f"Güvenlik: '{keyword}' içeren sorgular yasaktır."
 
-        db_path = "data/cache.db"
         try:
-            conn = sqlite3.connect(db_path, timeout=5)
-            conn.execute("PRAGMA query_only = ON")
-            cursor = conn.execute(sql)
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            rows = cursor.fetchmany(50)
-            conn.close()
+            columns, rows = await asyncio.to_thread(_run_readonly_query, sql)
 
             if not rows:
                 return "Sorgu sonucu boş."
@@ -132,6 +130,18 @@ class QueryDbTool(BaseTool):
             return f"SQL hatası: {exc}"
 
 
+def _run_readonly_query(sql: str, limit: int = 50) -> tuple[list[str], list[tuple]]:
+    """Run a SELECT on the cache DB in query-only mode; returns (columns, first `limit` rows)."""
+    conn = sqlite3.connect("data/cache.db", timeout=5)
+    try:
+        conn.execute("PRAGMA query_only = ON")
+        cursor = conn.execute(sql)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        return columns, cursor.fetchmany(limit)
+    finally:
+        conn.close()
+
+
 def get_system_tools() -> list[BaseTool]:
     """Factory function returning all system tools."""
     return [
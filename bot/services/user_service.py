@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import re
 import time
+from collections import deque
 from dataclasses import dataclass
 
 from bot.config import CONFIG
@@ -15,6 +16,7 @@ logger = logging.getLogger(__name__)
 MEMORY = ConversationMemory(
     max_messages=CONFIG.memory_max_messages,
     ttl_minutes=CONFIG.memory_ttl_minutes,
+    max_total_chars=CONFIG.memory_max_chars,
 )
 
 
@@ -33,8 +35,36 @@ def _normalize(text: str) -> str:
     return re.sub(r"\s+", " ", lowered).strip()
 
 
-def list_courses() -> list[CourseSelection]:
-    """Return available courses from Moodle cache or indexed vector metadata."""
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def compact_name(text: str) -> str:
+    """Casefold and drop every non-alphanumeric character ("CTIS-256" → "ctis256")."""
+    return _NON_WORD_RE.sub("", text.casefold())
+
+
+@dataclass(frozen=True, slots=True)
+class _CourseIndex:
+    """Course list plus normalized-name lookups, built once per source change."""
+
+    sources: tuple[object, int, object, int]
+    courses: tuple[CourseSelection, ...]
+    by_id: dict[str, CourseSelection]
+    by_name: dict[str, CourseSelection]
+    names: tuple[tuple[str, str], ...]  # normalized (short, display) per course, for partial matches
+    # One alternation of every course's compact short/display name; see find_course_in
+    compact_re: re.Pattern[str] | None
+    by_compact: dict[str, tuple[int, CourseSelection]]  # compact name → (list position, course)
+    min_compact_len: int  # texts shorter than this can't contain any compact name
+    labels: tuple[str, ...]  # "SHORT — Display Name" per course, in list order
+    short_names: str  # comma-joined short names for "available courses" hints
+
+
+_COURSE_INDEX: _CourseIndex | None = None
+
+
+def _build_course_list() -> list[CourseSelection]:
+    """Build courses from Moodle cache or, as a fallback, indexed vector metadata."""
     courses: list[CourseSelection] = []
     seen: set[str] = set()
 
@@ -54,7 +84,7 @@ def list_courses() -> list[CourseSelection]:
             courses.append(
                 CourseSelection(
                     course_id=display_name,
-                    short_name=short_name or display_name.split()[0],
+                    short_name=short_name or display_name.partition(" ")[0],
                     display_name=display_name,
                 )
             )
@@ -77,7 +107,7 @@ def list_courses() -> list[CourseSelection]:
         courses.append(
             CourseSelection(
                 course_id=course,
-                short_name=course.split()[0],
+                short_name=course.partition(" ")[0],
                 display_name=course,
             )
         )
@@ -85,24 +115,111 @@ def list_courses() -> list[CourseSelection]:
     return courses
 
 
+def _course_index() -> _CourseIndex:
+    """Return the course index, rebuilding it only when its source lists change.
+
+    Source lists are compared by identity and length: the Moodle course list
+    is replaced wholesale, the vector store metadata grows in place.
+    """
+    global _COURSE_INDEX
+    llm_courses = getattr(STATE.llm, "moodle_courses", None)
+    metadatas = getattr(STATE.vector_store, "_metadatas", None)
+    sources = (llm_courses, len(llm_courses or ()), metadatas, len(metadatas or ()))
+
+    index = _COURSE_INDEX
+    if index is not None:
+        old_courses, old_course_len, old_metas, old_meta_len = index.sources
+        if (
+            old_courses is llm_courses
+            and old_metas is metadatas
+            and (old_course_len, old_meta_len) == (sources[1], sources[3])
+        ):
+            return index
+
+    courses = tuple(_build_course_list())
+    by_id: dict[str, CourseSelection] = {}
+    by_name: dict[str, CourseSelection] = {}
+    for course in courses:
+        by_id.setdefault(_normalize(course.course_id), course)
+        # First course (in list order) whose short or display name matches wins
+        by_name.setdefault(_normalize(course.short_name), course)
+        by_name.setdefault(_normalize(course.display_name), course)
+
+    by_compact: dict[str, tuple[int, CourseSelection]] = {}
+    for position, course in enumerate(courses):
+        for key in (compact_name(course.short_name), compact_name(course.display_name)):
+            if key:
+                by_compact.setdefault(key, (position, course))
+    # Alternatives in course order inside a lookahead: every start position is
+    # tried and reports its highest-priority match, as the old per-course loop did
+    compact_re = (
+        re.compile("(?=(" + "|".join(re.escape(k) for k in sorted(by_compact, key=lambda k: by_compact[k][0])) + "))")
+        if by_compact
+        else None
+    )
+
+    _COURSE_INDEX = _CourseIndex(
+        sources=sources,
+        courses=courses,
+        by_id=by_id,
+        by_name=by_name,
+        names=tuple((_normalize(c.short_name), _normalize(c.display_name)) for c in courses),
+        compact_re=compact_re,
+        by_compact=by_compact,
+        min_compact_len=min(map(len, by_compact), default=0),
+        labels=tuple(f"{c.short_name} — {c.display_name}" for c in courses),
+        short_names=", ".join(c.short_name for c in courses),
+    )
+    return _COURSE_INDEX
+
+
+def list_courses() -> list[CourseSelection]:
+    """Return available courses from Moodle cache or indexed vector metadata."""
+    return list(_course_index().courses)
+
+
+def find_course_in(text: str) -> CourseSelection | None:
+    """Return the first course (in list order) whose compact short or display name occurs in text."""
+    index = _course_index()
+    if index.compact_re is None:
+        return None
+    compact = compact_name(text)
+    if len(compact) < index.min_compact_len:
+        return None
+    hits = [index.by_compact[m.group(1)] for m in index.compact_re.finditer(compact)]
+    return min(hits, key=lambda hit: hit[0])[1] if hits else None
+
+
+def format_course_list(active_course_id: str | None = None) -> str:
+    """Render the course list, one per line, marking the active course with ▸."""
+    index = _course_index()
+    return "\n".join(
+        f"▸ {label}" if course.course_id == active_course_id else f"  {label}"
+        for course, label in zip(index.courses, index.labels)
+    )
+
+
+def available_short_names() -> str:
+    """Comma-joined short names of all courses ('' when none are known)."""
+    return _course_index().short_names
+
+
 def find_course(query: str) -> CourseSelection | None:
     """Find a course by short name or full name using case-insensitive matching."""
     if not query.strip():
         return None
 
     target = _normalize(query)
-    candidates = list_courses()
-    if not candidates:
+    index = _course_index()
+    if not index.courses:
         return None
 
-    exact = next(
-        (c for c in candidates if _normalize(c.short_name) == target or _normalize(c.display_name) == target), None
-    )
+    exact = index.by_name.get(target)
     if exact is not None:
         return exact
 
     partial = next(
-        (c for c in candidates if target in _normalize(c.short_name) or target in _normalize(c.display_name)),
+        (c for c, (short, display) in zip(index.courses, index.names) if target in short or target in display),
         None,
     )
     return partial
@@ -119,12 +236,12 @@ def get_active_course(user_id: int) -> CourseSelection | None:
     if active_id is None:
         return None
 
-    for course in list_courses():
-        if _normalize(course.course_id) == _normalize(active_id):
-            return course
+    course = _course_index().by_id.get(_normalize(active_id))
+    if course is not None:
+        return course
 
     # Keep stale value if course list is temporarily unavailable.
-    return CourseSelection(course_id=active_id, short_name=active_id.split()[0], display_name=active_id)
+    return CourseSelection(course_id=active_id, short_name=active_id.partition(" ")[0], display_name=active_id)
 
 
 def clear_active_course(user_id: int) -> None:
@@ -132,19 +249,44 @@ def clear_active_course(user_id: int) -> None:
     STATE.active_courses.pop(user_id, None)
 
 
+_RATE_LIMIT_GC_EVERY = 1000  # calls between sweeps of idle users' windows
+_rate_limit_calls = 0
+
+
 def check_rate_limit(user_id: int) -> bool:
-    """Return whether message rate is within configured per-window limits."""
+    """Return whether message rate is within configured per-window limits.
+
+    Each user keeps a ring buffer of their last `rate_limit_max` message times;
+    the message is allowed unless the oldest of those is still inside the window.
+    """
+    global _rate_limit_calls
     now = time.time()
     window_start = now - CONFIG.rate_limit_window
-    timestamps = STATE.rate_limit_windows.setdefault(user_id, [])
-    timestamps[:] = [ts for ts in timestamps if ts >= window_start]
-    if len(timestamps) >= CONFIG.rate_limit_max:
+
+    _rate_limit_calls += 1
+    if _rate_limit_calls >= _RATE_LIMIT_GC_EVERY:
+        _rate_limit_calls = 0
+        _drop_idle_rate_limits(window_start)
+
+    timestamps = STATE.rate_limit_windows.get(user_id)
+    if timestamps is None or timestamps.maxlen != CONFIG.rate_limit_max:
+        timestamps = deque(timestamps or (), maxlen=CONFIG.rate_limit_max)
+        STATE.rate_limit_windows[user_id] = timestamps
+    if len(timestamps) == timestamps.maxlen and (not timestamps or timestamps[0] >= window_start):
         logger.warning("Rate limit exceeded", extra={"user_id": user_id})
         return False
     timestamps.append(now)
     return True
 
 
+def _drop_idle_rate_limits(window_start: float) -> None:
+    """Forget users whose newest message is older than the rate-limit window."""
+    windows = STATE.rate_limit_windows
+    idle = [uid for uid, timestamps in windows.items() if not timestamps or timestamps[-1] < window_start]
+    for uid in idle:
+        del windows[uid]
+
+
 def record_user_activity(user_id: int, timestamp: float | None = None) -> None:
     """Record user activity timestamp for health/operational metrics."""
     STATE.user_last_seen[user_id] = timestamp if timestamp is not None else time.time()
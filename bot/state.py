@@ -16,12 +16,15 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections import deque
+
     from bot.services.llm_router import LLMRouter
     from bot.services.tools import ToolRegistry
     from core.document_processor import DocumentProcessor
     from core.llm_engine import LLMEngine
     from core.memory import MemoryManager
     from core.moodle_client import MoodleClient
+    from core.semantic_cache import SemanticCache
     from core.stars_client import StarsClient
     from core.sync_engine import SyncEngine
     from core.vector_store import VectorStore
@@ -57,6 +60,7 @@ class ServiceContainer:
     # ─── Agent Services (NEW) ────────────────────────────────────────────────────
     tool_registry: ToolRegistry | None = None
     llm_router: LLMRouter | None = None
+    semantic_cache: SemanticCache | None = None
 
     # ─── Sync State ──────────────────────────────────────────────────────────────
     last_sync_time: str = "Henüz yapılmadı"
@@ -70,7 +74,7 @@ class ServiceContainer:
     # ─── User State ──────────────────────────────────────────────────────────────
     active_courses: dict[int, str] = field(default_factory=dict)
     pending_upload_users: set[int] = field(default_factory=set)
-    rate_limit_windows: dict[int, list[float]] = field(default_factory=dict)
+    rate_limit_windows: dict[int, deque[float]] = field(default_factory=dict)
     user_last_seen: dict[int, float] = field(default_factory=dict)
 
     # ─── Runtime State ───────────────────────────────────────────────────────────
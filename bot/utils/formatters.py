@@ -2,8 +2,20 @@
 
 from __future__ import annotations
 
-from telegram import Message
-from telegram.error import TelegramError
+import asyncio
+import html
+import logging
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from telegram import Bot, Message
+from telegram.error import RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages over 4096 characters; leave headroom for entities
+TELEGRAM_MESSAGE_LIMIT = 4000
 
 
 def to_markdown_safe(text: str) -> str:
@@ -11,10 +23,170 @@ def to_markdown_safe(text: str) -> str:
     return text.strip()
 
 
+def format_due(ts: float) -> str:
+    """Render a Unix timestamp as local "dd/mm/YYYY HH:MM" without strftime."""
+    t = time.localtime(ts)
+    return f"{t.tm_mday:02d}/{t.tm_mon:02d}/{t.tm_year} {t.tm_hour:02d}:{t.tm_min:02d}"
+
+
+def escape_html(value: object) -> str:
+    """Escape a value for interpolation into a ParseMode.HTML message."""
+    return html.escape(str(value), quote=False)
+
+
+def iter_message_chunks(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Yield Telegram-sized pieces of text, preferring to break at newlines.
+
+    Walks the string by index and slices each piece once, instead of
+    re-slicing the shrinking remainder on every iteration.
+    """
+    i, n = 0, len(text)
+    while i < n:
+        end = min(i + limit, n)
+        if end < n:
+            # Break on the last newline in the second half of the window
+            nl = text.rfind("\n", i + limit // 2, end)
+            if nl != -1:
+                end = nl
+        yield text[i:end]
+        i = end
+        while i < n and text[i] == "\n":
+            i += 1
+
+
 async def send_text(message: Message, text: str) -> None:
     """Send text with Markdown first, then plain fallback."""
     payload = to_markdown_safe(text)
-    try:
-        await message.reply_text(payload, parse_mode="Markdown")
-    except TelegramError:
-        await message.reply_text(payload)
+    for chunk in iter_message_chunks(payload):
+        try:
+            await message.reply_text(chunk, parse_mode="Markdown")
+        except TelegramError:
+            await message.reply_text(chunk)
+
+
+class RateLimitedEditor:
+    """
+    Per-chat throttle for ``edit_text``.
+
+    Telegram answers edits faster than about one per second per chat with
+    429 and a retry_after that stalls the caller. Edits arriving inside the
+    interval are debounced: only the latest text is kept and a single
+    deferred edit sends it once the interval has passed.
+    """
+
+    def __init__(self, interval: float = 1.2) -> None:
+        self._interval = interval
+        self._last_edit: dict[int, float] = {}
+        self._pending: dict[int, tuple[Message, str, dict[str, Any]]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def touch(self, message: Message) -> None:
+        """Count a freshly sent message against its chat's edit interval."""
+        self._last_edit[message.chat_id] = time.monotonic()
+
+    async def edit(self, message: Message, text: str, **kwargs: Any) -> None:
+        """Best-effort intermediate edit; merged with later ones when too frequent."""
+        chat_id = message.chat_id
+        wait = self._last_edit.get(chat_id, 0.0) + self._interval - time.monotonic()
+        if wait <= 0 and chat_id not in self._tasks:
+            await self._edit_now(message, text, kwargs, swallow=True)
+            return
+        self._pending[chat_id] = (message, text, kwargs)
+        if chat_id not in self._tasks:
+            self._tasks[chat_id] = asyncio.create_task(self._deferred_edit(chat_id, max(wait, 0.0)))
+
+    async def flush(self, message: Message, text: str, **kwargs: Any) -> None:
+        """Final edit: drops any pending one, waits out the interval, raises TelegramError."""
+        chat_id = message.chat_id
+        task = self._tasks.pop(chat_id, None)
+        if task is not None:
+            task.cancel()
+        self._pending.pop(chat_id, None)
+        wait = self._last_edit.get(chat_id, 0.0) + self._interval - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self._edit_now(message, text, kwargs, swallow=False)
+
+    async def _deferred_edit(self, chat_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._tasks.pop(chat_id, None)
+        pending = self._pending.pop(chat_id, None)
+        if pending is not None:
+            message, text, kwargs = pending
+            await self._edit_now(message, text, kwargs, swallow=True)
+
+    async def _edit_now(self, message: Message, text: str, kwargs: dict[str, Any], *, swallow: bool) -> None:
+        self._last_edit[message.chat_id] = time.monotonic()
+        try:
+            await message.edit_text(text, **kwargs)
+        except TelegramError as exc:
+            if not swallow:
+                raise
+            logger.debug("Intermediate edit skipped: %s", exc)
+
+
+class ChatSendQueue:
+    """
+    Per-chat FIFO for ``send_message``.
+
+    Background jobs fire independently and can all finish at once; sending
+    their messages straight away bursts past Telegram's one-message-per-second
+    per-chat limit. Each chat gets an ``asyncio.Queue`` drained by a single
+    worker that spaces sends by ``interval`` and honours RetryAfter.
+    """
+
+    def __init__(self, interval: float = 1.1, max_retries: int = 3) -> None:
+        self._interval = interval
+        self._max_retries = max_retries
+        self._last_send: dict[int, float] = {}
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+
+    async def send(self, bot: Bot, chat_id: int, text: str, **kwargs: Any) -> Message:
+        """Queue a message for `chat_id` and wait until it has been sent."""
+        fut: asyncio.Future[Message] = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(chat_id, asyncio.Queue())
+        queue.put_nowait((bot, text, kwargs, fut))
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id, queue))
+        return await fut
+
+    async def _drain(self, chat_id: int, queue: asyncio.Queue) -> None:
+        try:
+            while not queue.empty():
+                bot, text, kwargs, fut = queue.get_nowait()
+                if fut.done():  # caller gave up while queued
+                    continue
+                wait = self._last_send.get(chat_id, 0.0) + self._interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    result = await self._send_now(bot, chat_id, text, kwargs)
+                except Exception as exc:
+                    # Any failure goes to the caller; an unresolved future
+                    # would leave its `await` hanging forever
+                    if not fut.done():
+                        fut.set_exception(exc)
+                else:
+                    if not fut.done():
+                        fut.set_result(result)
+        finally:
+            self._workers.pop(chat_id, None)
+
+    async def _send_now(self, bot: Bot, chat_id: int, text: str, kwargs: dict[str, Any]) -> Message:
+        retries = 0
+        while True:
+            self._last_send[chat_id] = time.monotonic()
+            try:
+                return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            except RetryAfter as exc:
+                if retries >= self._max_retries:
+                    raise
+                retries += 1
+                logger.warning("Flood limit for chat %s, retrying in %ss", chat_id, exc.retry_after)
+                await asyncio.sleep(float(exc.retry_after))
+
+
+MESSAGE_EDITOR = RateLimitedEditor()
+MESSAGE_SENDER = ChatSendQueue()
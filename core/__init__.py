@@ -26,6 +26,7 @@ class Config:
 
     # Embedding & Chunking
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+    reranker_model: str = os.getenv("RERANKER_MODEL", "")  # cross-encoder for rag_search; empty = off
     chunk_size: int = int(os.getenv("CHUNK_SIZE", "1000"))
     chunk_overlap: int = int(os.getenv("CHUNK_OVERLAP", "200"))
 
@@ -19,9 +19,11 @@ write — no accumulation, no cleanup needed there.
 
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Any
@@ -284,6 +286,17 @@ def mark_emails_read(uids: list[str]) -> int:
         return 0
 
 
+def get_email_uids() -> set[str]:
+    """Return the UIDs of all cached emails (no bodies loaded)."""
+    _ensure_init()
+    try:
+        with _conn() as conn:
+            return {r[0] for r in conn.execute("SELECT uid FROM emails")}
+    except sqlite3.Error as exc:
+        logger.error("Email UID read failed: %s", exc)
+        return set()
+
+
 def get_email_count() -> int:
     """Return total email count in cache."""
     _ensure_init()
@@ -348,8 +361,33 @@ def set_json(cache_key: str, user_id: int, data: Any) -> None:
         logger.error("Cache write failed [%s/%s]: %s", cache_key, user_id, exc)
 
 
+def set_json_many(user_id: int, items: dict[str, Any]) -> None:
+    """Overwrite several keys for one user in a single transaction."""
+    if not items:
+        return
+    _ensure_init()
+    now = time.time()
+    try:
+        rows = [
+            (cache_key, user_id, json.dumps(data, ensure_ascii=False), now)
+            for cache_key, data in items.items()
+        ]
+        with _conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO data_cache "
+                "(cache_key, user_id, json_data, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        logger.debug("Cache set [%s/%s]", ",".join(items), user_id)
+    except (sqlite3.Error, TypeError) as exc:
+        logger.error("Cache write failed [%s/%s]: %s", ",".join(items), user_id, exc)
+
+
 # ─── Student Profile ────────────────────────────────────────────────────────
 
+# Rendered get_profile_context() per user; dropped whenever that profile is written
+_profile_context_cache: dict[int, str] = {}
+
 
 def get_student_profile(user_id: int) -> dict:
     """Get student profile with preferences and behavior data."""
@@ -366,17 +404,21 @@ def get_student_profile(user_id: int) -> dict:
     return profile
 
 
+def _save_student_profile(user_id: int, profile: dict) -> None:
+    """Persist a profile and drop its rendered context."""
+    set_json("student_profile", user_id, profile)
+    _profile_context_cache.pop(user_id, None)
+
+
 def update_student_profile(user_id: int, updates: dict) -> None:
     """Update specific fields in student profile."""
     profile = get_student_profile(user_id)
     profile.update(updates)
-    set_json("student_profile", user_id, profile)
-
+    _save_student_profile(user_id, profile)
 
-def track_query(user_id: int, course: str | None = None, topic: str | None = None) -> None:
-    """Track a query for profile building."""
-    profile = get_student_profile(user_id)
 
+def _apply_query(profile: dict, course: str | None, topic: str | None) -> None:
+    """Fold one tracked query into a profile dict (in place)."""
     # Increment query count
     profile["query_count"] = profile.get("query_count", 0) + 1
 
@@ -393,19 +435,64 @@ def track_query(user_id: int, course: str | None = None, topic: str | None = Non
             topics.insert(0, topic)
             profile["last_topics"] = topics[:5]
 
-    set_json("student_profile", user_id, profile)
+
+def track_query(user_id: int, course: str | None = None, topic: str | None = None) -> None:
+    """Track a query for profile building."""
+    profile = get_student_profile(user_id)
+    _apply_query(profile, course, topic)
+    _save_student_profile(user_id, profile)
+
+
+# Write-behind buffer for track_query: the message handler only appends here;
+# a background job applies the batch with one profile read/write per user.
+_pending_queries: list[tuple[int, str | None, str | None]] = []
+_pending_lock = threading.Lock()
+
+
+def queue_query(user_id: int, course: str | None = None, topic: str | None = None) -> None:
+    """Buffer a track_query() call without touching SQLite."""
+    with _pending_lock:
+        _pending_queries.append((user_id, course, topic))
+
+
+def flush_queued_queries() -> int:
+    """Apply all buffered queries. Returns number of queries written."""
+    with _pending_lock:
+        pending = list(_pending_queries)
+        _pending_queries.clear()
+    if not pending:
+        return 0
+
+    by_user: dict[int, list[tuple[str | None, str | None]]] = {}
+    for user_id, course, topic in pending:
+        by_user.setdefault(user_id, []).append((course, topic))
+
+    for user_id, items in by_user.items():
+        profile = get_student_profile(user_id)
+        for course, topic in items:
+            _apply_query(profile, course, topic)
+        _save_student_profile(user_id, profile)
+    return len(pending)
 
 
 def get_profile_context(user_id: int) -> str:
-    """Build context string from profile for system prompt."""
-    profile = get_student_profile(user_id)
+    """Build context string from profile for system prompt (memoized until the profile changes)."""
+    cached = _profile_context_cache.get(user_id)
+    if cached is not None:
+        return cached
+    context = _render_profile_context(get_student_profile(user_id))
+    _profile_context_cache[user_id] = context
+    return context
+
 
+def _render_profile_context(profile: dict) -> str:
+    """Render the system-prompt profile block from a profile dict."""
     parts = []
 
     # Favorite courses
     course_queries = profile.get("course_queries", {})
     if course_queries:
-        top_courses = sorted(course_queries.items(), key=lambda x: x[1], reverse=True)[:3]
+        top_courses = heapq.nlargest(3, course_queries.items(), key=lambda x: x[1])
         if top_courses:
             names = [c[0] for c in top_courses]
             parts.append(f"Sık sorduğu dersler: {', '.join(names)}")
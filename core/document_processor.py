@@ -13,8 +13,11 @@ Math-aware pipeline:
 
 import io
 import logging
+import os
 import re
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -31,6 +34,9 @@ try:
 except ImportError:
     OCR_AVAILABLE = False
 
+# Tesseract runs as a subprocess, so OCR threads scale across cores.
+_OCR_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
 
 # ─── Math Symbol Normalization Map ────────────────────────────────────────────
 
@@ -136,10 +142,15 @@ MATH_SYMBOL_MAP = {
 }
 
 # Characters considered "math" for density calculation
-_MATH_CHARS = set(MATH_SYMBOL_MAP.keys()) | set("=+-*/^_{}[]()0123456789<>|\\")
+_MATH_SYMBOLS = frozenset(MATH_SYMBOL_MAP)
+_MATH_CHARS = _MATH_SYMBOLS | set("=+-*/^_{}[]()0123456789<>|\\")
+# Every key is a single character and no replacement contains another key,
+# so one translate pass equals the chain of str.replace calls
+_MATH_TRANSLATION = str.maketrans(MATH_SYMBOL_MAP)
+_MULTI_SPACE_RE = re.compile(r"  +")
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
     """A chunk of text with metadata for vector storage."""
 
@@ -280,9 +291,8 @@ class DocumentProcessor:
                     )
                 elif remaining > 0:
                     # Continue with remaining scanned pages
-                    for idx in range(PROBE_COUNT, len(scan_page_indices)):
-                        pi = scan_page_indices[idx]
-                        ocr_text = self._ocr_page(doc[pi], pi, path.name)
+                    rest = scan_page_indices[PROBE_COUNT:]
+                    for pi, ocr_text in zip(rest, self._ocr_pages(doc, rest, path.name)):
                         if ocr_text and self._ocr_quality_ok(ocr_text):
                             result_pages[pi] = ocr_text
                             ocr_count += 1
@@ -424,11 +434,52 @@ class DocumentProcessor:
         ratio = len(real_words) / len(words)
         return ratio >= 0.25 and len(real_words) >= 15
 
+    def _ocr_pages(self, doc, page_indices: list[int], filename: str) -> list[str]:
+        """OCR several PDF pages in parallel, returning texts in page_indices order.
+
+        fitz documents are not thread-safe, so pages are rasterised here one
+        by one; only the Tesseract passes fan out to the pool. At most two
+        rendered pages per worker are in flight, so memory stays flat however
+        long the scan is.
+        """
+        if len(page_indices) < 2 or _OCR_WORKERS == 1:
+            return [self._ocr_page(doc[pi], pi, filename) for pi in page_indices]
+        workers = min(_OCR_WORKERS, len(page_indices))
+        texts: list[str] = []
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as pool:
+            for pi in page_indices:
+                if len(pending) >= 2 * workers:
+                    texts.append(pending.popleft().result())
+                pending.append(pool.submit(self._ocr_png, self._render_png(doc[pi], pi, filename), pi, filename))
+            texts.extend(f.result() for f in pending)
+        return texts
+
     def _ocr_page(self, page, page_num: int, filename: str) -> str:
         """OCR a single PDF page using Tesseract with two-pass strategy."""
+        return self._ocr_png(self._render_png(page, page_num, filename), page_num, filename)
+
+    @staticmethod
+    def _render_png(page, page_num: int, filename: str) -> bytes | None:
+        """Rasterise a PDF page to PNG bytes for OCR (None on failure)."""
+        try:
+            return page.get_pixmap(dpi=200).tobytes("png")
+        except (OSError, RuntimeError, TypeError, ValueError) as exc:
+            logger.warning(
+                "Page render failed for file=%s page=%s: %s",
+                filename,
+                page_num + 1,
+                exc,
+                exc_info=True,
+                extra={"file_name": filename, "page_num": page_num + 1},
+            )
+            return None
+
+    def _ocr_png(self, img_bytes: bytes | None, page_num: int, filename: str) -> str:
+        """Run the Tesseract passes on a rendered page."""
+        if img_bytes is None:
+            return ""
         try:
-            pix = page.get_pixmap(dpi=200)
-            img_bytes = pix.tobytes("png")
             img = Image.open(io.BytesIO(img_bytes))
 
             # Pass 1: Turkish + English with PSM 6 (uniform block — better for academic pages)
@@ -555,12 +606,9 @@ class DocumentProcessor:
     @staticmethod
     def _normalize_math_text(text: str) -> str:
         """Convert Unicode math symbols to searchable text for embedding."""
-        for symbol, replacement in MATH_SYMBOL_MAP.items():
-            if symbol in text:
-                text = text.replace(symbol, replacement)
+        text = text.translate(_MATH_TRANSLATION)
         # Clean up multiple spaces
-        text = re.sub(r"  +", " ", text)
-        return text
+        return _MULTI_SPACE_RE.sub(" ", text)
 
     @staticmethod
     def _math_density(line: str) -> float:
@@ -574,8 +622,13 @@ class DocumentProcessor:
     @staticmethod
     def _has_math_content(text: str) -> bool:
         """Check if text contains significant math content."""
-        math_count = sum(1 for c in text if c in set(MATH_SYMBOL_MAP.keys()))
-        return math_count >= 3
+        math_count = 0
+        for c in text:
+            if c in _MATH_SYMBOLS:
+                math_count += 1
+                if math_count >= 3:
+                    return True
+        return False
 
     def _protect_equation_blocks(self, text: str) -> str:
         """Wrap consecutive math-heavy lines with sentinel markers."""
@@ -609,9 +662,7 @@ class DocumentProcessor:
         Produces dual-text chunks: original for LLM, normalized for embedding.
         """
         # Combine all pages with page markers
-        full_text = ""
-        for i, page in enumerate(pages):
-            full_text += f"\n[Page {i+1}]\n{page}\n"
+        full_text = "".join(f"\n[Page {i+1}]\n{page}\n" for i, page in enumerate(pages))
 
         # Protect equation blocks from splitting
         protected_text = self._protect_equation_blocks(full_text)
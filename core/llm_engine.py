@@ -11,6 +11,10 @@ Multi-provider LLM integration with:
 import json
 import logging
 import re
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
 
 from core.llm_providers import LLM_PROVIDER_EXCEPTIONS, MultiProviderEngine
 from core.memory import HybridMemoryManager
@@ -19,6 +23,31 @@ from core.vector_store import VectorStore
 logger = logging.getLogger(__name__)
 
 
+# ─── Prompt Injection Filter ─────────────────────────────────────────────────
+
+# All patterns fused into one case-insensitive alternation: a single pass per
+# chunk instead of 12 re.sub calls (applied to every RAG chunk in every prompt).
+_INJECTION_RE = re.compile(
+    "|".join(
+        [
+            r"ignore\s+(?:all\s+)?previous\s+instructions",
+            r"ignore\s+(?:all\s+)?above",
+            r"disregard\s+(?:all\s+)?(?:previous|above|prior)",
+            r"you\s+are\s+now\s+a",
+            r"new\s+role\s*:",
+            r"system\s*prompt\s*:",
+            r"IMPORTANT\s*:\s*ignore",
+            r"override\s+(?:system|instructions)",
+            r"forget\s+(?:everything|all|your)",
+            r"rolünü\s+değiştir",
+            r"talimatları\s+(?:unut|yoksay|görmezden)",
+            r"önceki\s+talimatları\s+(?:unut|yoksay)",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+
 # ─── System Prompts ──────────────────────────────────────────────────────────
 
 SYSTEM_PROMPT_CHAT = """Sen Bilkent Üniversitesi öğrencisinin kişisel akademik öğretmenisin.
@@ -175,6 +204,27 @@ def _safe_parse_json(raw: str, fallback=None):
     return fallback
 
 
+# ─── Student Context Constants ──────────────────────────────────────────────
+
+_TR_TZ = timezone(timedelta(hours=3))
+_DAYS_TR = ("Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar")
+_MONTHS_TR = (
+    "",
+    "Ocak",
+    "Şubat",
+    "Mart",
+    "Nisan",
+    "Mayıs",
+    "Haziran",
+    "Temmuz",
+    "Ağustos",
+    "Eylül",
+    "Ekim",
+    "Kasım",
+    "Aralık",
+)
+
+
 # ─── LLM Engine ─────────────────────────────────────────────────────────────
 
 
@@ -192,52 +242,49 @@ class LLMEngine:
         self.active_course: str | None = None
         self._student_ctx_cache: str | None = None
         self._student_ctx_ts: float = 0  # monotonic timestamp
+        self._student_ctx_sources: tuple | None = None
+        # Course material block, rebuilt only when the course list or the
+        # indexed chunks change (it walks every chunk's metadata)
+        self._material_ctx: str = ""
+        self._material_ctx_sources: tuple | None = None
 
     # ─── Student Context ──────────────────────────────────────────────────
 
     def invalidate_student_context(self):
         """Force refresh of cached student context (call after STARS/schedule/assignment updates)."""
         self._student_ctx_cache = None
+        self._material_ctx_sources = None
+
+    def _material_sources(self) -> tuple:
+        """Inputs of the material block: compared by identity and length, like the course index."""
+        metadatas = getattr(self.vector_store, "_metadatas", None)
+        return (self.moodle_courses, len(self.moodle_courses), metadatas, len(metadatas or ()))
+
+    @staticmethod
+    def _same_sources(old: tuple | None, new: tuple) -> bool:
+        return old is not None and old[0] is new[0] and old[1] == new[1] and old[2] is new[2] and old[3] == new[3]
 
     def _build_student_context(self) -> str:
         """Build unified student context for system prompt injection.
         Aggregates: date/time, schedule, STARS data, assignment deadlines.
         Cached for 5 minutes (invalidated on data changes).
         """
-        import time as _time
-
-        now = _time.monotonic()
-        if self._student_ctx_cache is not None and (now - self._student_ctx_ts) < 300:
+        now = time.monotonic()
+        sources = self._material_sources()
+        if (
+            self._student_ctx_cache is not None
+            and (now - self._student_ctx_ts) < 300
+            and self._same_sources(self._student_ctx_sources, sources)
+        ):
             return self._student_ctx_cache
 
-        from datetime import datetime as _dt
-        from datetime import timedelta as _td
-        from datetime import timezone as _tz
-
         parts = []
 
         # Current date/time (Turkey UTC+3)
-        _tr_tz = _tz(_td(hours=3))
-        _now = _dt.now(_tr_tz)
-        _days_tr = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        _months_tr = [
-            "",
-            "Ocak",
-            "Şubat",
-            "Mart",
-            "Nisan",
-            "Mayıs",
-            "Haziran",
-            "Temmuz",
-            "Ağustos",
-            "Eylül",
-            "Ekim",
-            "Kasım",
-            "Aralık",
-        ]
+        tr_now = datetime.now(_TR_TZ)
         parts.append(
-            f"Bugün: {_now.day} {_months_tr[_now.month]} {_now.year}, "
-            f"{_days_tr[_now.weekday()]}, saat {_now.strftime('%H:%M')}."
+            f"Bugün: {tr_now.day} {_MONTHS_TR[tr_now.month]} {tr_now.year}, "
+            f"{_DAYS_TR[tr_now.weekday()]}, saat {tr_now.strftime('%H:%M')}."
         )
 
         if self.schedule_text:
@@ -249,17 +296,30 @@ class LLMEngine:
         if self.assignments_context:
             parts.append(self.assignments_context)
 
+        material = self._material_context(sources)
+        if material:
+            parts.append(material)
+
+        result = "\n\n" + "\n\n".join(parts)
+        self._student_ctx_cache = result
+        self._student_ctx_ts = now
+        self._student_ctx_sources = sources
+        return result
+
+    def _material_context(self, sources: tuple) -> str:
+        """Course list with per-course indexed file counts (memoized on its sources)."""
+        if self._same_sources(self._material_ctx_sources, sources):
+            return self._material_ctx
+
+        text = ""
         # Course material awareness — full Moodle course list + indexed file names
         try:
             # Build per-course file lists from vector store
-            course_files: dict[str, dict[str, int]] = {}
-            for meta in self.vector_store._metadatas:
+            course_files: defaultdict[str, Counter[str]] = defaultdict(Counter)
+            for meta in sources[2]:
                 c = meta.get("course", "")
                 if c:
-                    fname = meta.get("filename", "")
-                    if c not in course_files:
-                        course_files[c] = {}
-                    course_files[c][fname] = course_files[c].get(fname, 0) + 1
+                    course_files[c][meta.get("filename", "")] += 1
             total_chunks = sum(sum(files.values()) for files in course_files.values())
 
             lines = []
@@ -291,14 +351,13 @@ class LLMEngine:
                     lines.append(f"- {c}: {count} parça, {len(fmap)} dosya\n  Dosyalar: {file_names}")
 
             if lines:
-                parts.append(f"KAYITLI DERSLER VE MATERYAL DURUMU ({total_chunks} toplam parça):\n" + "\n".join(lines))
+                text = f"KAYITLI DERSLER VE MATERYAL DURUMU ({total_chunks} toplam parça):\n" + "\n".join(lines)
         except (AttributeError, KeyError, TypeError, ValueError) as exc:
             logger.debug("Student context enrichment skipped: %s", exc)
 
-        result = "\n\n" + "\n\n".join(parts)
-        self._student_ctx_cache = result
-        self._student_ctx_ts = now
-        return result
+        self._material_ctx = text
+        self._material_ctx_sources = sources
+        return text
 
     # ─── Relevance Check ─────────────────────────────────────────────────
 
@@ -319,24 +378,15 @@ class LLMEngine:
 
     # ─── Conversational Chat (history-based) ─────────────────────────────
 
-    def chat_with_history(
+    def _prepare_chat(
         self,
         messages: list[dict],
-        context_chunks: list[dict] | None = None,
-        study_mode: bool = False,
-        extra_context: str = "",
-        extra_system: str = "",
-    ) -> str:
-        """
-        Pure conversational chat: takes full message history + RAG chunks.
-        No internal state management — the caller provides everything.
-
-        messages: list of {"role": "user"/"assistant", "content": "..."}
-        context_chunks: raw results from vector_store.query()
-        study_mode: if True, use strict grounding prompt + study task route
-        extra_context: prepended to RAG context (e.g. file summaries)
-        extra_system: appended to system prompt (e.g. socratic mode toggle)
-        """
+        context_chunks: list[dict] | None,
+        study_mode: bool,
+        extra_context: str,
+        extra_system: str,
+    ) -> tuple[str, list[dict], str, str]:
+        """Build (system, llm_messages, task, context_text) for a chat turn."""
         # Format RAG context
         context_text = self._format_context(context_chunks) if context_chunks else ""
 
@@ -389,8 +439,41 @@ class LLMEngine:
             else:
                 llm_messages.append(msg)
 
-        # Study mode: use study task route + higher token limit
         task = "study" if study_mode else "chat"
+        return system, llm_messages, task, context_text
+
+    def _record_chat(self, messages: list[dict], reply: str, context_text: str) -> None:
+        """Record a finished exchange for persistent memory."""
+        user_msg = messages[-1]["content"] if messages else ""
+        self.mem_manager.record_exchange(
+            user_message=user_msg,
+            assistant_response=reply,
+            course=self.active_course or "",
+            rag_sources=context_text[:500] if context_text else "",
+        )
+
+    def chat_with_history(
+        self,
+        messages: list[dict],
+        context_chunks: list[dict] | None = None,
+        study_mode: bool = False,
+        extra_context: str = "",
+        extra_system: str = "",
+    ) -> str:
+        """
+        Pure conversational chat: takes full message history + RAG chunks.
+        No internal state management — the caller provides everything.
+
+        messages: list of {"role": "user"/"assistant", "content": "..."}
+        context_chunks: raw results from vector_store.query()
+        study_mode: if True, use strict grounding prompt + study task route
+        extra_context: prepended to RAG context (e.g. file summaries)
+        extra_system: appended to system prompt (e.g. socratic mode toggle)
+        """
+        system, llm_messages, task, context_text = self._prepare_chat(
+            messages, context_chunks, study_mode, extra_context, extra_system
+        )
+        # Study mode: higher token limit on the study task route
         max_tokens = 3072 if study_mode else 4096
 
         try:
@@ -400,16 +483,7 @@ class LLMEngine:
                 messages=llm_messages,
                 max_tokens=max_tokens,
             )
-
-            # Record for persistent memory
-            user_msg = messages[-1]["content"] if messages else ""
-            self.mem_manager.record_exchange(
-                user_message=user_msg,
-                assistant_response=reply,
-                course=course or "",
-                rag_sources=context_text[:500] if context_text else "",
-            )
-
+            self._record_chat(messages, reply, context_text)
             return reply
 
         except LLM_PROVIDER_EXCEPTIONS as exc:
@@ -417,22 +491,59 @@ class LLMEngine:
                 "Chat completion failed: %s",
                 exc,
                 exc_info=True,
-                extra={"course": course or "", "study_mode": study_mode},
+                extra={"course": self.active_course or "", "study_mode": study_mode},
             )
             return f"Hata: {exc}"
 
+    def stream_chat_with_history(
+        self,
+        messages: list[dict],
+        context_chunks: list[dict] | None = None,
+        study_mode: bool = False,
+        extra_context: str = "",
+        extra_system: str = "",
+    ) -> Iterator[str]:
+        """
+        Streaming variant of chat_with_history: yields reply text deltas.
+        The full reply is recorded to memory once the stream completes.
+        """
+        system, llm_messages, task, context_text = self._prepare_chat(
+            messages, context_chunks, study_mode, extra_context, extra_system
+        )
+        max_tokens = 3072 if study_mode else 4096
+
+        parts: list[str] = []
+        try:
+            for delta in self.engine.stream(
+                task=task,
+                system=system,
+                messages=llm_messages,
+                max_tokens=max_tokens,
+            ):
+                parts.append(delta)
+                yield delta
+        except LLM_PROVIDER_EXCEPTIONS as exc:
+            logger.error(
+                "Chat stream failed: %s",
+                exc,
+                exc_info=True,
+                extra={"course": self.active_course or "", "study_mode": study_mode},
+            )
+            yield f"\n\nHata: {exc}"
+            return
+
+        self._record_chat(messages, "".join(parts), context_text)
+
     # ─── Weekly Summary ──────────────────────────────────────────────────
 
-    def generate_weekly_summary(
+    def _weekly_summary_request(
         self,
         course_name: str,
         section_name: str,
-        section_content: str,
-        additional_context: str = "",
-    ) -> str:
-        """
-        Generate a comprehensive weekly summary for a specific course section.
-        """
+        section_content: str | list[str],
+        additional_context: str,
+    ) -> tuple[str, list[dict]]:
+        """Build (system, messages) for a weekly summary call."""
         # Also pull relevant chunks for this section
         chunks = self.vector_store.query(
             query_text=f"{course_name} {section_name}",
@@ -441,28 +552,53 @@ class LLMEngine:
         )
         chunk_context = self._format_context(chunks)
 
-        prompt = (
-            f"Create a detailed weekly summary for the following course section.\n"
-            f"IMPORTANT: Respond in the same language as the course content below.\n\n"
+        parts = [
+            "Create a detailed weekly summary for the following course section.\n"
+            "IMPORTANT: Respond in the same language as the course content below.\n\n"
             f"COURSE: {course_name}\n"
             f"SECTION: {section_name}\n\n"
-            f"SECTION CONTENT:\n{section_content}\n\n"
-        )
+            "SECTION CONTENT:\n"
+        ]
+        if isinstance(section_content, str):
+            parts.append(section_content)
+        else:
+            for i, text in enumerate(section_content):
+                if i:
+                    parts.append("\n\n")
+                parts.append(text)
+        parts.append("\n\n")
 
         if chunk_context:
-            prompt += f"RELEVANT DOCUMENT EXCERPTS:\n{chunk_context}\n\n"
+            parts.append(f"RELEVANT DOCUMENT EXCERPTS:\n{chunk_context}\n\n")
 
         if additional_context:
-            prompt += f"ADDITIONAL CONTEXT:\n{additional_context}\n\n"
+            parts.append(f"ADDITIONAL CONTEXT:\n{additional_context}\n\n")
 
-        prompt += "Based on the above content, create a comprehensive weekly summary."
+        parts.append("Based on the above content, create a comprehensive weekly summary.")
+        system = SYSTEM_PROMPT_SUMMARY + self._build_student_context()
+        return system, [{"role": "user", "content": "".join(parts)}]
 
+    def generate_weekly_summary(
+        self,
+        course_name: str,
+        section_name: str,
+        section_content: str | list[str],
+        additional_context: str = "",
+    ) -> str:
+        """
+        Generate a comprehensive weekly summary for a specific course section.
+
+        section_content may be a list of chunk texts; they are joined only
+        once, while assembling the final prompt.
+        """
         try:
-            system = SYSTEM_PROMPT_SUMMARY + self._build_student_context()
+            system, messages = self._weekly_summary_request(
+                course_name, section_name, section_content, additional_context
+            )
             return self.engine.complete(
                 task="summary",
                 system=system,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 max_tokens=4096,
             )
         except LLM_PROVIDER_EXCEPTIONS as exc:
@@ -474,6 +610,33 @@ class LLMEngine:
             )
             return f"Özet oluşturma hatası: {exc}"
 
+    def stream_weekly_summary(
+        self,
+        course_name: str,
+        section_name: str,
+        section_content: str | list[str],
+        additional_context: str = "",
+    ) -> Iterator[str]:
+        """Streaming variant of generate_weekly_summary: yields summary text deltas."""
+        try:
+            system, messages = self._weekly_summary_request(
+                course_name, section_name, section_content, additional_context
+            )
+            yield from self.engine.stream(
+                task="summary",
+                system=system,
+                messages=messages,
+                max_tokens=4096,
+            )
+        except LLM_PROVIDER_EXCEPTIONS as exc:
+            logger.error(
+                "Weekly summary stream failed: %s",
+                exc,
+                exc_info=True,
+                extra={"course": course_name, "section": section_name},
+            )
+            yield f"\n\nÖzet oluşturma hatası: {exc}"
+
     # ─── Course Overview ─────────────────────────────────────────────────
 
     def generate_course_overview(self, course_topics_text: str) -> str:
@@ -637,9 +800,7 @@ class LLMEngine:
                 )
 
             if attempt < max_retries - 1:
-                import time as _time
-
-                _time.sleep(2)
+                time.sleep(2)
 
         # All retries failed — build fallback from raw context
         logger.error(f"Tutor step failed after {max_retries} attempts: {last_error}")
@@ -940,26 +1101,7 @@ class LLMEngine:
     @staticmethod
     def _sanitize_chunk(text: str) -> str:
         """Strip known prompt injection patterns from chunk text."""
-        import re
-
-        # Remove lines that look like injection attempts
-        injection_patterns = [
-            r"(?i)ignore\s+(all\s+)?previous\s+instructions",
-            r"(?i)ignore\s+(all\s+)?above",
-            r"(?i)disregard\s+(all\s+)?(previous|above|prior)",
-            r"(?i)you\s+are\s+now\s+a",
-            r"(?i)new\s+role\s*:",
-            r"(?i)system\s*prompt\s*:",
-            r"(?i)IMPORTANT\s*:\s*ignore",
-            r"(?i)override\s+(system|instructions)",
-            r"(?i)forget\s+(everything|all|your)",
-            r"(?i)rolünü\s+değiştir",
-            r"(?i)talimatları\s+(unut|yoksay|görmezden)",
-            r"(?i)önceki\s+talimatları\s+(unut|yoksay)",
-        ]
-        for pattern in injection_patterns:
-            text = re.sub(pattern, "[FILTERED]", text)
-        return text
+        return _INJECTION_RE.sub("[FILTERED]", text)
 
     def _format_context(self, chunks: list[dict]) -> str:
         """Format retrieved chunks into a readable context block with real file names."""
@@ -22,6 +22,7 @@ Gemini/GLM natively support this. Claude uses the Anthropic SDK.
 import logging
 import os
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from dataclasses import dataclass
 from enum import Enum
 
@@ -242,9 +243,10 @@ class TaskRouter:
             complexity=os.getenv("MODEL_COMPLEXITY", "gpt-4.1-mini"),
         )
 
-    def estimate_monthly_cost(self, turns_per_day: int = 20) -> dict:
+    def estimate_monthly_cost(self, turns_per_day: int = 20, presets: dict[str, ModelConfig] | None = None) -> dict:
         """Estimate monthly cost based on average usage."""
-        presets = _get_presets()
+        if presets is None:
+            presets = _get_presets()
         estimates = {}
 
         # Average tokens per task type
@@ -296,6 +298,10 @@ class LLMAdapter(ABC):
         """Send a chat completion request and return the response text."""
         pass
 
+    def stream(self, system: str, messages: list[dict], max_tokens: int = 4096) -> Iterator[str]:
+        """Yield response text deltas. Default: a single chunk from complete()."""
+        yield self.complete(system, messages, max_tokens)
+
 
 class AnthropicAdapter(LLMAdapter):
     """Adapter for Anthropic Claude API."""
@@ -315,6 +321,15 @@ class AnthropicAdapter(LLMAdapter):
         )
         return response.content[0].text
 
+    def stream(self, system: str, messages: list[dict], max_tokens: int = 4096) -> Iterator[str]:
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            system=system,
+            messages=messages,
+        ) as stream:
+            yield from stream.text_stream
+
 
 class OpenAIAdapter(LLMAdapter):
     """Adapter for OpenAI API."""
@@ -339,6 +354,17 @@ class OpenAIAdapter(LLMAdapter):
         )
         return response.choices[0].message.content
 
+    def stream(self, system: str, messages: list[dict], max_tokens: int = 4096) -> Iterator[str]:
+        full_messages = [{"role": "system", "content": system}] + messages
+        token_key = "max_completion_tokens" if "gpt-5" in self.model else "max_tokens"
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=full_messages,
+            stream=True,
+            **{token_key: max_tokens},
+        )
+        yield from _iter_openai_deltas(response)
+
 
 class GLMAdapter(LLMAdapter):
     """
@@ -364,6 +390,26 @@ class GLMAdapter(LLMAdapter):
         )
         return response.choices[0].message.content
 
+    def stream(self, system: str, messages: list[dict], max_tokens: int = 4096) -> Iterator[str]:
+        full_messages = [{"role": "system", "content": system}] + messages
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=full_messages,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        yield from _iter_openai_deltas(response)
+
+
+def _iter_openai_deltas(response) -> Iterator[str]:
+    """Extract non-empty content deltas from an OpenAI-compatible stream."""
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
 
 # ─── Adapter Factory ────────────────────────────────────────────────────────
 
@@ -394,6 +440,9 @@ class MultiProviderEngine:
         self.router = TaskRouter.from_env()
         self._adapters: dict[str, LLMAdapter] = {}
         self._cost_tracker: dict[str, float] = {}
+        # Presets and routing are fixed for the engine's lifetime, so these are too
+        self._available_models: list[dict] | None = None
+        self._cost_estimates: dict[int, dict] = {}
 
     def get_adapter(self, model_key: str) -> LLMAdapter:
         """Get or create an adapter for the given model key."""
@@ -442,6 +491,35 @@ class MultiProviderEngine:
             # Fallback: try another model
             return self._fallback_complete(task, system, messages, max_tokens, failed=model_key)
 
+    def stream(self, task: str, system: str, messages: list[dict], max_tokens: int = 4096) -> Iterator[str]:
+        """
+        Route a task like complete(), but yield response text as it arrives.
+
+        If the primary model fails before producing any output, the full
+        fallback chain is used and its reply is yielded as a single chunk.
+        """
+        model_key = getattr(self.router, task, self.router.chat)
+        adapter = self.get_adapter(model_key)
+
+        started = False
+        try:
+            for delta in adapter.stream(system, messages, max_tokens):
+                started = True
+                yield delta
+            logger.debug(f"[{task}] → {model_key}: OK (stream)")
+        except LLM_PROVIDER_EXCEPTIONS as exc:
+            logger.error(
+                "LLM stream failed for task=%s model=%s: %s",
+                task,
+                model_key,
+                exc,
+                exc_info=True,
+                extra={"task": task, "model_key": model_key},
+            )
+            if started:
+                raise
+            yield self._fallback_complete(task, system, messages, max_tokens, failed=model_key)
+
     def _fallback_complete(self, task: str, system: str, messages: list[dict], max_tokens: int, failed: str) -> str:
         """Try alternative models if the primary fails."""
         # Fallback priority: glm → openai → anthropic (if available)
@@ -468,6 +546,8 @@ class MultiProviderEngine:
 
     def get_available_models(self) -> list[dict]:
         """List all models with configured API keys."""
+        if self._available_models is not None:
+            return list(self._available_models)
         available = []
         for key, mc in self.presets.items():
             available.append(
@@ -480,8 +560,13 @@ class MultiProviderEngine:
                     "description": mc.description,
                 }
             )
-        return available
+        self._available_models = available
+        return list(available)
 
     def estimate_costs(self, turns_per_day: int = 20) -> dict:
         """Estimate monthly costs for current routing config."""
-        return self.router.estimate_monthly_cost(turns_per_day)
+        estimates = self._cost_estimates.get(turns_per_day)
+        if estimates is None:
+            estimates = self.router.estimate_monthly_cost(turns_per_day, self.presets)
+            self._cost_estimates[turns_per_day] = estimates
+        return dict(estimates)
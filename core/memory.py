@@ -34,11 +34,14 @@ Why hybrid?
 
 import json
 import logging
+import os
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
 from core import config
@@ -218,8 +221,6 @@ class StaticProfile:
                 university = sitename
 
         # Detect semester from MOODLE_URL
-        import os
-
         moodle_url = os.getenv("MOODLE_URL", "")
         semester = ""
         if "spring" in moodle_url.lower():
@@ -229,26 +230,24 @@ class StaticProfile:
         elif "summer" in moodle_url.lower():
             semester = "Yaz"
         # Extract year: e.g., /2025-2026-spring → 2025-2026
-        import re as _re
-
-        year_match = _re.search(r"(\d{4}-\d{4})", moodle_url)
+        year_match = re.search(r"(\d{4}-\d{4})", moodle_url)
         if year_match and semester:
             semester = f"{year_match.group(1)} {semester}"
 
         # Only fill empty fields (don't overwrite user edits)
         if fullname and "- İsim: \n" in profile or "- İsim:\n" in profile:
-            profile = _re.sub(r"- İsim:.*", f"- İsim: {fullname}", profile)
+            profile = re.sub(r"- İsim:.*", f"- İsim: {fullname}", profile)
 
         if username and "- Öğrenci No:" not in profile:
-            profile = _re.sub(r"(- İsim:.*\n)", rf"\1- Öğrenci No: {username}\n", profile)
+            profile = re.sub(r"(- İsim:.*\n)", rf"\1- Öğrenci No: {username}\n", profile)
 
         if university and (
             "- Üniversite: Bilkent" in profile or "- Üniversite: \n" in profile or "- Üniversite:\n" in profile
         ):
-            profile = _re.sub(r"- Üniversite:.*", f"- Üniversite: {university}", profile)
+            profile = re.sub(r"- Üniversite:.*", f"- Üniversite: {university}", profile)
 
         if semester and "- Dönem: \n" in profile or "- Dönem:\n" in profile:
-            profile = _re.sub(r"- Dönem:.*", f"- Dönem: {semester}", profile)
+            profile = re.sub(r"- Dönem:.*", f"- Dönem: {semester}", profile)
 
         self.update(profile)
 
@@ -266,7 +265,7 @@ class StaticProfile:
 # ─── Data Models ─────────────────────────────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryEntry:
     id: int | None = None
     category: str = ""  # preference, fact, goal, struggle, insight, exam
@@ -292,7 +291,7 @@ class MemoryEntry:
         return f"{prefix} {self.content}"
 
 
-@dataclass
+@dataclass(slots=True)
 class LearningRecord:
     id: int | None = None
     course: str = ""
@@ -661,6 +660,13 @@ Return JSON list of specific topic strings. [] if none.
 # ─── Memory Manager (Orchestrator) ──────────────────────────────────────────
 
 
+def _log_learner_failure(future) -> None:
+    """Surface errors from background memory extraction, which nobody awaits."""
+    exc = future.exception()
+    if exc is not None:
+        logger.warning("Background memory extraction failed: %s", exc, exc_info=exc)
+
+
 class HybridMemoryManager:
     """
     Orchestrates both layers.
@@ -673,6 +679,8 @@ class HybridMemoryManager:
         self.db = DynamicMemoryDB()
         self.current_session_id: int | None = None
         self._engine = None
+        # Single worker: memory extraction runs behind the reply, in order
+        self._learner: ThreadPoolExecutor | None = None
 
     @property
     def engine(self):
@@ -729,7 +737,9 @@ class HybridMemoryManager:
 
         # Layer 4: Recent messages (cross-session continuity)
         recent = self.db.get_recent_messages(limit=4)
-        recent_ids = {m.get("id") for m in recent} if recent else set()
+        # Message ids already in context; deep recall adds to it as it goes, so
+        # a message matched by several keywords is only considered once
+        seen_ids = set(map(itemgetter("id"), recent))
         if recent:
             lines = []
             for msg in recent:
@@ -745,8 +755,9 @@ class HybridMemoryManager:
                 recall_lines: list[str] = []
                 for kw in keywords:
                     for m in self.db.search_messages(kw, limit=3):
-                        if m.get("id") in recent_ids:
+                        if m["id"] in seen_ids:
                             continue
+                        seen_ids.add(m["id"])
                         preview = m["content"][:120].replace("\n", " ")
                         if preview not in seen_contents:
                             seen_contents.add(preview)
@@ -781,8 +792,18 @@ class HybridMemoryManager:
         )
 
         if len(user_message) > 50 and not user_message.startswith("/"):
-            self._extract_memories(user_message, assistant_response, course, user_msg_id)
-            self._detect_topics(user_message, course)
+            # Two extra LLM calls; the caller already has its reply, so don't
+            # make it wait for them
+            if self._learner is None:
+                self._learner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory")
+            future = self._learner.submit(
+                self._learn_from_exchange, user_message, assistant_response, course, user_msg_id
+            )
+            future.add_done_callback(_log_learner_failure)
+
+    def _learn_from_exchange(self, user_msg: str, assistant_msg: str, course: str, source_id: int):
+        self._extract_memories(user_msg, assistant_msg, course, source_id)
+        self._detect_topics(user_msg, course)
 
     def _extract_memories(self, user_msg: str, assistant_msg: str, course: str, source_id: int):
         try:
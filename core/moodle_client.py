@@ -9,7 +9,10 @@ import logging
 import mimetypes
 import os
 import re
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import requests
@@ -22,7 +25,7 @@ logger = logging.getLogger(__name__)
 # ─── Data Models ─────────────────────────────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class MoodleFile:
     """Represents a downloadable file from Moodle."""
 
@@ -41,7 +44,7 @@ class MoodleFile:
         return ext in {".pdf", ".docx", ".doc", ".pptx", ".ppt", ".txt", ".md", ".html", ".htm", ".rtf", ".odt"}
 
 
-@dataclass
+@dataclass(slots=True)
 class CourseSection:
     """Represents a week/topic section in a course."""
 
@@ -52,7 +55,7 @@ class CourseSection:
     modules: list[dict]
 
 
-@dataclass
+@dataclass(slots=True)
 class Course:
     """Represents an enrolled course."""
 
@@ -60,9 +63,15 @@ class Course:
     shortname: str
     fullname: str
     sections: list[CourseSection] = None
+    # Lower-cased "fullname\nshortname", built once so name lookups don't
+    # re-lowercase both strings for every course on every query.
+    search_key: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self.search_key = f"{self.fullname}\n{self.shortname}".lower()
 
-@dataclass
+
+@dataclass(slots=True)
 class Assignment:
     """Represents a Moodle assignment."""
 
@@ -101,6 +110,12 @@ class MoodleClient:
 
     TOKEN_FILE = config.data_dir / ".moodle_token"
 
+    # Short-lived response caches: several jobs/tools ask for the same lists
+    # within seconds of each other; each uncached call is one or more HTTP trips
+    COURSES_TTL = 60.0
+    ASSIGNMENTS_TTL = 120.0
+    STATUS_WORKERS = 4  # concurrent submission-status calls in get_assignments
+
     def __init__(self):
         self.base_url = config.moodle_url.rstrip("/")
         self.token = self._resolve_token()
@@ -108,6 +123,12 @@ class MoodleClient:
         self.session = requests.Session()
         self.user_id: int | None = None
         self.site_info: dict = {}
+        self._courses_cache: tuple[float, list[Course]] | None = None
+        self._assignments_cache: tuple[float, list[Assignment]] | None = None
+        # assign id → (submitted, graded, grade) once graded and past its deadlines;
+        # such statuses don't change, so later polls skip their status calls
+        self._settled_statuses: dict[int, tuple[bool, bool, str]] = {}
+        self._cache_lock = threading.Lock()
 
     def _resolve_token(self) -> str:
         """
@@ -284,8 +305,30 @@ class MoodleClient:
 
     # ─── Courses ─────────────────────────────────────────────────────────
 
+    def invalidate_cache(self) -> None:
+        """Drop cached course/assignment lists so the next call hits Moodle."""
+        with self._cache_lock:
+            self._courses_cache = None
+            self._assignments_cache = None
+            self._settled_statuses.clear()
+
+    def _cached(self, attr: str, ttl: float) -> list | None:
+        with self._cache_lock:
+            entry = getattr(self, attr)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return list(entry[1])
+        return None
+
+    def _store(self, attr: str, items: list) -> None:
+        with self._cache_lock:
+            setattr(self, attr, (time.monotonic(), items))
+
     def get_courses(self) -> list[Course]:
-        """Get all enrolled courses."""
+        """Get all enrolled courses (cached for COURSES_TTL seconds)."""
+        cached = self._cached("_courses_cache", self.COURSES_TTL)
+        if cached is not None:
+            return cached
+
         if not self.user_id:
             self.connect()
 
@@ -303,7 +346,8 @@ class MoodleClient:
                 )
             )
         logger.info(f"Found {len(courses)} enrolled courses.")
-        return courses
+        self._store("_courses_cache", courses)
+        return list(courses)
 
     # ─── Course Content (Sections + Modules) ─────────────────────────────
 
@@ -334,12 +378,13 @@ class MoodleClient:
         """
         Discover all downloadable document files in a course.
         Traverses sections → modules → contents to find files.
+        Reuses course.sections when the caller already fetched them.
         """
-        sections = self.get_course_content(course.id)
-        course.sections = sections
+        if not course.sections:
+            course.sections = self.get_course_content(course.id)
         files = []
 
-        for section in sections:
+        for section in course.sections:
             for module in section.modules:
                 mod_name = module.get("name", "Unnamed")
 
@@ -397,7 +442,8 @@ class MoodleClient:
             resp.raise_for_status()
 
             with open(target_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
+                # 1 MiB reads: lecture PDFs are often tens of MB, 8 KiB meant thousands of writes
+                for chunk in resp.iter_content(chunk_size=1 << 20):
                     f.write(chunk)
 
             logger.info(f"Downloaded: {moodle_file.filename} ({moodle_file.filesize} bytes)")
@@ -515,8 +561,11 @@ class MoodleClient:
         """
         Fetch all assignments from enrolled courses with submission status.
         Uses: mod_assign_get_assignments + mod_assign_get_submission_status
+        Cached for ASSIGNMENTS_TTL seconds.
         """
-        import time as _time
+        cached = self._cached("_assignments_cache", self.ASSIGNMENTS_TTL)
+        if cached is not None:
+            return cached
 
         if not self.user_id:
             self.connect()
@@ -532,99 +581,120 @@ class MoodleClient:
         if not raw or "courses" not in raw:
             return []
 
-        assignments = []
-        now = int(_time.time())
+        pending = [
+            (course_data.get("id", 0), a)
+            for course_data in raw.get("courses", [])
+            for a in course_data.get("assignments", [])
+        ]
+        # Snapshot: invalidate_cache() may clear the shared map mid-call, and
+        # every id must resolve from either this copy or this call's fetches
+        with self._cache_lock:
+            settled = dict(self._settled_statuses)
+        unsettled = [item for item in pending if item[1].get("id", 0) not in settled]
+        # One submission-status round trip per open assignment: issue them
+        # concurrently on the shared session rather than back to back
+        with ThreadPoolExecutor(max_workers=self.STATUS_WORKERS, thread_name_prefix="moodle") as pool:
+            fetched = pool.map(lambda item: self._submission_status(item[1].get("id", 0), item[0]), unsettled)
+            fresh = {a.get("id", 0): status for (_cid, a), status in zip(unsettled, fetched)}
 
-        for course_data in raw.get("courses", []):
-            cid = course_data.get("id", 0)
+        assignments = []
+        now = int(time.time())
+        newly_settled: dict[int, tuple[bool, bool, str]] = {}
+
+        for cid, a in pending:
+            assign_id = a.get("id", 0)
+            status = settled[assign_id] if assign_id in settled else fresh[assign_id]
+            submitted, graded, grade = status
+            if graded and assign_id in fresh and 0 < max(a.get("duedate", 0), a.get("cutoffdate", 0)) < now:
+                newly_settled[assign_id] = status
             cname = course_map.get(cid, f"Course {cid}")
-
-            for a in course_data.get("assignments", []):
-                assign_id = a.get("id", 0)
-                due = a.get("duedate", 0)
-                cutoff = a.get("cutoffdate", 0)
-
-                # Calculate time remaining
-                if due == 0:
-                    time_remaining = "Son tarih yok"
-                elif due < now:
-                    time_remaining = "⏰ Süresi dolmuş!"
+            due = a.get("duedate", 0)
+            cutoff = a.get("cutoffdate", 0)
+
+            # Calculate time remaining
+            if due == 0:
+                time_remaining = "Son tarih yok"
+            elif due < now:
+                time_remaining = "⏰ Süresi dolmuş!"
+            else:
+                delta = due - now
+                days = delta // 86400
+                hours = (delta % 86400) // 3600
+                if days > 0:
+                    time_remaining = f"{days} gün {hours} saat"
                 else:
-                    delta = due - now
-                    days = delta // 86400
-                    hours = (delta % 86400) // 3600
-                    if days > 0:
-                        time_remaining = f"{days} gün {hours} saat"
-                    else:
-                        time_remaining = f"{hours} saat"
-
-                # Check submission status
-                submitted = False
-                graded = False
-                grade = "Henüz notlanmadı"
-                max_grade = ""
-
-                try:
-                    status = self._call(
-                        "mod_assign_get_submission_status",
-                        assignid=assign_id,
-                        userid=self.user_id,
-                    )
-                    if status:
-                        # Check submission
-                        last_attempt = status.get("lastattempt", {})
-                        submission = last_attempt.get("submission", {})
-                        if submission.get("status") == "submitted":
-                            submitted = True
-
-                        # Check grade
-                        feedback = status.get("feedback", {})
-                        if feedback:
-                            grade_info = feedback.get("grade", {})
-                            if grade_info and grade_info.get("grade") is not None:
-                                graded = True
-                                grade = str(grade_info.get("grade", ""))
-                            gradefordisplay = feedback.get("gradefordisplay", "")
-                            if gradefordisplay:
-                                grade = gradefordisplay
-
-                except (requests.RequestException, KeyError, TypeError, ValueError, RuntimeError, OSError) as exc:
-                    logger.debug(
-                        "Could not fetch submission status for assignment=%s: %s",
-                        assign_id,
-                        exc,
-                        exc_info=True,
-                        extra={"assignment_id": assign_id, "course_id": cid},
-                    )
-
-                assignments.append(
-                    Assignment(
-                        id=assign_id,
-                        course_id=cid,
-                        course_name=cname,
-                        name=a.get("name", "Untitled"),
-                        description=self._clean_html(a.get("intro", "")),
-                        due_date=due,
-                        cutoff_date=cutoff,
-                        submitted=submitted,
-                        graded=graded,
-                        grade=grade,
-                        max_grade=max_grade,
-                        time_remaining=time_remaining,
-                    )
+                    time_remaining = f"{hours} saat"
+
+            assignments.append(
+                Assignment(
+                    id=assign_id,
+                    course_id=cid,
+                    course_name=cname,
+                    name=a.get("name", "Untitled"),
+                    description=self._clean_html(a.get("intro", "")),
+                    due_date=due,
+                    cutoff_date=cutoff,
+                    submitted=submitted,
+                    graded=graded,
+                    grade=grade,
+                    max_grade="",
+                    time_remaining=time_remaining,
                 )
+            )
 
         # Sort by due date (soonest first, no-deadline last)
         assignments.sort(key=lambda a: a.due_date if a.due_date > 0 else float("inf"))
 
         logger.info(f"Found {len(assignments)} assignments across {len(courses)} courses.")
-        return assignments
+        if newly_settled:
+            with self._cache_lock:
+                self._settled_statuses.update(newly_settled)
+        self._store("_assignments_cache", assignments)
+        return list(assignments)
+
+    def _submission_status(self, assign_id: int, course_id: int) -> tuple[bool, bool, str]:
+        """Return (submitted, graded, grade) for one assignment."""
+        submitted = False
+        graded = False
+        grade = "Henüz notlanmadı"
+
+        try:
+            status = self._call(
+                "mod_assign_get_submission_status",
+                assignid=assign_id,
+                userid=self.user_id,
+            )
+            if status:
+                # Check submission
+                last_attempt = status.get("lastattempt", {})
+                submission = last_attempt.get("submission", {})
+                if submission.get("status") == "submitted":
+                    submitted = True
+
+                # Check grade
+                feedback = status.get("feedback", {})
+                if feedback:
+                    grade_info = feedback.get("grade", {})
+                    if grade_info and grade_info.get("grade") is not None:
+                        graded = True
+                        grade = str(grade_info.get("grade", ""))
+                    gradefordisplay = feedback.get("gradefordisplay", "")
+                    if gradefordisplay:
+                        grade = gradefordisplay
+
+        except (requests.RequestException, KeyError, TypeError, ValueError, RuntimeError, OSError) as exc:
+            logger.debug(
+                "Could not fetch submission status for assignment=%s: %s",
+                assign_id,
+                exc,
+                exc_info=True,
+                extra={"assignment_id": assign_id, "course_id": course_id},
+            )
+        return submitted, graded, grade
 
     def get_upcoming_assignments(self, days: int = 14) -> list[Assignment]:
         """Get assignments due in the next N days that haven't been submitted."""
-        import time as _time
-
-        now = int(_time.time())
+        now = int(time.time())
         cutoff = now + (days * 86400)
 
         all_assignments = self.get_assignments()
@@ -636,9 +706,7 @@ class MoodleClient:
         Fetch upcoming calendar events (assignments, quizzes, etc.)
         Uses: core_calendar_get_action_events_by_timesort
         """
-        import time as _time
-
-        now = int(_time.time())
+        now = int(time.time())
         end = now + (days * 86400)
 
         events = self._call(
@@ -0,0 +1,207 @@
+"""
+Semantic Response Cache
+=======================
+Reuses a previous LLM answer when a new question is a near-duplicate of one
+already answered ("buffer overflow nedir" / "explain buffer overflow").
+
+Entries live in one (N, dim) int8 matrix of L2-normalized query embeddings
+(symmetric per-row quantization, a quarter of the float32 footprint), so a
+lookup is a single matrix-vector product. Entries are partitioned by a
+scope string (e.g. user + active course) to keep answers personal, expire
+after a TTL and are evicted least-recently-used when the cache is full.
+Verbatim repeats are also indexed by (scope, normalized question), so they
+can be answered before the question is embedded at all.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Quantize rows to int8 in [-127, 127]; returns (codes, per-row scales)."""
+    vectors = np.atleast_2d(vectors).astype("float32")
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype("float32")
+
+
+def _exact_key(scope: str, query: str) -> tuple[str, str]:
+    """Exact-match index key: scope plus the question lowercased with whitespace collapsed."""
+    return scope, " ".join(query.lower().split())
+
+
+@dataclass(slots=True)
+class _Entry:
+    scope: str
+    query: str
+    response: str
+    created_at: float
+    last_hit: float
+
+
+class SemanticCache:
+    """Embedding-keyed LRU cache of (question → answer) pairs."""
+
+    def __init__(
+        self,
+        path: Path,
+        threshold: float = 0.92,
+        max_entries: int = 512,
+        ttl_seconds: float = 86400.0,
+    ):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._matrix: np.ndarray | None = None  # (N, dim) int8 codes
+        self._scales: np.ndarray | None = None  # (N,) float32 dequantization scales
+        self._entries: list[_Entry] = []
+        self._exact: dict[tuple[str, str], int] = {}  # (scope, normalized query) → entry index
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ─── Lookup / Insert ─────────────────────────────────────────────────
+
+    def get(self, scope: str, embedding: np.ndarray) -> str | None:
+        """Return the cached answer closest to `embedding` within `scope`, if similar enough."""
+        with self._lock:
+            if self._matrix is None or not self._entries:
+                return None
+            sims = (self._matrix @ embedding.reshape(-1).astype("float32")) * self._scales
+            now = time.time()
+            for idx in np.argsort(-sims).tolist():
+                if sims[idx] < self.threshold:
+                    return None
+                entry = self._entries[idx]
+                if entry.scope != scope or now - entry.created_at > self.ttl_seconds:
+                    continue
+                entry.last_hit = now
+                logger.info("Semantic cache hit (sim=%.3f): %s", sims[idx], entry.query[:60])
+                return entry.response
+            return None
+
+    def get_exact(self, scope: str, query: str) -> str | None:
+        """Return the cached answer to this exact question (case/whitespace-insensitive), if fresh.
+
+        Like get(), this matches on the question alone; callers must only use
+        it where earlier conversation turns can't change the answer.
+        """
+        with self._lock:
+            idx = self._exact.get(_exact_key(scope, query))
+            if idx is None:
+                return None
+            entry = self._entries[idx]
+            now = time.time()
+            if now - entry.created_at > self.ttl_seconds:
+                return None
+            entry.last_hit = now
+            logger.info("Semantic cache exact hit: %s", entry.query[:60])
+            return entry.response
+
+    def put(self, scope: str, query: str, embedding: np.ndarray, response: str) -> None:
+        """Store an answer; evicts the least recently used entry when full."""
+        codes, scales = _quantize(embedding.reshape(1, -1))
+        now = time.time()
+        entry = _Entry(scope=scope, query=query, response=response, created_at=now, last_hit=now)
+        key = _exact_key(scope, query)
+        with self._lock:
+            if self._matrix is None or not self._entries:
+                self._matrix, self._scales = codes, scales
+                self._entries = [entry]
+                self._exact = {key: 0}
+                return
+            if len(self._entries) >= self.max_entries:
+                victim = min(range(len(self._entries)), key=lambda i: self._entries[i].last_hit)
+                old = self._entries[victim]
+                old_key = _exact_key(old.scope, old.query)
+                if self._exact.get(old_key) == victim:
+                    del self._exact[old_key]
+                self._matrix[victim] = codes[0]
+                self._scales[victim] = scales[0]
+                self._entries[victim] = entry
+                self._exact[key] = victim
+                return
+            self._matrix = np.vstack([self._matrix, codes])
+            self._scales = np.concatenate([self._scales, scales])
+            self._entries.append(entry)
+            self._exact[key] = len(self._entries) - 1
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after course materials change)."""
+        with self._lock:
+            self._matrix = None
+            self._scales = None
+            self._entries = []
+            self._exact = {}
+
+    # ─── Persistence ─────────────────────────────────────────────────────
+
+    def load(self) -> None:
+        """Load a previously saved cache, skipping expired entries."""
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if "scales" in data:
+                    matrix, scales = data["embeddings"].astype(np.int8), data["scales"].astype("float32")
+                else:  # caches written before int8 storage
+                    matrix, scales = _quantize(data["embeddings"])
+                raw_entries = json.loads(str(data["entries"]))
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Semantic cache load failed: %s", exc)
+            return
+
+        now = time.time()
+        keep = [i for i, e in enumerate(raw_entries) if now - e.get("created_at", 0) <= self.ttl_seconds]
+        keep = keep[-self.max_entries :]
+        with self._lock:
+            self._entries = [_Entry(**raw_entries[i]) for i in keep]
+            self._exact = {_exact_key(e.scope, e.query): i for i, e in enumerate(self._entries)}
+            self._matrix = matrix[keep] if keep else None
+            self._scales = scales[keep] if keep else None
+        logger.info("Semantic cache loaded: %d entries", len(self._entries))
+
+    def save(self) -> None:
+        """Persist the cache atomically (tempfile + replace)."""
+        with self._lock:
+            if self._matrix is None or not self._entries:
+                # Cleared (e.g. materials changed): drop the old file too, or
+                # its stale answers would be loaded again on the next start
+                try:
+                    self.path.unlink(missing_ok=True)
+                except OSError as exc:
+                    logger.warning("Semantic cache save failed: %s", exc)
+                return
+            matrix = self._matrix.copy()
+            scales = self._scales.copy()
+            raw_entries = [
+                {
+                    "scope": e.scope,
+                    "query": e.query,
+                    "response": e.response,
+                    "created_at": e.created_at,
+                    "last_hit": e.last_hit,
+                }
+                for e in self._entries
+            ]
+        tmp = self.path.with_suffix(".tmp.npz")
+        try:
+            np.savez(
+                tmp, embeddings=matrix, scales=scales, entries=np.array(json.dumps(raw_entries, ensure_ascii=False))
+            )
+            tmp.replace(self.path)
+        except OSError as exc:
+            logger.warning("Semantic cache save failed: %s", exc)
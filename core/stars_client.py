@@ -10,7 +10,10 @@ import logging
 import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 import requests
@@ -21,6 +24,8 @@ logger = logging.getLogger("core.stars_client")
 BASE = "https://stars.bilkent.edu.tr"
 
 _SESSION_STORE = Path(os.getenv("STARS_SESSION_STORE", "data/stars_sessions.json"))
+_FETCH_WORKERS = 4  # concurrent STARS page fetches in fetch_all_data
+_EXAM_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d.%m.%Y", "%d-%m-%Y")
 
 
 @dataclass
@@ -54,6 +59,23 @@ class StarsCache:
     fetched_at: float = 0
 
 
+@lru_cache(maxsize=256)
+def _exam_date_ts(date_str: str) -> int | None:
+    """Local-midnight epoch seconds for a STARS exam date, or None if unparseable.
+
+    Memoized: every refresh re-parses the same handful of exam dates.
+    """
+    date_str = date_str.strip()
+    if not date_str:
+        return None
+    for fmt in _EXAM_DATE_FORMATS:
+        try:
+            return int(datetime.strptime(date_str, fmt).timestamp())
+        except ValueError:
+            continue
+    return None
+
+
 class StarsClient:
     def __init__(self):
         self._sessions: dict[int, StarsSession] = {}
@@ -724,6 +746,8 @@ class StarsClient:
                         elif "reserved" in label or "block" in label:
                             exam["time_block"] = val
 
+            # Parsed once here so consumers of the cached list skip strptime
+            exam["_date_ts"] = _exam_date_ts(exam["date"])
             exams.append(exam)
 
         return exams
@@ -822,14 +846,32 @@ class StarsClient:
         if not self.is_authenticated(user_id):
             return None
 
-        cache = StarsCache(fetched_at=time.time())
-        cache.user_info = self.get_user_info(user_id) or {}
-        cache.grades = self.get_grades(user_id) or []
-        cache.attendance = self.get_attendance(user_id) or []
-        cache.exams = self.get_exams(user_id) or []
-        cache.letter_grades = self.get_letter_grades(user_id) or []
-        cache.schedule = self.get_schedule(user_id) or []
-        cache.transcript = self.get_transcript(user_id) or []
+        # The seven pages are independent — fetch them concurrently on the
+        # shared session instead of paying seven round-trips back to back
+        fetchers = {
+            "user_info": self.get_user_info,
+            "grades": self.get_grades,
+            "attendance": self.get_attendance,
+            "exams": self.get_exams,
+            "letter_grades": self.get_letter_grades,
+            "schedule": self.get_schedule,
+            "transcript": self.get_transcript,
+        }
+        fetched_at = time.time()
+        with ThreadPoolExecutor(max_workers=_FETCH_WORKERS, thread_name_prefix="stars") as pool:
+            futures = {name: pool.submit(fetch, user_id) for name, fetch in fetchers.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+        cache = StarsCache(
+            user_info=results["user_info"] or {},
+            grades=results["grades"] or [],
+            attendance=results["attendance"] or [],
+            exams=results["exams"] or [],
+            letter_grades=results["letter_grades"] or [],
+            schedule=results["schedule"] or [],
+            transcript=results["transcript"] or [],
+            fetched_at=fetched_at,
+        )
 
         self._cache[user_id] = cache
         logger.info(
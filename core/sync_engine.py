@@ -22,6 +22,8 @@ class SyncEngine:
     """Synchronize Moodle content to local vector store."""
 
     SYNC_STATE_FILE = "sync_state.json"
+    SYNC_JOURNAL_FILE = "sync_state.jsonl"  # synced_files entries appended since the last snapshot
+    JOURNAL_COMPACT_EVERY = 200  # journal lines before they are folded into the snapshot
 
     def __init__(
         self,
@@ -33,26 +35,33 @@ class SyncEngine:
         self.processor = processor
         self.vector_store = vector_store
         self.state_file = config.data_dir / self.SYNC_STATE_FILE
+        self.journal_file = config.data_dir / self.SYNC_JOURNAL_FILE
+        self._journal_lines = 0
+        self._pending_synced: list[tuple[str, dict]] = []
         self.sync_state = self._load_state()
         self._check_semester_reset()
 
     # ─── Full Sync ───────────────────────────────────────────────────────
 
-    def sync_all(self, force: bool = False):
+    def sync_all(self, force: bool = False) -> int:
         """
         Full sync pipeline:
         1. Fetch all enrolled courses
         2. For each course: discover + download files
         3. Process and index documents
         4. Store course structure (topics/sections) as text chunks
+
+        Returns the number of new chunks indexed.
         """
         # Purge any leftover forum chunks (user-generated content removed for security)
         self.vector_store._delete_where(lambda m: m.get("file_type") == "forum")
 
+        # A sync always works from live enrollment data (refills the TTL cache)
+        self.moodle.invalidate_cache()
         courses = self.moodle.get_courses()
         if not courses:
             logger.warning("No courses found.")
-            return
+            return 0
 
         total_chunks = 0
 
@@ -82,10 +91,24 @@ class SyncEngine:
         self._save_state()
 
         logger.info(f"\n✅ Sync complete. Total new chunks indexed: {total_chunks}")
+        return total_chunks
 
     def sync_course(self, course: Course, force: bool = False) -> int:
         """Sync a single course. Returns number of new chunks indexed."""
+        # The vector store is written once per course, right before the sync
+        # state that marks its files as done
+        with self.vector_store.batch():
+            chunk_count = self._index_course(course, force)
+
+        self._append_synced()
+        logger.info(f"[{course.shortname}] Indexed {chunk_count} chunks.")
+        return chunk_count
+
+    def _index_course(self, course: Course, force: bool) -> int:
         chunk_count = 0
+        # One content fetch per sync; topics, file discovery and URL modules
+        # all read course.sections instead of each hitting Moodle again
+        course.sections = self.moodle.get_course_content(course.id)
 
         # 1. Index course structure (sections/topics) as text
         topics_text = self.moodle.get_course_topics_text(course)
@@ -105,8 +128,7 @@ class SyncEngine:
                     "total_chunks": 1,
                 },
             )
-            self.vector_store.add_chunks([structure_chunk])
-            chunk_count += 1
+            chunk_count += self.vector_store.add_chunks([structure_chunk])
 
         # 2. Download and process files
         file_results = self.moodle.download_all_course_files(course)
@@ -128,18 +150,17 @@ class SyncEngine:
             )
 
             if chunks:
-                self.vector_store.add_chunks(chunks)
-                chunk_count += len(chunks)
+                chunk_count += self.vector_store.add_chunks(chunks)
 
                 # Mark as synced
-                if "synced_files" not in self.sync_state:
-                    self.sync_state["synced_files"] = {}
-                self.sync_state["synced_files"][file_key] = {
+                entry = {
                     "filename": moodle_file.filename,
                     "course": course.fullname,
                     "chunks": len(chunks),
                     "synced_at": datetime.now(timezone.utc).isoformat(),
                 }
+                self.sync_state.setdefault("synced_files", {})[file_key] = entry
+                self._pending_synced.append((file_key, entry))
 
         # 3. Index URL modules (link + description as text chunks)
         try:
@@ -147,6 +168,7 @@ class SyncEngine:
             if url_modules:
                 from core.document_processor import DocumentChunk
 
+                url_chunks = []
                 for um in url_modules:
                     text = f"[URL: {um['name']}]\n{um['url']}"
                     if um["description"]:
@@ -164,8 +186,10 @@ class SyncEngine:
                             "total_chunks": 1,
                         },
                     )
-                    self.vector_store.add_chunks([chunk])
-                    chunk_count += 1
+                    url_chunks.append(chunk)
+                # One add_chunks call: a single encode pass and duplicate scan
+                # instead of one per link.
+                chunk_count += self.vector_store.add_chunks(url_chunks)
         except (OSError, RuntimeError, TypeError, ValueError, KeyError) as exc:
             logger.debug(
                 "URL module sync skipped for course=%s: %s",
@@ -175,8 +199,6 @@ class SyncEngine:
                 extra={"course_id": course.id, "course_name": course.fullname},
             )
 
-        self._save_state()
-        logger.info(f"[{course.shortname}] Indexed {chunk_count} chunks.")
         return chunk_count
 
     # ─── Semester Reset ─────────────────────────────────────────────────
@@ -203,15 +225,60 @@ class SyncEngine:
     # ─── State Management ────────────────────────────────────────────────
 
     def _load_state(self) -> dict:
+        state: dict = {}
         if self.state_file.exists():
             try:
-                return json.loads(self.state_file.read_text())
+                state = json.loads(self.state_file.read_text(encoding="utf-8"))
             except (OSError, json.JSONDecodeError):
-                return {}
-        return {}
+                state = {}
+        self._replay_journal(state)
+        return state
+
+    def _replay_journal(self, state: dict):
+        """Apply synced_files entries appended after the snapshot was written."""
+        try:
+            lines = self.journal_file.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        synced = state.setdefault("synced_files", {})
+        for line in lines:
+            try:
+                record = json.loads(line)
+                synced[record.pop("file")] = record
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                # Torn line from an interrupted append: rewrite the snapshot on
+                # the next append rather than appending after the fragment
+                self._journal_lines = self.JOURNAL_COMPACT_EVERY
+                continue
+            self._journal_lines += 1
+
+    def _append_synced(self):
+        """Persist files marked synced since the last call.
+
+        Appends one JSON line per file instead of rewriting the whole state
+        (which grows with every file of the semester) after each course; the
+        journal is folded into the snapshot every JOURNAL_COMPACT_EVERY lines.
+        """
+        if not self._pending_synced:
+            return
+        lines = "".join(
+            json.dumps({"file": key, **entry}, ensure_ascii=False) + "\n" for key, entry in self._pending_synced
+        )
+        self._journal_lines += len(self._pending_synced)
+        self._pending_synced.clear()
+        if self._journal_lines >= self.JOURNAL_COMPACT_EVERY:
+            self._save_state()
+            return
+        with self.journal_file.open("a", encoding="utf-8") as journal:
+            journal.write(lines)
 
     def _save_state(self):
-        self.state_file.write_text(json.dumps(self.sync_state, indent=2, ensure_ascii=False))
+        # Compact on purpose: indent forces json's pure-Python encoder
+        self.state_file.write_text(json.dumps(self.sync_state, ensure_ascii=False), encoding="utf-8")
+        # The snapshot now holds everything the journal recorded
+        self._pending_synced.clear()
+        self._journal_lines = 0
+        self.journal_file.unlink(missing_ok=True)
 
     def get_sync_status(self) -> dict:
         """Return current sync status."""
@@ -6,12 +6,17 @@ Stores document chunks and enables semantic retrieval for RAG.
 No C++ compiler needed — faiss-cpu ships pre-built wheels.
 """
 
+import gzip
 import json
 import logging
 import os
 import pickle
 import re
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import numpy as np
@@ -26,7 +31,8 @@ logger = logging.getLogger(__name__)
 # ─── BM25 Stemming Setup ─────────────────────────────────────────────────
 _en_stemmer = snowballstemmer.stemmer("english")
 _tr_stemmer = snowballstemmer.stemmer("turkish")
-_TR_CHARS = set("çşğüöıÇŞĞÜÖİ")
+_TR_CHARS_RE = re.compile("[çşğüöıÇŞĞÜÖİ]")
+_DIGITS_RE = re.compile(r"\d+")
 
 
 def _tokenize_for_bm25(text: str) -> list[str]:
@@ -34,13 +40,76 @@ def _tokenize_for_bm25(text: str) -> list[str]:
     raw = [w.lower() for w in re.split(r"\W+", text) if len(w) >= 2]
     stemmed = []
     for token in raw:
-        if any(c in _TR_CHARS for c in token):
+        if _TR_CHARS_RE.search(token):
             stemmed.append(_tr_stemmer.stemWord(token))
         else:
             stemmed.append(_en_stemmer.stemWord(token))
     return stemmed
 
 
+class _SemanticSearchCache:
+    """
+    LRU + TTL cache of hybrid_search results keyed by query embedding.
+
+    Callers fold the query's stemmed token set into the search key, so only
+    rewordings of the same terms (case, punctuation, order, inflection) are
+    candidates; "week 3 quiz" and "week 4 quiz" embed above the threshold but
+    must not share results. A lookup compares the query vector with every
+    cached vector of the same key (one matrix-vector product) and reuses the
+    best entry at cosine >= threshold.
+    Unlike core.semantic_cache (whole answers, persisted), this caches the
+    retrieval step the tools repeat within one answer and across users.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_secs: float = 300.0, threshold: float = 0.92):
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.threshold = threshold
+        # slot → (search key, normalized query vector, results, expires_at), oldest use first
+        self._entries: OrderedDict[int, tuple[tuple, np.ndarray, list[dict], float]] = OrderedDict()
+        self._next_slot = 0
+        self._lock = threading.Lock()  # hybrid_search runs in worker threads
+
+    def get(self, key: tuple, query_vec: np.ndarray) -> list[dict] | None:
+        """Cached results for a near-identical query under the same key, or None."""
+        now = time.monotonic()
+        with self._lock:
+            slots: list[int] = []
+            vectors: list[np.ndarray] = []
+            expired: list[int] = []
+            for slot, (entry_key, vec, _results, expires_at) in self._entries.items():
+                if expires_at <= now:
+                    expired.append(slot)
+                elif entry_key == key:
+                    slots.append(slot)
+                    vectors.append(vec)
+            for slot in expired:
+                del self._entries[slot]
+            if not slots:
+                return None
+            # Vectors are L2-normalized, so the dot product is the cosine similarity
+            similarities = np.stack(vectors) @ query_vec
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            slot = slots[best]
+            self._entries.move_to_end(slot)
+            return list(self._entries[slot][2])
+
+    def put(self, key: tuple, query_vec: np.ndarray, results: list[dict]) -> None:
+        """Remember results for a query, evicting the least recently used entry when full."""
+        with self._lock:
+            self._next_slot += 1
+            self._entries[self._next_slot] = (key, query_vec, list(results), time.monotonic() + self.ttl_secs)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every entry (the indexed chunks changed)."""
+        with self._lock:
+            self._entries.clear()
+
+
 class VectorStore:
     """FAISS vector store for course documents."""
 
@@ -49,11 +118,22 @@ class VectorStore:
         self.embedding_model_name = config.embedding_model
         self._index = None
         self._model = None
+        self._reranker = None  # cross-encoder, loaded on first rerank()
+        self._reranker_lock = threading.Lock()
         self._ids: list[str] = []
         self._texts: list[str] = []
         self._metadatas: list[dict] = []
         self._dimension: int = 0
         self._bm25_index: BM25Okapi | None = None
+        self._file_index: dict[str, list[int]] | None = None  # filename → chunk positions (lazy)
+        # (filename, course) → [first position, section, chunk count], in first-appearance order (lazy)
+        self._file_groups: dict[tuple[str, str | None], list] | None = None
+        self._course_positions_cache: dict[str, tuple[np.ndarray, object]] = {}  # course filter → (positions, selector)
+        self._file_chunks_cache: dict[str, list[dict]] = {}  # filename → chunks sorted by chunk_index
+        self._id_set: set[str] | None = None  # chunk ids for duplicate checks (lazy)
+        self._search_cache = _SemanticSearchCache()  # hybrid_search results for reworded repeat queries
+        self._batch_depth = 0  # >0 inside batch(): disk save + BM25 rebuild deferred
+        self._batch_dirty = False
 
     # ─── Persistence paths ───────────────────────────────────────────────
 
@@ -63,6 +143,10 @@ class VectorStore:
 
     @property
     def _meta_path(self) -> Path:
+        return self.store_dir / "metadata.json.gz"
+
+    @property
+    def _legacy_json_path(self) -> Path:
         return self.store_dir / "metadata.json"
 
     @property
@@ -86,12 +170,22 @@ class VectorStore:
         # Load existing index or create new
         if self._index_path.exists() and self._meta_path.exists():
             self._index = faiss.read_index(str(self._index_path))
-            with open(self._meta_path, encoding="utf-8") as f:
-                saved = json.load(f)
+            saved = json.loads(gzip.decompress(self._meta_path.read_bytes()))
             self._ids = saved["ids"]
             self._texts = saved["texts"]
             self._metadatas = saved["metadatas"]
             logger.info(f"Vector store loaded. {len(self._ids)} chunks.")
+        elif self._index_path.exists() and self._legacy_json_path.exists():
+            # One-time migration from plain → gzipped JSON
+            self._index = faiss.read_index(str(self._index_path))
+            with open(self._legacy_json_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self._ids = saved["ids"]
+            self._texts = saved["texts"]
+            self._metadatas = saved["metadatas"]
+            self._save()
+            self._legacy_json_path.unlink()
+            logger.info(f"Vector store loaded. {len(self._ids)} chunks. Metadata compressed.")
         elif self._index_path.exists() and self._legacy_pkl_path.exists():
             # One-time migration from pickle → JSON
             logger.info("Migrating metadata from pickle to JSON...")
@@ -101,7 +195,7 @@ class VectorStore:
             self._ids = saved["ids"]
             self._texts = saved["texts"]
             self._metadatas = saved["metadatas"]
-            self._save()  # re-save as JSON
+            self._save()  # re-save as gzipped JSON
             self._legacy_pkl_path.unlink()  # remove old pickle file
             logger.info(f"Migration complete. {len(self._ids)} chunks. Pickle file removed.")
         else:
@@ -112,6 +206,7 @@ class VectorStore:
             logger.info("Created new empty vector store.")
 
         # Build BM25 keyword index
+        self._invalidate_indexes()
         self._build_bm25_index()
 
     def _save(self):
@@ -119,22 +214,51 @@ class VectorStore:
         import faiss
 
         faiss.write_index(self._index, str(self._index_path))
-        with open(self._meta_path, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "ids": self._ids,
-                    "texts": self._texts,
-                    "metadatas": self._metadatas,
-                },
-                f,
-                ensure_ascii=False,
-            )
+        # json.dumps takes the C encoder's one-shot path; json.dump(obj, f) streams
+        # through the pure-Python iterencode and is slower on large stores
+        payload = json.dumps(
+            {
+                "ids": self._ids,
+                "texts": self._texts,
+                "metadatas": self._metadatas,
+            },
+            ensure_ascii=False,
+        )
+        # Chunk text is prose with repeated metadata keys: gzip level 1 cuts the
+        # file several-fold at a fraction of the time the JSON encode takes,
+        # so startup reads far fewer bytes
+        self._meta_path.write_bytes(gzip.compress(payload.encode("utf-8"), compresslevel=1))
         # Restrict file permissions (owner-only read/write)
         try:
             os.chmod(self._meta_path, 0o600)
         except OSError:
             pass  # Windows doesn't support POSIX permissions
 
+    def _commit(self):
+        """Persist and rebuild BM25 after a mutation, or defer it inside batch()."""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        self._save()
+        self._build_bm25_index()
+
+    @contextmanager
+    def batch(self) -> Iterator["VectorStore"]:
+        """
+        Group several add/delete calls into one save + BM25 rebuild.
+
+        Both are O(total chunks), so committing once per batch instead of once
+        per call keeps a sync from rewriting the whole store per file.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self._commit()
+
     def _encode(self, texts: list[str]) -> np.ndarray:
         """Encode texts to normalized embeddings."""
         embeddings = self._model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
@@ -143,6 +267,97 @@ class VectorStore:
         norms[norms == 0] = 1
         return (embeddings / norms).astype("float32")
 
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Encode texts once so callers can reuse the vectors via query_by_vector()."""
+        return self._encode(texts)
+
+    # ─── Reranking ───────────────────────────────────────────────────────
+
+    @property
+    def reranks(self) -> bool:
+        """Whether a cross-encoder is configured (RERANKER_MODEL)."""
+        return bool(config.reranker_model)
+
+    def rerank(self, query: str, results: list[dict], top_n: int) -> list[dict]:
+        """Reorder results by cross-encoder relevance to query and keep the best top_n.
+
+        Scores (query, chunk) pairs jointly, which ranks far better than the
+        ANN distance. Without a configured model, returns results[:top_n].
+        """
+        if not self.reranks or len(results) < 2:
+            return results[:top_n]
+        with self._reranker_lock:
+            if self._reranker is None:
+                from sentence_transformers import CrossEncoder
+
+                logger.info("Loading reranker %s", config.reranker_model)
+                self._reranker = CrossEncoder(config.reranker_model)
+        scores = self._reranker.predict([(query, r["text"]) for r in results], show_progress_bar=False)
+        order = np.argsort(-np.asarray(scores), kind="stable")[:top_n]
+        return [results[i] for i in order.tolist()]
+
+    # ─── Side Indexes ────────────────────────────────────────────────────
+
+    def _invalidate_indexes(self):
+        """Drop lazily-built side indexes after the chunk arrays change."""
+        self._file_index = None
+        self._file_groups = None
+        self._file_chunks_cache.clear()
+        self._course_positions_cache.clear()
+        self._id_set = None
+        self._search_cache.clear()
+
+    def _known_ids(self) -> set[str]:
+        """Set of indexed chunk ids, built once and then kept in step by add_chunks."""
+        if self._id_set is None:
+            self._id_set = set(self._ids)
+        return self._id_set
+
+    def _build_file_indexes(self):
+        """Build the per-file side indexes in one pass over the metadata."""
+        index: dict[str, list[int]] = {}
+        groups: dict[tuple[str, str | None], list] = {}
+        for idx, meta in enumerate(self._metadatas):
+            index.setdefault(meta.get("filename"), []).append(idx)
+            key = (meta.get("filename", "unknown"), meta.get("course"))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [idx, meta.get("section", ""), 1]
+            else:
+                group[2] += 1
+        self._file_index = index
+        self._file_groups = groups
+
+    def _indices_for_file(self, filename: str) -> list[int]:
+        """Positions of a file's chunks, via a filename → indices map built once."""
+        if self._file_index is None:
+            self._build_file_indexes()
+        return self._file_index.get(filename, [])
+
+    def _file_course_groups(self) -> dict[tuple[str, str | None], list]:
+        """Chunk counts per (filename, course): one entry per file rather than per chunk."""
+        if self._file_groups is None:
+            self._build_file_indexes()
+        return self._file_groups
+
+    def _course_positions(self, course_key: str) -> tuple[np.ndarray, object]:
+        """Positions of chunks whose course contains `course_key` (lowercase), plus a FAISS selector.
+
+        Lets course-scoped searches prefilter: FAISS scores only these vectors
+        and BM25 ranks only these chunks, instead of filtering a top-k afterwards.
+        """
+        cached = self._course_positions_cache.get(course_key)
+        if cached is None:
+            import faiss
+
+            positions = np.fromiter(
+                (idx for idx, meta in enumerate(self._metadatas) if course_key in meta.get("course", "").lower()),
+                dtype="int64",
+            )
+            cached = (positions, faiss.IDSelectorBatch(positions))
+            self._course_positions_cache[course_key] = cached
+        return cached
+
     # ─── BM25 Keyword Search ──────────────────────────────────────────────
 
     def _build_bm25_index(self):
@@ -169,15 +384,25 @@ class VectorStore:
             return []
 
         scores = self._bm25_index.get_scores(tokens)
-        # Indices with score > 0, sorted descending
-        scored = [(i, scores[i]) for i in range(len(scores)) if scores[i] > 0]
-        scored.sort(key=lambda x: x[1], reverse=True)
+        # Indices with score > 0, sorted descending (vectorized; stable for ties)
+        positive = np.flatnonzero(scores > 0)
+        course_key = course_filter.lower() if course_filter else None
+        if course_key:
+            # Prefilter to the course so other courses can't crowd it out of the top
+            positive = positive[np.isin(positive, self._course_positions(course_key)[0])]
+        top = n_results * 3
+        if positive.size > top:
+            # Partition down to the top scores (keeping every tie at the cut)
+            # so only those get sorted, not every matching chunk
+            pos_scores = scores[positive]
+            cut = np.partition(pos_scores, pos_scores.size - top)[pos_scores.size - top]
+            positive = positive[pos_scores >= cut]
+        ranked = positive[np.argsort(-scores[positive], kind="stable")][:top]
 
         results = []
-        for idx, score in scored[: n_results * 3]:
+        for idx in ranked.tolist():
+            score = scores[idx]
             meta = self._metadatas[idx]
-            if course_filter and course_filter.lower() not in meta.get("course", "").lower():
-                continue
             results.append(
                 {
                     "id": self._ids[idx],
@@ -199,19 +424,81 @@ class VectorStore:
         exclude_ids: set[str] | None = None,
         filename_filter: list[str] | None = None,
     ) -> list[dict]:
-        """RRF fusion of semantic (FAISS) + keyword (BM25) search."""
+        """RRF fusion of semantic (FAISS) + keyword (BM25) search.
+
+        Unfiltered searches (no exclude_ids / filename_filter) are served from
+        the semantic cache when a near-identical query ran recently.
+        """
+        if not self._ids:
+            return []
+        return self._hybrid_search_encoded(
+            query, self._encode([query]), n_results, course_filter, exclude_ids, filename_filter
+        )
+
+    def hybrid_search_batch(
+        self,
+        queries: list[tuple[str, str | None]],
+        n_results: int = 15,
+        exclude_ids: set[str] | None = None,
+        first_non_empty: bool = False,
+    ) -> list[list[dict]]:
+        """Run several (query, course_filter) hybrid searches with one embedding call.
+
+        Each distinct query text is encoded once for the whole batch. With
+        first_non_empty, searches after the first one that returns results are
+        skipped (their slots stay empty) — the course → all-courses fallback.
+        """
+        if not self._ids:
+            return [[] for _ in queries]
+        texts = list(dict.fromkeys(query for query, _ in queries))
+        row = {text: i for i, text in enumerate(texts)}
+        embeddings = self._encode(texts)
+
+        batch: list[list[dict]] = []
+        for query, course_filter in queries:
+            if first_non_empty and any(batch):
+                batch.append([])
+                continue
+            i = row[query]
+            batch.append(
+                self._hybrid_search_encoded(query, embeddings[i : i + 1], n_results, course_filter, exclude_ids, None)
+            )
+        return batch
+
+    def _hybrid_search_encoded(
+        self,
+        query: str,
+        query_vec: np.ndarray,
+        n_results: int,
+        course_filter: str | None,
+        exclude_ids: set[str] | None,
+        filename_filter: list[str] | None,
+    ) -> list[dict]:
+        """hybrid_search body for an already-encoded (1, dim) query vector."""
         start = time.perf_counter()
+        cache_key = None
+        if not exclude_ids and not filename_filter:
+            # BM25 drops 1-char tokens, so digits are added separately
+            terms = frozenset(_tokenize_for_bm25(query)).union(_DIGITS_RE.findall(query))
+            cache_key = (course_filter, n_results, terms)
+        if cache_key is not None:
+            cached = self._search_cache.get(cache_key, query_vec[0])
+            if cached is not None:
+                logger.debug("Hybrid search served from semantic cache (query_len=%s)", len(query))
+                return cached
+
         # Fetch wider candidate pool; RRF will rank and trim to n_results
         extra = len(exclude_ids) if exclude_ids else 0
         fetch_k = (n_results + extra) * 2
-        semantic = self.query(
-            query_text=query, n_results=fetch_k, course_filter=course_filter, filename_filter=filename_filter
+        semantic = self.query_by_vector(
+            query_vec, n_results=fetch_k, course_filter=course_filter, filename_filter=filename_filter
         )
         bm25 = self.bm25_search(query, n_results=fetch_k, course_filter=course_filter)
 
         # Post-filter BM25 by filename (bm25_search doesn't support native filter)
         if filename_filter:
-            bm25 = [r for r in bm25 if r.get("metadata", {}).get("filename") in filename_filter]
+            files = frozenset(filename_filter)
+            bm25 = [r for r in bm25 if r["metadata"].get("filename") in files]
 
         if not bm25:
             results = semantic
@@ -240,6 +527,8 @@ class VectorStore:
             results = [r for r in results if r.get("id") not in exclude_ids]
 
         final = results[:n_results]
+        if cache_key is not None:
+            self._search_cache.put(cache_key, query_vec[0], final)
         elapsed_ms = (time.perf_counter() - start) * 1000.0
         logger.info(
             "Hybrid vector search completed in %.2f ms (query_len=%s, semantic=%s, bm25=%s, returned=%s)",
@@ -253,16 +542,23 @@ class VectorStore:
 
     # ─── Indexing ────────────────────────────────────────────────────────
 
-    def add_chunks(self, chunks: list[DocumentChunk], batch_size: int = 100):
-        """Add document chunks. Skips duplicates based on chunk_id."""
+    def add_chunks(self, chunks: list[DocumentChunk], batch_size: int = 100) -> int:
+        """Add document chunks. Skips duplicates based on chunk_id; returns how many were new."""
         if not chunks:
-            return
-
-        existing_ids = set(self._ids)
-        new_chunks = [c for c in chunks if c.chunk_id not in existing_ids]
+            return 0
+
+        known = self._known_ids()
+        batch_ids: set[str] = set()
+        new_chunks = []
+        for c in chunks:
+            # Also drops repeats within this call, as one-chunk-per-call did
+            chunk_id = c.chunk_id
+            if chunk_id not in known and chunk_id not in batch_ids:
+                batch_ids.add(chunk_id)
+                new_chunks.append(c)
         if not new_chunks:
             logger.info("All chunks already indexed, skipping.")
-            return
+            return 0
 
         for i in range(0, len(new_chunks), batch_size):
             batch = new_chunks[i : i + batch_size]
@@ -275,10 +571,13 @@ class VectorStore:
                 self._ids.append(c.chunk_id)
                 self._texts.append(c.text)
                 self._metadatas.append(c.metadata)
+            known.update(c.chunk_id for c in batch)
 
-        self._save()
-        self._build_bm25_index()
+        self._invalidate_indexes()
+        self._id_set = known  # already in step with _ids; no rebuild needed
+        self._commit()
         logger.info(f"Indexed {len(new_chunks)} new chunks ({len(chunks) - len(new_chunks)} duplicates skipped).")
+        return len(new_chunks)
 
     def delete_by_source(self, source_path: str):
         """Remove all chunks from a specific source file."""
@@ -300,8 +599,8 @@ class VectorStore:
             return  # nothing to delete
 
         if keep:
-            # Reconstruct vectors for kept items
-            vectors = np.vstack([self._index.reconstruct(i) for i in keep]).astype("float32")
+            # Reconstruct all vectors in one call, then keep the surviving rows
+            vectors = self._index.reconstruct_n(0, self._index.ntotal)[keep].astype("float32")
             self._index = faiss.IndexFlatIP(self._dimension)
             self._index.add(vectors)
         else:
@@ -310,7 +609,8 @@ class VectorStore:
         self._ids = [self._ids[i] for i in keep]
         self._texts = [self._texts[i] for i in keep]
         self._metadatas = [self._metadatas[i] for i in keep]
-        self._save()
+        self._invalidate_indexes()
+        self._commit()
 
     # ─── Querying ────────────────────────────────────────────────────────
 
@@ -323,17 +623,47 @@ class VectorStore:
         filename_filter: list[str] | None = None,
     ) -> list[dict]:
         """Semantic search over indexed documents."""
-        start = time.perf_counter()
         if not self._ids:
             return []
+        return self.query_by_vector(
+            self._encode([query_text]),
+            n_results=n_results,
+            course_filter=course_filter,
+            section_filter=section_filter,
+            filename_filter=filename_filter,
+        )
 
-        # Encode query
-        query_vec = self._encode([query_text])
+    def query_by_vector(
+        self,
+        query_vec: np.ndarray,
+        n_results: int = 5,
+        course_filter: str | None = None,
+        section_filter: str | None = None,
+        filename_filter: list[str] | None = None,
+    ) -> list[dict]:
+        """Semantic search with a pre-computed (1, dim) query embedding."""
+        start = time.perf_counter()
+        if not self._ids:
+            return []
 
-        # Search more than needed if filtering
-        has_filter = course_filter or section_filter or filename_filter
-        search_k = min(n_results * 4 if has_filter else n_results, len(self._ids))
-        scores, indices = self._index.search(query_vec, search_k)
+        # Course is a prefilter: FAISS only scores that course's vectors
+        candidates = len(self._ids)
+        search_params = None
+        if course_filter:
+            import faiss
+
+            positions, selector = self._course_positions(course_filter.lower())
+            if not positions.size:
+                return []
+            candidates = positions.size
+            search_params = faiss.SearchParameters(sel=selector)
+
+        # Search more than needed if post-filtering
+        has_filter = section_filter or filename_filter
+        search_k = min(n_results * 4 if has_filter else n_results, candidates)
+        scores, indices = self._index.search(query_vec, search_k, params=search_params)
+        # Normalize the filters once, not per candidate
+        files = frozenset(filename_filter) if filename_filter else None
 
         hits = []
         for score, idx in zip(scores[0], indices[0], strict=False):
@@ -342,11 +672,9 @@ class VectorStore:
             meta = self._metadatas[idx]
 
             # Apply filters
-            if course_filter and course_filter.lower() not in meta.get("course", "").lower():
-                continue
             if section_filter and meta.get("section") != section_filter:
                 continue
-            if filename_filter and meta.get("filename") not in filename_filter:
+            if files is not None and meta.get("filename") not in files:
                 continue
 
             hits.append(
@@ -362,9 +690,8 @@ class VectorStore:
 
         elapsed_ms = (time.perf_counter() - start) * 1000.0
         logger.debug(
-            "Semantic vector search completed in %.2f ms (query_len=%s, requested=%s, returned=%s)",
+            "Semantic vector search completed in %.2f ms (requested=%s, returned=%s)",
             elapsed_ms,
-            len(query_text),
             n_results,
             len(hits),
         )
@@ -387,19 +714,21 @@ class VectorStore:
         """Get unique files for a course with chunk counts and section info.
         Returns list sorted by first appearance order (Moodle chronological).
         """
+        course_key = course_name.lower() if course_name else None
         file_info: dict[str, dict] = {}
-        for idx, meta in enumerate(self._metadatas):
-            if course_name and course_name.lower() not in meta.get("course", "").lower():
+        # Groups are in first-appearance order, so a file's first matching
+        # group carries its first matching chunk's position and section
+        for (fname, course), (first_idx, section, count) in self._file_course_groups().items():
+            if course_key and (course is None or course_key not in course.lower()):
                 continue
-            fname = meta.get("filename", "unknown")
             if fname not in file_info:
                 file_info[fname] = {
                     "filename": fname,
                     "chunk_count": 0,
-                    "section": meta.get("section", ""),
-                    "first_idx": idx,
+                    "section": section,
+                    "first_idx": first_idx,
                 }
-            file_info[fname]["chunk_count"] += 1
+            file_info[fname]["chunk_count"] += count
         return sorted(
             file_info.values(),
             key=lambda x: x["first_idx"],
@@ -409,9 +738,27 @@ class VectorStore:
         """Get ALL chunks from a specific file, ordered by chunk_index.
         Returns them in document order so LLM can read the full material.
         """
-        chunks = []
-        for idx, meta in enumerate(self._metadatas):
-            if meta.get("filename") == filename:
+        chunks = self._sorted_file_chunks(filename)
+        if max_chunks > 0:
+            return chunks[:max_chunks]
+        return list(chunks)
+
+    def get_file_chunks_range(self, filename: str, offset: int, limit: int) -> list[dict]:
+        """Get `limit` chunks of a file starting at position `offset` (document order)."""
+        offset = max(0, offset)
+        return self._sorted_file_chunks(filename)[offset : offset + max(0, limit)]
+
+    def count_file_chunks(self, filename: str) -> int:
+        """Number of chunks indexed for a file, without materializing them."""
+        return len(self._indices_for_file(filename))
+
+    def _sorted_file_chunks(self, filename: str) -> list[dict]:
+        """Shared per-file chunk list in chunk_index order (do not mutate)."""
+        chunks = self._file_chunks_cache.get(filename)
+        if chunks is None:
+            chunks = []
+            for idx in self._indices_for_file(filename):
+                meta = self._metadatas[idx]
                 chunks.append(
                     {
                         "id": self._ids[idx],
@@ -421,9 +768,8 @@ class VectorStore:
                         "chunk_index": int(meta.get("chunk_index", 0)),
                     }
                 )
-        chunks.sort(key=lambda x: x["chunk_index"])
-        if max_chunks > 0:
-            chunks = chunks[:max_chunks]
+            chunks.sort(key=lambda x: x["chunk_index"])
+            self._file_chunks_cache[filename] = chunks
         return chunks
 
     # ─── Stats ───────────────────────────────────────────────────────────
@@ -433,9 +779,9 @@ class VectorStore:
         count = len(self._ids)
         courses = set()
         sources = set()
-        for m in self._metadatas:
-            courses.add(m.get("course", "unknown"))
-            sources.add(m.get("filename", "unknown"))
+        for fname, course in self._file_course_groups():
+            courses.add("unknown" if course is None else course)
+            sources.add(fname)
 
         return {
             "total_chunks": count,
@@ -453,5 +799,6 @@ class VectorStore:
         self._ids = []
         self._texts = []
         self._metadatas = []
+        self._invalidate_indexes()
         self._save()
         logger.info("Vector store reset.")
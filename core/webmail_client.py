@@ -9,13 +9,17 @@ import email
 import imaplib
 import logging
 import re
+import time
 from contextlib import contextmanager
-from datetime import timezone
+from datetime import datetime, timezone
 from email.header import decode_header
+from email.utils import parsedate_to_datetime
 
 logger = logging.getLogger("core.webmail_client")
 
 IMAP_HOST = "mail.bilkent.edu.tr"
+STARS_SENDER_SEARCH = '(FROM "starsmsg@bilkent.edu.tr")'
+_STARS_CODE_RE = re.compile(r"Verification Code:\s*(\d{4,6})")
 IMAP_TIMEOUT = 30  # seconds
 IMAP_OPERATION_EXCEPTIONS = (
     imaplib.IMAP4.error,
@@ -344,60 +348,102 @@ class WebmailClient:
         try:
             with self._connect() as imap:
                 # Search for STARS verification emails
-                status, data = imap.search(None, '(FROM "starsmsg@bilkent.edu.tr")')
+                status, data = imap.search(None, STARS_SENDER_SEARCH)
                 if status != "OK" or not data[0]:
                     logger.info("No STARS verification emails found")
                     return None
 
                 # Take the LAST (most recent) UID
-                uids = data[0].split()
-                latest_uid = uids[-1]
+                return self._extract_stars_code(imap, data[0].split()[-1], max_age_seconds)
 
-                # Fetch the email
-                status, msg_data = imap.fetch(latest_uid, "(RFC822)")
-                if status != "OK" or not msg_data or not msg_data[0]:
-                    return None
-
-                raw = msg_data[0][1] if isinstance(msg_data[0], tuple) else msg_data[0]
-                msg = email.message_from_bytes(raw)
+        except IMAP_OPERATION_EXCEPTIONS as exc:
+            logger.error(
+                "IMAP STARS verification fetch failed: %s",
+                exc,
+                exc_info=True,
+                extra={"email": self._email, "max_age_seconds": max_age_seconds},
+            )
+            return None
 
-                # Check age — skip if too old
-                from datetime import datetime
-                from email.utils import parsedate_to_datetime
+    def wait_for_stars_verification_code(
+        self,
+        timeout: float = 20.0,
+        max_age_seconds: int = 60,
+        poll_interval: float = 1.5,
+    ) -> str | None:
+        """Block until a fresh STARS 2FA code arrives, or `timeout` seconds pass.
+
+        Keeps ONE IMAP session open for the whole wait: each check is a NOOP +
+        SEARCH on the live connection (no reconnect/login), and a message is only
+        fetched when the newest STARS UID changes. Returns as soon as the code lands.
+        """
+        if not self._authenticated:
+            return None
 
-                try:
-                    mail_date = parsedate_to_datetime(msg.get("Date", ""))
-                    age = (datetime.now(timezone.utc) - mail_date).total_seconds()
-                    if age > max_age_seconds:
-                        logger.info(f"STARS verification email too old: {age:.0f}s > {max_age_seconds}s")
+        deadline = time.monotonic() + timeout
+        checked: set[bytes] = set()
+        try:
+            with self._connect() as imap:
+                while True:
+                    status, data = imap.search(None, STARS_SENDER_SEARCH)
+                    if status == "OK" and data[0]:
+                        latest_uid = data[0].split()[-1]
+                        if latest_uid not in checked:
+                            checked.add(latest_uid)
+                            code = self._extract_stars_code(imap, latest_uid, max_age_seconds)
+                            if code:
+                                return code
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
                         return None
-                except (TypeError, ValueError, OverflowError) as exc:
-                    logger.debug(f"IMAP could not parse mail date; proceeding anyway: {exc}")
-
-                # Extract body text
-                body = self._extract_body(msg)
-                if not body:
-                    return None
-
-                # Extract verification code: "Verification Code: 50296"
-                match = re.search(r"Verification Code:\s*(\d{4,6})", body)
-                if match:
-                    code = match.group(1)
-                    logger.info(f"STARS verification code extracted: {code}")
-                    return code
-
-                logger.info(f"No verification code found in email body: {body[:100]}")
-                return None
+                    time.sleep(min(poll_interval, remaining))
+                    # SELECT already reported the mailbox state for the first check;
+                    # later checks need a NOOP so the server reports new arrivals
+                    imap.noop()
 
         except IMAP_OPERATION_EXCEPTIONS as exc:
             logger.error(
-                "IMAP STARS verification fetch failed: %s",
+                "IMAP STARS verification wait failed: %s",
                 exc,
                 exc_info=True,
                 extra={"email": self._email, "max_age_seconds": max_age_seconds},
             )
             return None
 
+    def _extract_stars_code(self, imap, uid: bytes, max_age_seconds: int) -> str | None:
+        """Fetch one STARS mail and return its verification code if it is fresh enough."""
+        status, msg_data = imap.fetch(uid, "(RFC822)")
+        if status != "OK" or not msg_data or not msg_data[0]:
+            return None
+
+        raw = msg_data[0][1] if isinstance(msg_data[0], tuple) else msg_data[0]
+        msg = email.message_from_bytes(raw)
+
+        # Check age — skip if too old
+        try:
+            mail_date = parsedate_to_datetime(msg.get("Date", ""))
+            age = (datetime.now(timezone.utc) - mail_date).total_seconds()
+            if age > max_age_seconds:
+                logger.info(f"STARS verification email too old: {age:.0f}s > {max_age_seconds}s")
+                return None
+        except (TypeError, ValueError, OverflowError) as exc:
+            logger.debug(f"IMAP could not parse mail date; proceeding anyway: {exc}")
+
+        # Extract body text
+        body = self._extract_body(msg)
+        if not body:
+            return None
+
+        # Extract verification code: "Verification Code: 50296"
+        match = _STARS_CODE_RE.search(body)
+        if match:
+            code = match.group(1)
+            logger.info(f"STARS verification code extracted: {code}")
+            return code
+
+        logger.info(f"No verification code found in email body: {body[:100]}")
+        return None
+
     def noop(self):
         """No-op — kept for backward compatibility, does nothing now."""
         pass
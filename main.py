@@ -7,8 +7,11 @@ CLI interface for syncing, chatting, generating summaries, and launching web UI.
 import argparse
 import logging
 import sys
+import time
+from collections.abc import Iterator
 
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt
@@ -54,6 +57,50 @@ def build_components():
     return moodle, processor, vector_store, llm, sync
 
 
+# Pre-embedded "<course> weekly topic overview" queries, shared by /özet and the web UI
+_OVERVIEW_EMB: dict = {}
+
+
+def _precompute_overview_embeddings(vector_store: VectorStore, courses: list[str]):
+    """Embed every course's overview query in a single batch."""
+    if not courses:
+        return
+    vectors = vector_store.embed([f"{c} weekly topic overview" for c in courses])
+    for i, course in enumerate(courses):
+        _OVERVIEW_EMB[course] = vectors[i : i + 1]
+
+
+def _overview_chunks(vector_store: VectorStore, course: str, n_results: int = 15) -> list[dict]:
+    """Retrieve overview chunks for a course, reusing its cached query embedding."""
+    emb = _OVERVIEW_EMB.get(course)
+    if emb is None:
+        emb = vector_store.embed([f"{course} weekly topic overview"])
+        _OVERVIEW_EMB[course] = emb
+    return vector_store.query_by_vector(emb, n_results=n_results, course_filter=course)
+
+
+# Lowercased course names for the chat commands, built once per course list
+_COURSE_LOOKUP: tuple[list[str], dict[str, str], list[tuple[str, str]]] | None = None
+
+
+def _match_course(arg: str, courses: list[str]) -> str | None:
+    """Resolve a /kurs or /özet argument: exact (case-insensitive) name first, then substring."""
+    global _COURSE_LOOKUP
+    if _COURSE_LOOKUP is None or _COURSE_LOOKUP[0] is not courses:
+        lowered = [(c.lower(), c) for c in courses]
+        _COURSE_LOOKUP = (courses, dict(reversed(lowered)), lowered)
+    _, exact, lowered = _COURSE_LOOKUP
+
+    needle = arg.lower()
+    if needle in exact:
+        return exact[needle]
+    return next((course for low, course in lowered if needle in low), None)
+
+
+# Ten-cell mastery bars, indexed by filled cell count
+_MASTERY_BARS = tuple("█" * i + "░" * (10 - i) for i in range(11))
+
+
 # ─── Commands ────────────────────────────────────────────────────────────────
 
 
@@ -122,6 +169,51 @@ def cmd_courses(args):
                     console.print(f"     {icon} {mod.get('name', '')}")
 
 
+_CHAT_COMMANDS_HELP = (
+    "Komutlar:\n"
+    "  /kurs <isim>  — Belirli bir kursa odaklan\n"
+    "  /kurslar      — Kayıtlı kursları listele\n"
+    "  /özet <kurs>  — Haftalık özet oluştur\n"
+    "  /sorular <konu> — Pratik sorular oluştur\n"
+    "  /hafıza       — Kayıtlı anıları göster\n"
+    "  /ilerleme     — Konu bazlı öğrenme ilerlemesi\n"
+    "  /hatırla <bilgi> — Manuel hafıza ekle\n"
+    "  /unut <id>    — Belirli bir hafızayı sil\n"
+    "  /profil       — Profil dosyasını düzenle\n"
+    "  /maliyet     — Tahmini aylık maliyet\n"
+    "  /modeller    — Model routing tablosu\n"
+    "  /stats        — İndeks & hafıza istatistikleri\n"
+    "  /temizle      — Sohbet geçmişini sil\n"
+    "  /çıkış        — Çıkış"
+)
+
+
+# Seconds between Markdown re-renders while a reply streams in
+_STREAM_RENDER_INTERVAL = 0.1
+
+
+def _render_stream(deltas: Iterator[str]) -> str:
+    """
+    Render streamed Markdown live and return the full text.
+
+    Markdown is re-parsed at most every _STREAM_RENDER_INTERVAL seconds
+    rather than once per token, so long replies don't re-parse the whole
+    buffer for every delta.
+    """
+    buf: list[str] = []
+    last_render = 0.0
+    with Live("", console=console, refresh_per_second=10) as live:
+        for delta in deltas:
+            buf.append(delta)
+            now = time.monotonic()
+            if now - last_render >= _STREAM_RENDER_INTERVAL:
+                live.update(Markdown("".join(buf)))
+                last_render = now
+        text = "".join(buf)
+        live.update(Markdown(text))
+    return text
+
+
 def cmd_chat(args):
     """Interactive chat mode with RAG."""
     moodle, processor, vector_store, llm, sync = build_components()
@@ -136,27 +228,13 @@ def cmd_chat(args):
             "[bold green]🎓 Moodle AI Assistant[/bold green]\n"
             f"[dim]Chat: {llm.engine.router.chat} | Extract: {llm.engine.router.extraction} | "
             f"Chunks: {stats.get('total_chunks', 0)} | "
-            f"Kurslar: {stats.get('unique_courses', 0)}[/dim]\n\n"
-            "Komutlar:\n"
-            "  /kurs <isim>  — Belirli bir kursa odaklan\n"
-            "  /kurslar      — Kayıtlı kursları listele\n"
-            "  /özet <kurs>  — Haftalık özet oluştur\n"
-            "  /sorular <konu> — Pratik sorular oluştur\n"
-            "  /hafıza       — Kayıtlı anıları göster\n"
-            "  /ilerleme     — Konu bazlı öğrenme ilerlemesi\n"
-            "  /hatırla <bilgi> — Manuel hafıza ekle\n"
-            "  /unut <id>    — Belirli bir hafızayı sil\n"
-            "  /profil       — Profil dosyasını düzenle\n"
-            "  /maliyet     — Tahmini aylık maliyet\n"
-            "  /modeller    — Model routing tablosu\n"
-            "  /stats        — İndeks & hafıza istatistikleri\n"
-            "  /temizle      — Sohbet geçmişini sil\n"
-            "  /çıkış        — Çıkış",
+            f"Kurslar: {stats.get('unique_courses', 0)}[/dim]\n\n" + _CHAT_COMMANDS_HELP,
             border_style="green",
         )
     )
 
     available_courses = stats.get("courses", [])
+    _precompute_overview_embeddings(vector_store, available_courses)
     chat_history: list[dict] = []
 
     while True:
@@ -176,12 +254,9 @@ def cmd_chat(args):
 
         # Regular chat with RAG
         chat_history.append({"role": "user", "content": user_input})
-        with console.status("[bold green]Düşünüyorum...[/bold green]"):
-            response = llm.chat_with_history(messages=chat_history[-10:])
-        chat_history.append({"role": "assistant", "content": response})
-
         console.print("\n[bold green]Asistan[/bold green]")
-        console.print(Markdown(response))
+        reply = _render_stream(llm.stream_chat_with_history(messages=chat_history[-10:]))
+        chat_history.append({"role": "assistant", "content": reply})
 
 
 def _handle_command(cmd: str, llm: LLMEngine, vs: VectorStore, courses: list):
@@ -199,10 +274,10 @@ def _handle_command(cmd: str, llm: LLMEngine, vs: VectorStore, courses: list):
             console.print("[yellow]Kullanım: /kurs <kurs adı>[/yellow]")
             return
         # Fuzzy match
-        matched = [c for c in courses if arg.lower() in c.lower()]
+        matched = _match_course(arg, courses)
         if matched:
-            llm.set_active_course(matched[0])
-            console.print(f"[green]✓ Aktif kurs: {matched[0]}[/green]")
+            llm.set_active_course(matched)
+            console.print(f"[green]✓ Aktif kurs: {matched}[/green]")
         else:
             console.print(f"[red]Kurs bulunamadı: {arg}[/red]")
             console.print(f"[dim]Mevcut kurslar: {', '.join(courses)}[/dim]")
@@ -216,20 +291,15 @@ def _handle_command(cmd: str, llm: LLMEngine, vs: VectorStore, courses: list):
         if not arg:
             course = llm.active_course or (courses[0] if courses else None)
         else:
-            matched = [c for c in courses if arg.lower() in c.lower()]
-            course = matched[0] if matched else None
+            course = _match_course(arg, courses)
 
         if not course:
             console.print("[red]Kurs belirtilmedi veya bulunamadı.[/red]")
             return
 
         console.print(f"[bold]Generating weekly summary for: {course}[/bold]")
-        with console.status("[bold green]Özet oluşturuluyor...[/bold green]"):
-            chunks = vs.query(f"{course} weekly topic overview", n_results=15, course_filter=course)
-            context = "\n\n".join(c["text"] for c in chunks)
-            summary = llm.generate_weekly_summary(course, "All Sections", context)
-
-        console.print(Markdown(summary))
+        chunks = _overview_chunks(vs, course)
+        _render_stream(llm.stream_weekly_summary(course, "All Sections", [c["text"] for c in chunks]))
 
     elif command in ("/sorular", "/questions"):
         if not arg:
@@ -328,7 +398,7 @@ def _handle_command(cmd: str, llm: LLMEngine, vs: VectorStore, courses: list):
         table.add_column("Sorulma", style="yellow")
 
         for p in progress:
-            bar = "█" * int(p.mastery_level * 10) + "░" * (10 - int(p.mastery_level * 10))
+            bar = _MASTERY_BARS[min(10, max(0, int(p.mastery_level * 10)))]
             level_color = "red" if p.mastery_level < 0.3 else "yellow" if p.mastery_level < 0.6 else "green"
             table.add_row(
                 p.topic,
@@ -411,14 +481,13 @@ def cmd_summary(args):
 
         topics_text = moodle.get_course_topics_text(course)
 
-        with console.status("[bold green]Özet oluşturuluyor...[/bold green]"):
-            summary = llm.generate_weekly_summary(
+        _render_stream(
+            llm.stream_weekly_summary(
                 course_name=course.fullname,
                 section_name="Full Course",
                 section_content=topics_text,
             )
-
-        console.print(Markdown(summary))
+        )
         console.print()
 
 
@@ -434,6 +503,7 @@ def cmd_web(args):
 
     stats = vector_store.get_stats()
     courses = stats.get("courses", [])
+    _precompute_overview_embeddings(vector_store, courses)
 
     def respond(message, history, course_filter):
         """Gradio chat handler."""
@@ -452,9 +522,8 @@ def cmd_web(args):
     def generate_summary(course):
         if not course or course == "Tümü":
             return "Lütfen bir kurs seçin."
-        chunks = vector_store.query(f"{course} overview", n_results=15, course_filter=course)
-        context = "\n\n".join(c["text"] for c in chunks)
-        return llm.generate_weekly_summary(course, "All Sections", context)
+        chunks = _overview_chunks(vector_store, course)
+        return llm.generate_weekly_summary(course, "All Sections", [c["text"] for c in chunks])
 
     def generate_questions(topic, course):
         c = course if course != "Tümü" else None
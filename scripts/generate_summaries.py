@@ -10,6 +10,7 @@ Usage (on server):
     python -m scripts.generate_summaries          # all courses
     python -m scripts.generate_summaries --course "CTIS 256"  # single course
     python -m scripts.generate_summaries --dry-run  # list what would be generated
+    python -m scripts.generate_summaries --workers 4 --rpm 10  # tune for provider quota
 """
 
 from __future__ import annotations
@@ -30,6 +31,8 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Generate KATMAN 2 source summaries")
     parser.add_argument("--course", type=str, default=None, help="Filter by course name")
     parser.add_argument("--dry-run", action="store_true", help="List files without generating")
+    parser.add_argument("--workers", type=int, default=3, help="Concurrent LLM calls")
+    parser.add_argument("--rpm", type=float, default=4, help="Max LLM calls started per minute (0 = unpaced)")
     args = parser.parse_args()
 
     # Initialize core components
@@ -59,16 +62,16 @@ def main() -> None:
         STATE.llm = type("LLMShim", (), {"engine": engine})()  # type: ignore[assignment]
         STATE.vector_store = store
 
-    from bot.services.summary_service import generate_source_summary, summary_exists
+    from bot.services.summary_service import existing_summary_keys, generate_summaries_parallel, summary_key
 
     total = 0
     skipped = 0
-    generated = 0
-    errors = 0
+    jobs: list[tuple[str, str, list[str]]] = []
 
     for course in courses:
         files = store.get_files_for_course(course)
-        logger.info("Course: %s — %d files", course, len(files))
+        existing = existing_summary_keys(course)
+        logger.info("Course: %s — %d files, %d summarized", course, len(files), len(existing))
 
         for file_info in files:
             filename = file_info.get("filename", "")
@@ -76,7 +79,7 @@ def main() -> None:
                 continue
             total += 1
 
-            if summary_exists(filename, course):
+            if summary_key(filename, course) in existing:
                 skipped += 1
                 continue
 
@@ -91,20 +94,14 @@ def main() -> None:
                 logger.info("  WOULD generate: %s (%d chunks)", filename, len(chunk_texts))
                 continue
 
-            try:
-                logger.info("  Generating: %s (%d chunks)...", filename, len(chunk_texts))
-                t0 = time.time()
-                generate_source_summary(filename, course, chunk_texts)
-                elapsed = time.time() - t0
-                generated += 1
-                logger.info("  OK — %.1fs", elapsed)
-
-                # Rate limit: 15s between LLM calls
-                if elapsed < 15:
-                    time.sleep(15 - elapsed)
-            except Exception as exc:
-                errors += 1
-                logger.error("  FAIL %s: %s", filename, exc)
+            jobs.append((filename, course, chunk_texts))
+
+    generated = errors = 0
+    if jobs:
+        logger.info("Generating %d summaries (workers=%d, rpm=%s)...", len(jobs), args.workers, args.rpm or "unpaced")
+        t0 = time.time()
+        generated, errors = generate_summaries_parallel(jobs, max_workers=args.workers, calls_per_minute=args.rpm)
+        logger.info("Generation finished in %.1fs", time.time() - t0)
 
     logger.info(
         "Done. total=%d, skipped=%d, generated=%d, errors=%d",